@@ -0,0 +1,55 @@
+import pygame
+
+from audio_clock import MIXER_BUFFER
+from sound_bank import SoundBank
+from text_cache import TextCache
+
+
+class AppContext:
+    """ 應用程式共用的資源：顯示畫面、mixer、字型 (TextCache)、圖片與音效 (SoundBank)
+    每一種資源只初始化一次，選單、GameControl 與各個 manager 都從這裡取得，
+    切換畫面或重新開始時不再重新 set_mode、init 或載入圖片
+    """
+    def __init__(self, size=(900, 600), caption='', sounds=None):
+        """
+        :param size: 畫面大小
+        :param caption: 視窗標題
+        :param sounds: 啟動時載入的音效 {名稱: 音效檔路徑}
+        """
+        if not pygame.get_init():
+            pygame.mixer.pre_init(buffer=MIXER_BUFFER)  # 輸出延遲由緩衝區長度決定 (AudioClock 使用)
+            pygame.init()
+        self.screen = pygame.display.set_mode(size)
+        pygame.display.set_caption(caption)
+        self.text_cache = TextCache()
+        self.sound_bank = SoundBank()
+        if sounds:
+            self.sound_bank.load_all(sounds)
+        self.images = {}  # (路徑, 大小) -> Surface
+
+    @property
+    def size(self):
+        return self.screen.get_size()
+
+    def image(self, path, size=None):
+        """ 取得圖片 (每個路徑與大小只載入 / 縮放一次)
+        :param path: 圖片路徑
+        :param size: 縮放後的大小，None 則維持原本大小
+        """
+        key = (path, size)
+        image = self.images.get(key)
+        if image is None:
+            image = self.images.get((path, None))
+            if image is None:
+                image = pygame.image.load(path)
+                self.images[(path, None)] = image
+            if size is not None:
+                image = pygame.transform.scale(image, size)
+                self.images[key] = image
+        return image
+
+    def close(self):
+        """ 釋放所有資源 (結束程式時) """
+        self.images.clear()
+        self.text_cache.clear()
+        pygame.quit()
@@ -0,0 +1,53 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+LOADER_WORKERS = 4
+
+
+class AssetLoader:
+    """ 背景資源載入
+    以執行緒池同時解碼圖片、縮放貼圖、解析譜面與預先載入音訊，每一項資源以名稱取用。
+    畫面 (開始選單、倒數) 在主執行緒照常更新，需要某項資源時才以 result 等待，
+    並可以用 progress 顯示載入進度。pygame 的 Surface / Sound 建立在背景執行緒是安全的，
+    但和畫面有關的操作 (set_mode、convert、flip) 仍只在主執行緒進行
+    """
+    def __init__(self, workers=LOADER_WORKERS):
+        """
+        :param workers: 同時載入的執行緒數
+        """
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='assets')
+        self.futures = {}
+        self.finished = 0
+        self.lock = threading.Lock()
+
+    def submit(self, name, function, *args, on_done=None):
+        """ 在背景執行 function(*args) 載入一項資源
+        :param name: 資源名稱
+        :param on_done: 載入成功後以結果呼叫 (在載入的執行緒)
+        """
+        future = self.executor.submit(function, *args)
+        self.futures[name] = future
+
+        def finished(future):
+            with self.lock:
+                self.finished += 1
+            if on_done is not None and future.exception() is None:
+                on_done(future.result())
+        future.add_done_callback(finished)
+        return future
+
+    def progress(self):
+        """ 已完成的比例 (0 ~ 1) """
+        with self.lock:
+            return self.finished / len(self.futures) if self.futures else 1.0
+
+    def done(self, *names):
+        """ 指定的資源 (不給則全部) 是否都已載入完成 """
+        return all(self.futures[name].done() for name in (names or self.futures))
+
+    def result(self, name, timeout=None):
+        """ 取得資源，還沒載入完成時等待；載入失敗時拋出當時的例外 """
+        return self.futures[name].result(timeout)
+
+    def shutdown(self, wait=False):
+        self.executor.shutdown(wait=wait)
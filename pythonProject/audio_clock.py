@@ -0,0 +1,136 @@
+import time
+from collections import deque
+
+import pygame
+
+SMOOTHING = 0.1  # 每次取樣修正相位誤差的比例
+DRIFT_GAIN = 0.0005  # 每毫秒誤差修正速率的比例
+MAX_DRIFT = 0.02  # 速率最多偏離 1 的比例
+SNAP_MS = 100  # 誤差超過這個值視為跳躍 (暫停、卡頓、換歌)，直接重新對齊
+STEP_HISTORY = 64  # 估計輸出延遲使用的最近跳動次數
+MIXER_BUFFER = 512  # AppContext 設定的 mixer 緩衝區大小 (取樣數)
+JITTER_HISTORY = 8192  # summary 統計的最近誤差數 (約 95 秒的播放)
+
+
+class AudioClock:
+    """ 音樂時鐘同步
+    pygame.mixer.music.get_pos() 只在音訊緩衝區送出時才跳一次 (約 10 毫秒一格)，而且是「送進裝置」的位置，
+    比實際聽到的聲音早一個輸出緩衝區。這裡以單調時鐘 (perf_counter) 推算連續的歌曲時間，
+    每次 get_pos 跳動時比較推算值與實際值：相位誤差平滑修正、持續的誤差修正速率 (漂移)，
+    誤差太大則直接重新對齊。跳動發生在上一次與這一次讀取之間，所以以兩次讀取的中點當作跳動的時間。
+    輸出延遲優先以設定的 mixer 緩衝區長度計算 (不需要先播放音樂，校正節拍器時也能使用)，
+    沒有指定緩衝區時才以 get_pos 每次跳動的幅度 (約等於緩衝區長度) 估計
+    """
+    def __init__(self, source=None, now=time.perf_counter, latency_ms=None, smoothing=SMOOTHING,
+                 drift_gain=DRIFT_GAIN, snap_ms=SNAP_MS, buffer=None):
+        """
+        :param source: 取得原始歌曲位置 (毫秒) 的函式，預設 pygame.mixer.music.get_pos
+        :param now: 單調時鐘 (秒)
+        :param latency_ms: 固定的輸出延遲 (毫秒)，None 則自動估計
+        :param smoothing: 每次取樣修正相位誤差的比例
+        :param drift_gain: 每毫秒誤差修正速率的比例
+        :param snap_ms: 誤差超過這個值直接重新對齊
+        :param buffer: mixer 的緩衝區大小 (取樣數)，以取樣率換算成輸出延遲；None 則以 get_pos 估計
+        """
+        self.source = source or pygame.mixer.music.get_pos
+        self.now = now
+        self.fixed_latency = latency_ms
+        self.buffer = buffer
+        self.smoothing = smoothing
+        self.drift_gain = drift_gain
+        self.snap_ms = snap_ms
+        self.jitter = deque(maxlen=JITTER_HISTORY)  # 最近每次 get_pos 跳動時與推算值的誤差 (毫秒)
+        self.snaps = 0
+        self.steps = []  # 最近 get_pos 每次跳動的幅度 (緩衝區長度不隨換歌改變，reset 時保留)
+        self.reset()
+
+    def reset(self):
+        """ 清除對齊狀態 (換歌或停止時) """
+        self.anchored = False
+        self.base_time = 0.0  # 對齊點的單調時間 (秒)
+        self.base_pos = 0.0  # 對齊點的歌曲位置 (毫秒)
+        self.rate = 1.0  # 歌曲時間相對單調時鐘的速率
+        self.last_raw = None
+        self.last_read = 0.0  # 上一次讀取 get_pos 的單調時間
+        self.last_output = None
+
+    def _predict(self, t):
+        return self.base_pos + (t - self.base_time) * 1000 * self.rate
+
+    def _anchor(self, t, raw):
+        self.anchored = True
+        self.base_time = t
+        self.base_pos = float(raw)
+        self.last_output = None
+
+    def update(self):
+        """ 讀取一次 get_pos，在它跳動時修正推算的時間線
+        :return: 原始的 get_pos (沒有播放時為負數)
+        """
+        raw = self.source()
+        t = self.now()
+        if raw < 0:
+            self.reset()
+            return raw
+        if not self.anchored:
+            self._anchor(t, raw)
+        elif raw != self.last_raw:
+            step = raw - self.last_raw
+            if step > 0:
+                self.steps.append(step)
+                del self.steps[:-STEP_HISTORY]
+            changed_at = (self.last_read + t) / 2  # 跳動發生在兩次讀取之間
+            error = raw - self._predict(changed_at)
+            predicted = self._predict(t)
+            if abs(error) > self.snap_ms:
+                self.snaps += 1
+                self._anchor(t, raw)
+            else:
+                self.jitter.append(error)
+                # 從目前推算的位置重新起算，維持時間線連續，再修正相位與速率
+                self.base_time = t
+                self.base_pos = predicted + error * self.smoothing
+                drift = self.rate + self.drift_gain * error / 1000
+                self.rate = min(1 + MAX_DRIFT, max(1 - MAX_DRIFT, drift))
+        self.last_raw = raw
+        self.last_read = t
+        return raw
+
+    @property
+    def latency_ms(self):
+        """ 輸出延遲 (毫秒)：固定值、mixer 緩衝區的長度，或 get_pos 跳動幅度的中位數 """
+        if self.fixed_latency is not None:
+            return self.fixed_latency
+        if self.buffer is not None:
+            mixer = pygame.mixer.get_init()
+            if mixer:
+                return self.buffer * 1000 / mixer[0]
+        if not self.steps:
+            return 0.0
+        return sorted(self.steps)[len(self.steps) // 2]
+
+    def song_time_ms(self):
+        """ 目前實際聽到的歌曲時間 (毫秒)，平滑且不會倒退；沒有播放時回傳 get_pos 的原始值 """
+        raw = self.update()
+        if raw < 0:
+            return raw
+        value = self._predict(self.last_read) - self.latency_ms
+        if self.last_output is not None and value < self.last_output:
+            value = self.last_output
+        self.last_output = value
+        return value
+
+    def summary(self):
+        """ 同步狀態與最近 JITTER_HISTORY 次量測到的抖動 (毫秒) """
+        jitter = sorted(abs(error) for error in self.jitter)
+        count = len(self.jitter)
+        mean = sum(self.jitter) / count if count else 0.0
+        return {
+            'samples': count,
+            'mean_error': mean,
+            'std_error': (sum((error - mean) ** 2 for error in self.jitter) / count) ** 0.5 if count else 0.0,
+            'p95_abs_error': jitter[(count - 1) * 95 // 100] if count else 0.0,
+            'latency': self.latency_ms,
+            'rate': self.rate,
+            'snaps': self.snaps,
+        }
@@ -0,0 +1,99 @@
+""" 以模擬的音訊輸出比較原始 get_pos 與 AudioClock 的歌曲時間誤差
+模擬：音訊回呼每個緩衝區 (--buffer 個取樣) 觸發一次並帶有隨機抖動，get_pos 在回呼後跳到已送出的位置，
+實際聽到的聲音比 get_pos 晚一個緩衝區；音效卡時鐘與系統時鐘有 --drift 的速率差。
+遊戲每幀 (帶有抖動) 讀一次時間，與實際聽到的位置比較
+用法 (在 pythonProject 目錄下): python benchmarks/bench_audio_clock.py [--seconds 120] [--drift 0.001]
+"""
+import argparse
+import os
+import random
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from audio_clock import AudioClock
+
+
+class SimulatedMixer:
+    """ 模擬 pygame.mixer.music.get_pos 的階梯狀行為 """
+    def __init__(self, buffer_ms, drift, callback_jitter_ms, rng):
+        self.buffer_ms = buffer_ms
+        self.period = buffer_ms / (1 + drift) / 1000  # 回呼間隔 (系統時間，秒)
+        self.drift = drift
+        self.jitter = callback_jitter_ms / 1000
+        self.rng = rng
+        self.t = 0.0
+        self.callbacks = 0
+        self.next_callback = self.period
+
+    def advance(self, t):
+        while t >= self.next_callback:
+            self.callbacks += 1
+            self.next_callback = (self.callbacks + 1) * self.period + self.rng.uniform(0, self.jitter)
+        self.t = t
+
+    def get_pos(self):
+        return int(self.callbacks * self.buffer_ms)
+
+    def audible(self, t):
+        """ 實際聽到的歌曲位置 (毫秒)：已送出的位置減去一個緩衝區 """
+        return t * 1000 * (1 + self.drift) - self.buffer_ms
+
+
+def stats(errors):
+    ordered = sorted(abs(error) for error in errors)
+    last = len(ordered) - 1
+    mean = sum(errors) / len(errors)
+    return f"mean {mean:+7.3f} ms, p50 |e| {ordered[last // 2]:6.3f}, p95 |e| {ordered[last * 95 // 100]:6.3f}, " \
+           f"max |e| {ordered[last]:6.3f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=120.0)
+    parser.add_argument('--fps', type=float, default=120.0)
+    parser.add_argument('--buffer', type=int, default=512, help='音訊緩衝區取樣數')
+    parser.add_argument('--frequency', type=int, default=44100)
+    parser.add_argument('--drift', type=float, default=0.001, help='音效卡與系統時鐘的速率差')
+    parser.add_argument('--callback-jitter', type=float, default=2.0, help='音訊回呼的延遲抖動 (毫秒)')
+    parser.add_argument('--frame-jitter', type=float, default=2.0, help='每幀時間的抖動 (毫秒)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    buffer_ms = args.buffer * 1000 / args.frequency
+    mixer = SimulatedMixer(buffer_ms, args.drift, args.callback_jitter, rng)
+    clock = AudioClock(source=mixer.get_pos, now=lambda: mixer.t)
+    raw_errors, clock_errors = [], []
+    raw_steps, clock_steps = [], []
+    previous_raw = previous_clock = None
+    t = 0.0
+    frame = 1 / args.fps
+    while t < args.seconds:
+        t += frame + rng.uniform(-args.frame_jitter, args.frame_jitter) / 1000
+        mixer.advance(t)
+        raw = mixer.get_pos()
+        value = clock.song_time_ms()
+        truth = mixer.audible(t)
+        if t > 1:  # 略過剛開始對齊的一秒
+            raw_errors.append(raw - truth)
+            clock_errors.append(value - truth)
+            raw_steps.append(raw - previous_raw)
+            clock_steps.append(value - previous_clock)
+        previous_raw, previous_clock = raw, value
+
+    def spread(steps):
+        mean = sum(steps) / len(steps)
+        return (sum((step - mean) ** 2 for step in steps) / len(steps)) ** 0.5
+
+    print(f"buffer {buffer_ms:.2f} ms, drift {args.drift:+.4f}, {len(raw_errors)} frames")
+    print(f"get_pos    : {stats(raw_errors)}, frame step std {spread(raw_steps):6.3f} ms")
+    print(f"AudioClock : {stats(clock_errors)}, frame step std {spread(clock_steps):6.3f} ms")
+    summary = clock.summary()
+    print(f"estimated latency {summary['latency']:.2f} ms, rate {summary['rate']:.5f}, "
+          f"jitter std {summary['std_error']:.3f} ms, snaps {summary['snaps']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+""" 比較二進位譜面 (.rgc) 與既有 JSON / Python literal 譜面的載入時間
+用法 (在 pythonProject 目錄下): python benchmarks/bench_chart_load.py [--notes 100000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import chart_format
+
+REPEAT = 5
+
+
+def make_chart(count, seed=0):
+    rng = random.Random(seed)
+    now = 0.0
+    chart = []
+    for _ in range(count):
+        now += rng.uniform(1, 200)
+        chart.append([now, rng.randrange(4), 5])
+    return chart
+
+
+def best_of(func):
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=100000)
+    args = parser.parse_args()
+
+    chart = make_chart(args.notes)
+    with tempfile.TemporaryDirectory() as folder:
+        rgc_path = os.path.join(folder, 'chart.rgc')
+        json_path = os.path.join(folder, 'game_notes.json')
+        literal_path = os.path.join(folder, 'note_data.txt')
+        chart_format.save_chart(rgc_path, chart)
+        with open(json_path, 'w') as file:
+            json.dump([{'position': lane, 'appearance_time': t * chart_format.JSON_FPS / 1000, 'speed': speed}
+                       for t, lane, speed in chart], file, indent=4)
+        with open(literal_path, 'w') as file:
+            file.write('note_data=[' + ',\n'.join(repr(note) for note in chart) + '\n]')
+
+        def load_mmap():
+            loaded = chart_format.load_chart(rgc_path)
+            loaded.time.sum()  # 實際讀過一次資料
+            del loaded
+
+        def load_read():
+            chart_format.load_chart(rgc_path, use_mmap=False).time.sum()
+
+        cases = (
+            ('.rgc mmap', rgc_path, load_mmap),
+            ('.rgc read', rgc_path, load_read),
+            ('game_notes.json', json_path, lambda: chart_format.read_game_notes_json(json_path)),
+            ('note_data literal', literal_path, lambda: chart_format.read_note_data_literal(literal_path)),
+        )
+        print(f"{args.notes} notes, best of {REPEAT}")
+        for name, path, func in cases:
+            size = os.path.getsize(path) / 1024
+            print(f"{name:>18}: {best_of(func):9.3f} ms  ({size:9.1f} KiB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+""" 比較 ChartScheduler 與原本 GameStart 每幀掃描譜面的音符生成成本
+用法 (在 pythonProject 目錄下): python benchmarks/bench_chart_scheduler.py [--notes 20000] [--seconds 20]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from chart_scheduler import ChartScheduler
+
+FPS = 120
+
+
+def load_visipiano_chart(path, limit):
+    """ 將 VisiPiano.json 所有音軌的音符轉成 [time(ms), position, speed] 譜面 """
+    with open(path, 'r') as file:
+        data = json.load(file)
+    chart = []
+    for track in data['tracks']:
+        for note in track['notes']:
+            chart.append([note['time'] * 1000, note['midi'] % 4, 5])
+    chart.sort(key=lambda note: note[0])
+    return chart[:limit]
+
+
+def run_legacy(chart, frame_times):
+    """ 原本的作法：每幀複製並掃描整份譜面，生成後 list.remove """
+    local_note_data = list(chart)
+    spawned = 0
+    for current_time in frame_times:
+        for note_info in local_note_data[:]:
+            note_time, position, speed = note_info
+            if current_time >= note_time:
+                spawned += 1
+                local_note_data.remove(note_info)
+    return spawned
+
+
+def run_scheduler(chart, frame_times):
+    """ 新作法：游標前進 """
+    scheduler = ChartScheduler(chart)
+    spawned = 0
+    for current_time in frame_times:
+        for note in scheduler.due(current_time):
+            spawned += 1
+    return spawned
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--chart', default=os.path.join(PROJECT_DIR, 'VisiPiano.json'))
+    parser.add_argument('--notes', type=int, default=20000, help='譜面音符數')
+    parser.add_argument('--seconds', type=float, default=20.0,
+                        help='模擬的歌曲秒數 (原本作法很慢，預設只跑前 20 秒)')
+    args = parser.parse_args()
+
+    chart = load_visipiano_chart(args.chart, args.notes)
+    frames = int(args.seconds * FPS)
+    frame_times = [i * 1000 / FPS for i in range(frames)]
+    print(f"chart: {len(chart)} notes, simulating {frames} frames ({args.seconds:.1f}s @ {FPS} FPS)")
+
+    results = {}
+    for name, func in (('legacy scan', run_legacy), ('ChartScheduler', run_scheduler)):
+        start = time.perf_counter()
+        spawned = func(chart, frame_times)
+        elapsed = time.perf_counter() - start
+        results[name] = elapsed
+        print(f"{name:>15}: {elapsed * 1000:10.2f} ms total, "
+              f"{elapsed * 1e6 / frames:9.2f} us/frame, spawned {spawned}")
+    print(f"speedup: {results['legacy scan'] / results['ChartScheduler']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
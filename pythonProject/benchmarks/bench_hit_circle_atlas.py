@@ -0,0 +1,70 @@
+""" 比較命中圓環每幀重新建立 Surface 與使用預先烘焙影格表的繪製成本
+用法 (在 pythonProject 目錄下): python benchmarks/bench_hit_circle_atlas.py [--effects 50 200] [--frames 32]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import pygame
+
+from effect_atlas import HitCircleAtlas
+
+WIDTH, HEIGHT = 900, 600
+YELLOW = (255, 255, 0)
+LIFETIME = 500
+
+
+def draw_legacy(screen, effects, now):
+    """ 原本 HitCircleEffect.draw 的作法 """
+    for position, color, start_time in effects:
+        elapsed = now - start_time
+        radius_outer = int(20 + (30 * (elapsed / LIFETIME)))
+        radius_inner = int(radius_outer * 0.8)
+        alpha = max(0, 255 - int(255 * (elapsed / LIFETIME)))
+        surface = pygame.Surface((radius_outer * 2, radius_outer * 2), pygame.SRCALPHA)
+        pygame.draw.circle(surface, color + (alpha,), (radius_outer, radius_outer), radius_outer)
+        pygame.draw.circle(surface, (0, 0, 0, 0), (radius_outer, radius_outer), radius_inner)
+        screen.blit(surface, (position[0] - radius_outer, position[1] - radius_outer))
+
+
+def draw_atlas(screen, effects, now, atlas):
+    for position, color, start_time in effects:
+        surface, radius_outer = atlas.frame(color, (now - start_time) / LIFETIME)
+        screen.blit(surface, (position[0] - radius_outer, position[1] - radius_outer))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--effects', type=int, nargs='+', default=[50, 200])
+    parser.add_argument('--frames', type=int, default=32, help='影格表的影格數')
+    parser.add_argument('--iterations', type=int, default=300, help='模擬的遊戲幀數')
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    start = time.perf_counter()
+    atlas = HitCircleAtlas(frames=args.frames, colors=(YELLOW,))
+    print(f"baking {args.frames} frames: {(time.perf_counter() - start) * 1000:.2f} ms")
+    rng = random.Random(0)
+    for count in args.effects:
+        effects = [((rng.choice((180, 360, 540, 720)), rng.uniform(400, 600)), YELLOW, rng.uniform(0, LIFETIME))
+                   for _ in range(count)]
+        timings = {}
+        for name, draw in (('legacy', draw_legacy), ('atlas', lambda s, e, n: draw_atlas(s, e, n, atlas))):
+            start = time.perf_counter()
+            for frame in range(args.iterations):
+                draw(screen, effects, LIFETIME)
+            timings[name] = (time.perf_counter() - start) * 1000 / args.iterations
+        print(f"{count:4d} effects: legacy {timings['legacy']:.3f} ms/frame, "
+              f"atlas {timings['atlas']:.3f} ms/frame ({timings['legacy'] / timings['atlas']:.1f}x)")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+""" 比較各種按鍵列結構在和弦爆發時的擊中 (找到被判定的音符並移除) 吞吐量
+以內建譜面 note_data.txt 中約 14354 ms 與 28036 ms 的四鍵和弦為例，
+可以用 --stack 把譜面疊加多份模擬更密集的譜面
+用法 (在 pythonProject 目錄下): python benchmarks/bench_hit_throughput.py [--stack 1 64]
+"""
+import argparse
+import ast
+import os
+import sys
+import time
+
+import numpy as np
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from note_lanes import LaneStore
+
+FPS = 120
+HEIGHT = 600
+BURSTS = (14354, 28036)
+
+
+def load_note_data(path):
+    with open(path, 'r') as file:
+        return ast.literal_eval(file.read().split('=', 1)[1])
+
+
+def on_screen_at(chart, now_ms, stack):
+    """ 取出 now_ms 時畫面上的音符 (速度 5 約停留 1083 ms)，疊加 stack 份並稍微錯開時間 """
+    notes = []
+    for copy_index in range(stack):
+        shift = copy_index * 0.01
+        for time_ms, lane, speed in chart:
+            visible_ms = (HEIGHT + 50) / (speed * FPS / 1000)
+            if now_ms - visible_ms < time_ms + shift <= now_ms:
+                notes.append((time_ms + shift, lane, speed))
+    notes.sort()
+    return notes
+
+
+def hit_list(notes, repeat):
+    """ 原本的作法：list[0] 再 list.remove """
+    elapsed = 0.0
+    hits = 0
+    for _ in range(repeat):
+        columns = [[], [], [], []]
+        for note in notes:
+            columns[note[1]].append(note)
+        start = time.perf_counter()
+        for lane in range(4):
+            column = columns[lane]
+            while column:
+                note = column[0]
+                column.remove(note)
+                hits += 1
+        elapsed += time.perf_counter() - start
+    return hits, elapsed
+
+
+def scan(store, lane, spawn_time):
+    """ 不檢查佇列頭，直接掃描整列找出音符 (LaneStore.find 原本的作法) """
+    store.sync_alive()
+    slots = np.flatnonzero(store.alive[lane] & (store.spawn_time[lane] == spawn_time))
+    return int(slots[0]) if slots.size else -1
+
+
+def hit_store(notes, repeat, find=None):
+    """ LaneStore 環形緩衝區：與 NoteManager.check_hit 相同，以出現時間找到音符並移除 (LaneStore.take)
+    :param find: 改用「找出欄位 + remove」的函式
+    """
+    store = LaneStore.for_chart(notes)
+    elapsed = 0.0
+    hits = 0
+    for _ in range(repeat):
+        store.clear()
+        for time_ms, lane, speed in notes:
+            store.append(lane, time_ms, speed)
+        start = time.perf_counter()
+        if find is None:
+            for time_ms, lane, speed in notes:
+                store.take(lane, time_ms)
+                hits += 1
+        else:
+            for time_ms, lane, speed in notes:
+                store.remove(lane, find(store, lane, time_ms))
+                hits += 1
+        elapsed += time.perf_counter() - start
+    return hits, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--chart', default=os.path.join(PROJECT_DIR, 'note_data.txt'))
+    parser.add_argument('--stack', type=int, nargs='+', default=[1, 64, 512])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    chart = load_note_data(args.chart)
+    for stack in args.stack:
+        for burst in BURSTS:
+            notes = on_screen_at(chart, burst + 5, stack)
+            for name, func in (('list.remove', hit_list), ('LaneStore', hit_store),
+                               ('scan', lambda notes, repeat: hit_store(notes, repeat, scan))):
+                hits, elapsed = func(notes, args.repeat)
+                print(f"stack {stack:4d} burst {burst:6d}ms ({len(notes):5d} on screen) {name:>11}: "
+                      f"{hits / elapsed / 1e6:7.3f} M hits/s")
+
+
+if __name__ == '__main__':
+    main()
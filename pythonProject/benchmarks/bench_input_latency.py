@@ -0,0 +1,103 @@
+""" 比較每幀 pygame.event.get() 一次與 InputCapture (幀中與等待空檔持續 poll) 的按鍵時間誤差
+另一個執行緒在隨機的實際時間送出按鍵事件 (事件的 song_time 是送出時的 perf_counter 毫秒)，
+主迴圈以 RealClock 維持 fps，每幀忙碌 --work-ms 模擬繪製。量測：
+    時間誤差：判定使用的按鍵時間與實際送出時間的差距 (原本是這一幀開始的時間)
+    判定延遲：從送出到判定的時間
+用法 (在 pythonProject 目錄下): python benchmarks/bench_input_latency.py [--seconds 5] [--fps 120] [--work-ms 4]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import pygame
+
+from game_clock import RealClock
+from input_capture import LANE_KEYS, InputCapture
+
+
+def send_presses(stop, rng, gap_ms):
+    """ 在隨機的時間送出按鍵事件，直到 stop 被設定 """
+    while not stop.is_set():
+        time.sleep(rng.uniform(*gap_ms) / 1000)
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=rng.choice(LANE_KEYS),
+                                             song_time=time.perf_counter_ns() / 1e6))
+
+
+def busy(work_ms):
+    """ 模擬一幀的繪製工作 """
+    end = time.perf_counter() + work_ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def run(mode, seconds, fps, work_ms, seed):
+    """ :return: (時間誤差 ns 列表, 判定延遲 ns 列表) """
+    clock = RealClock()
+    capture = InputCapture()
+    errors, latencies = [], []
+    stop = threading.Event()
+    sender = threading.Thread(target=send_presses, args=(stop, random.Random(seed), (20, 80)))
+    pygame.event.clear()
+    sender.start()
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        frame_ns = time.perf_counter_ns()
+        if mode == 'legacy':
+            # 原本的作法：每幀取一次事件，按鍵時間就是這一幀的時間
+            for event in pygame.event.get():
+                if event.type == pygame.KEYDOWN:
+                    sent_ns = event.song_time * 1e6
+                    errors.append(frame_ns - sent_ns)
+                    latencies.append(time.perf_counter_ns() - sent_ns)
+            busy(work_ms)
+            clock.tick(fps)
+        else:
+            capture.events()
+            for captured_ns, lane, pressed, song_time in capture.drain():
+                sent_ns = song_time * 1e6
+                errors.append(captured_ns - sent_ns)
+                latencies.append(time.perf_counter_ns() - sent_ns)
+            busy(work_ms)
+            capture.poll()
+            clock.tick(fps, idle=capture.poll)
+    stop.set()
+    sender.join()
+    return errors, latencies
+
+
+def describe(name, values):
+    values = sorted(values)
+    if not values:
+        return f"{name}: no samples"
+    last = len(values) - 1
+    p50, p95, p99 = (values[last * p // 100] / 1e6 for p in (50, 95, 99))
+    return f"{name}: p50 {p50:6.3f} ms, p95 {p95:6.3f} ms, p99 {p99:6.3f} ms, max {values[last] / 1e6:6.3f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=5.0, help='每種作法量測的秒數')
+    parser.add_argument('--fps', type=int, default=120)
+    parser.add_argument('--work-ms', type=float, default=4.0, help='每幀模擬的繪製時間')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((100, 100))
+    for mode in ('legacy', 'capture'):
+        errors, latencies = run(mode, args.seconds, args.fps, args.work_ms, args.seed)
+        print(f"{mode} ({len(errors)} presses)")
+        print('  ' + describe('timestamp error', errors))
+        print('  ' + describe('send -> judgment', latencies))
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
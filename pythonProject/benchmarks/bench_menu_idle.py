@@ -0,0 +1,96 @@
+""" 比較開始選單在玩家不操作時的 CPU 使用：原本每幀重畫整個畫面 (60 FPS) 與 MenuScreen (事件驅動)
+用法 (在 pythonProject 目錄下): python benchmarks/bench_menu_idle.py [--seconds 5]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import pygame
+
+from menu_ui import MenuScreen
+from text_cache import TextCache
+
+WIDTH, HEIGHT = 900, 600
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BLUE = (70, 130, 180)
+GRAY = (200, 200, 200)
+YELLOW = (255, 255, 0)
+BUTTONS = [("Start", (WIDTH // 2 - 100, HEIGHT // 2, 200, 50), BLUE),
+           ("Easy", (WIDTH // 2 - 150, HEIGHT // 2 + 100, 100, 50), BLUE),
+           ("Medium", (WIDTH // 2 - 50, HEIGHT // 2 + 100, 100, 50), BLUE),
+           ("Hard", (WIDTH // 2 + 50, HEIGHT // 2 + 100, 100, 50), BLUE),
+           ("Adjust", (WIDTH // 2 - 430, HEIGHT // 2 + 230, 100, 50), YELLOW)]
+
+
+def legacy_menu(screen, text_cache, seconds):
+    """ 原本的作法：每幀清除整個畫面、畫出標題與按鈕後 flip
+    :return: 畫面更新次數
+    """
+    clock = pygame.time.Clock()
+    frames = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pygame.event.get()
+        screen.fill(WHITE)
+        title = text_cache.render("Rhythm Game", 50, BLUE)
+        screen.blit(title, title.get_rect(center=(WIDTH // 2, HEIGHT // 4)))
+        mouse = pygame.mouse.get_pos()
+        pygame.mouse.get_pressed()
+        for text, (x, y, width, height), hover in BUTTONS:
+            inside = x < mouse[0] < x + width and y < mouse[1] < y + height
+            pygame.draw.rect(screen, hover if inside else GRAY, (x, y, width, height))
+            label = text_cache.render(text, 36, BLACK)
+            screen.blit(label, label.get_rect(center=(x + width // 2, y + height // 2)))
+        pygame.display.flip()
+        frames += 1
+        clock.tick(60)
+    return frames
+
+
+def retained_menu(screen, text_cache, seconds):
+    """ MenuScreen：一段時間後送出 QUIT 結束
+    :return: (畫面更新次數, 醒來次數)
+    """
+    view = MenuScreen(screen, text_cache, WHITE)
+    view.label("Rhythm Game", 50, BLUE, (WIDTH // 2, HEIGHT // 4))
+    for text, rect, hover in BUTTONS:
+        view.button(text, rect, GRAY, hover, text)
+    timer = threading.Timer(seconds, lambda: pygame.event.post(pygame.event.Event(pygame.QUIT)))
+    timer.start()
+    view.run()
+    timer.join()
+    return view.redraws, view.wakeups
+
+
+def measure(function, *args):
+    """ :return: (CPU 秒數, 實際秒數, function 的回傳值) """
+    cpu, wall = time.process_time(), time.perf_counter()
+    result = function(*args)
+    return time.process_time() - cpu, time.perf_counter() - wall, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    text_cache = TextCache()
+    cpu, wall, frames = measure(legacy_menu, screen, text_cache, args.seconds)
+    print(f"legacy   : {frames:5d} redraws, CPU {cpu:6.3f} s / {wall:.2f} s ({cpu / wall * 100:5.1f}% of a core)")
+    cpu, wall, (redraws, wakeups) = measure(retained_menu, screen, text_cache, args.seconds)
+    print(f"retained : {redraws:5d} redraws, {wakeups} wakeups, CPU {cpu:6.3f} s / {wall:.2f} s "
+          f"({cpu / wall * 100:5.1f}% of a core)")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+""" 比較 list[Note] 與 LaneStore (NumPy 欄位) 每幀更新、剔除與繪製音符的成本
+用法 (在 pythonProject 目錄下): python benchmarks/bench_note_lanes.py [--frames 600]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import pygame
+
+from note_lanes import LaneStore
+
+WIDTH, HEIGHT = 900, 600
+FPS = 120
+NOTE_X = [180, 360, 540, 720]
+
+
+class ListNote:
+    """ 原本 main_test.Note 的寫法 (以時間計算位置) """
+    def __init__(self, x, spawn_time, speed):
+        self.x = x
+        self.y = -50
+        self.spawn_time = spawn_time
+        self.pixels_per_ms = speed * FPS / 1000
+
+    def update(self, now_ms):
+        self.y = -50 + (now_ms - self.spawn_time) * self.pixels_per_ms
+
+
+def make_chart(on_screen, frames):
+    """ 產生讓畫面上平均維持 on_screen 個音符的譜面 (速度 5 時，音符在畫面上約 1083 毫秒) """
+    duration = frames * 1000 / FPS + 1100
+    visible_ms = (HEIGHT + 50) / (5 * FPS / 1000)
+    count = int(on_screen * duration / visible_ms)
+    return [(i * duration / count - 1100, i % 4, 5) for i in range(count)]
+
+
+def run_list(chart, frames, screen, image):
+    columns = [[], [], [], []]
+    cursor = 0
+    missed = 0
+    for frame in range(frames):
+        now = frame * 1000 / FPS
+        while cursor < len(chart) and chart[cursor][0] <= now:
+            spawn_time, lane, speed = chart[cursor]
+            columns[lane].append(ListNote(NOTE_X[lane], spawn_time, speed))
+            cursor += 1
+        for column in columns:
+            for note in column[:]:
+                note.update(now)
+                if note.y > HEIGHT:
+                    missed += 1
+                    column.remove(note)
+        for column in columns:
+            for note in column:
+                screen.blit(image, (note.x, note.y))
+    return missed
+
+
+def run_store(chart, frames, screen, image):
+    store = LaneStore(lanes=4)
+    cursor = 0
+    missed = 0
+    for frame in range(frames):
+        now = frame * 1000 / FPS
+        while cursor < len(chart) and chart[cursor][0] <= now:
+            spawn_time, lane, speed = chart[cursor]
+            store.append(lane, spawn_time, speed)
+            cursor += 1
+        store.update(now)
+        missed += store.cull(HEIGHT)
+        lanes, ys = store.visible()
+        screen.blits([(image, (NOTE_X[lane], y)) for lane, y in zip(lanes.tolist(), ys.tolist())], False)
+    return missed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--on-screen', type=int, nargs='+', default=[100, 300, 600, 1000])
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.Surface((WIDTH, HEIGHT))
+    image = pygame.transform.scale(pygame.image.load(os.path.join(PROJECT_DIR, 'note.png')), (30, 30))
+    budget = 1000 / FPS
+    print(f"frame budget @ {FPS} FPS: {budget:.2f} ms")
+    for on_screen in args.on_screen:
+        chart = make_chart(on_screen, args.frames)
+        for name, func in (('list[Note]', run_list), ('LaneStore', run_store)):
+            start = time.perf_counter()
+            missed = func(chart, args.frames, screen, image)
+            per_frame = (time.perf_counter() - start) * 1000 / args.frames
+            print(f"{on_screen:5d} on screen {name:>11}: {per_frame:7.3f} ms/frame "
+                  f"({per_frame / budget * 100:5.1f}% of budget), missed {missed}")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
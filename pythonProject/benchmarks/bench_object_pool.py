@@ -0,0 +1,130 @@
+""" 比較命中效果每次配置新物件 (原本作法) 與使用 ObjectPool 時的幀時間分佈與 GC 次數
+效果物件的欄位與 main_test.HitResult 相同，只把時間改成以幀數計算，方便重現
+用法 (在 pythonProject 目錄下): python benchmarks/bench_object_pool.py [--frames 20000] [--hits 6]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from pools import ObjectPool
+
+LIFESPAN = 120  # 幀 (120 FPS 下 1000 毫秒)
+BUCKETS_US = (25, 50, 100, 250, 500, 1000, 2000)
+
+
+class PlainResult:
+    """ 原本沒有 __slots__、每次新建的命中結果 """
+    def __init__(self, text, position, font_size, color, frame):
+        self.text = text
+        self.x, self.y = position
+        self.font_size = font_size
+        self.color = color
+        self.alpha = 255
+        self.creation_frame = frame
+
+    def update(self, frame):
+        self.y -= 0.2
+        elapsed = frame - self.creation_frame
+        self.alpha = 0 if elapsed > LIFESPAN else 255 - int(255 * elapsed / LIFESPAN)
+
+
+class PooledResult:
+    __slots__ = ('text', 'x', 'y', 'font_size', 'color', 'alpha', 'creation_frame')
+
+    def __init__(self, text, position, font_size, color, frame):
+        self.reset(text, position, font_size, color, frame)
+
+    def reset(self, text, position, font_size, color, frame):
+        self.text = text
+        self.x, self.y = position
+        self.font_size = font_size
+        self.color = color
+        self.alpha = 255
+        self.creation_frame = frame
+
+    def update(self, frame):
+        self.y -= 0.2
+        elapsed = frame - self.creation_frame
+        self.alpha = 0 if elapsed > LIFESPAN else 255 - int(255 * elapsed / LIFESPAN)
+
+
+def run_plain(frames, hits):
+    results = []
+    times = []
+    for frame in range(frames):
+        start = time.perf_counter_ns()
+        for _ in range(hits):
+            results.append(PlainResult('perfect', (100, 100), 48, (0, 255, 0), frame))
+        for result in results[:]:
+            result.update(frame)
+            if result.alpha <= 0:
+                results.remove(result)
+        times.append(time.perf_counter_ns() - start)
+    return times, {'allocations': frames * hits}
+
+
+def run_pooled(frames, hits):
+    pool = ObjectPool(PooledResult, hits * (LIFESPAN + 2), '', (0, 0), 48, (0, 0, 0), 0)
+    results = []
+    times = []
+    for frame in range(frames):
+        start = time.perf_counter_ns()
+        for _ in range(hits):
+            results.append(pool.acquire('perfect', (100, 100), 48, (0, 255, 0), frame))
+        keep = 0
+        for result in results:
+            result.update(frame)
+            if result.alpha <= 0:
+                pool.release(result)
+            else:
+                results[keep] = result
+                keep += 1
+        del results[keep:]
+        times.append(time.perf_counter_ns() - start)
+    stats = pool.stats()
+    stats['allocations'] = stats['misses']
+    return times, stats
+
+
+def histogram(times_ns):
+    counts = [0] * (len(BUCKETS_US) + 1)
+    for value in times_ns:
+        us = value / 1000
+        for index, bound in enumerate(BUCKETS_US):
+            if us < bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, default=20000)
+    parser.add_argument('--hits', type=int, default=6, help='每幀新增的命中效果數')
+    args = parser.parse_args()
+
+    labels = [f"<{bound}us" for bound in BUCKETS_US] + [f">={BUCKETS_US[-1]}us"]
+    print(f"{'':>8} " + " ".join(f"{label:>8}" for label in labels) + f" {'p99':>8} {'max':>8} {'gc':>5}")
+    for name, func in (('plain', run_plain), ('pooled', run_pooled)):
+        gc.collect()
+        collections = [0]
+        callback = lambda phase, info: collections.__setitem__(0, collections[0] + (phase == 'start'))
+        gc.callbacks.append(callback)
+        times, stats = func(args.frames, args.hits)
+        gc.callbacks.remove(callback)
+        ordered = sorted(times)
+        p99 = ordered[int(len(ordered) * 0.99)] / 1000
+        print(f"{name:>8} " + " ".join(f"{count:8d}" for count in histogram(times)) +
+              f" {p99:7.1f}u {ordered[-1] / 1000:7.1f}u {collections[0]:5d}")
+        print(f"{'':>8} {stats}")
+
+
+if __name__ == '__main__':
+    main()
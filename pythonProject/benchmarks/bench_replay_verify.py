@@ -0,0 +1,86 @@
+""" 量測重播驗證的速度
+先以 headless.simulate 跑幾局 (不同的誤差、漏按比例與校正偏移) 並記錄重播，確認重新判定的結果和
+NoteManager.countHIT 相同，接著比較：
+    simulate : 以虛擬時鐘跑完整遊戲迴圈 (繪製、效果) 所需的時間
+    rejudge  : replay.rejudge 只重新判定按鍵所需的時間 (相對於歌曲長度的倍速)
+最後把重播複製成 --replays 個檔案，以 verify_files 在單一行程與行程池 (--workers) 批次驗證
+用法 (在 pythonProject 目錄下): python benchmarks/bench_replay_verify.py [--replays 2000] [--workers 4]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+os.chdir(PROJECT_DIR)
+
+import headless
+import main_test
+from chart_format import read_any
+from replay import ReplayRecorder, load_replay, rejudge, verify_files
+
+CHART = 'note_data.txt'
+# (jitter_ms, miss_rate, 校正偏移 ms)
+PLAYERS = ((0, 0, 0), (90, 0.05, 0), (160, 0.1, 25), (250, 0.2, -40))
+
+
+def best_ms(function, repeat):
+    """ 重複執行取最快的一次 (毫秒) """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--replays', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=max(2, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    note_data = read_any(CHART)
+    main_test.setup()
+    with tempfile.TemporaryDirectory() as directory:
+        recorded = []
+        for seed, (jitter, miss_rate, delay) in enumerate(PLAYERS):
+            path = os.path.join(directory, f'player{seed}.rgr')
+            events = headless.autoplay_events(note_data, delay, jitter, miss_rate, seed)
+            recorder = ReplayRecorder(note_data, delay, path)
+            start = time.perf_counter()
+            headless.simulate(note_data, events, replay=recorder, delay=delay)
+            simulate_ms = (time.perf_counter() - start) * 1000
+            replay = load_replay(path)
+            actual = rejudge(replay, note_data)
+            rejudge_ms = best_ms(lambda: rejudge(replay, note_data), 20)
+            song_ms = replay.end
+            print(f"player{seed} (jitter {jitter} ms, miss {miss_rate:.0%}, offset {delay:+d} ms): "
+                  f"{os.path.getsize(path)} bytes, recorded {replay.counts}, re-judged {actual} "
+                  f"{'OK' if actual == replay.counts else 'MISMATCH'}")
+            print(f"    simulate {simulate_ms:8.1f} ms, rejudge {rejudge_ms:6.2f} ms "
+                  f"({song_ms / rejudge_ms:,.0f}x real time for {song_ms / 1000:.1f}s of song)")
+            recorded.append(path)
+
+        batch = []
+        for index in range(args.replays):
+            path = os.path.join(directory, f'batch{index}.rgr')
+            shutil.copyfile(recorded[index % len(recorded)], path)
+            batch.append(path)
+        for workers in (1, args.workers):
+            start = time.perf_counter()
+            results = verify_files(batch, [CHART], workers=workers)
+            elapsed = time.perf_counter() - start
+            verified = sum(result['ok'] for result in results)
+            print(f"verify_files x{len(batch)} with {workers} worker(s): {elapsed:6.2f} s "
+                  f"({len(batch) / elapsed:,.0f} replays/s, {verified} verified)")
+    print(f"(cpu count {os.cpu_count()})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+""" 比較每次從 MP3 建立 pygame.mixer.Sound 與 SoundBank (解碼一次 + 磁碟快取) 的載入時間，
+以及連續擊中時原本 100 毫秒限制與保留聲道輪流播放實際播出的按鍵音效數
+用法 (在 pythonProject 目錄下): python benchmarks/bench_sound_bank.py [--repeat 5]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import pygame
+
+from sound_bank import SoundBank
+
+SOUNDS = {'start': 'start.mp3', 'countdown': 'countdown.mp3', 'hit': 'pop.mp3'}
+
+
+def best_ms(function, repeat):
+    """ 重複執行取最快的一次 (毫秒) """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def count_played(gap_ms, hits, gate_ms=None, bank=None):
+    """ 每 gap_ms 毫秒擊中一次，回傳實際開始播放的音效數
+    :param gate_ms: 原本的作法：距離上一次播放不到 gate_ms 毫秒就不播放
+    :param bank: 新的作法：以 SoundBank 的保留聲道播放
+    """
+    played = 0
+    last = -float('inf')
+    for index in range(hits):
+        now = index * gap_ms
+        if gate_ms is not None:
+            if now - last >= gate_ms:
+                last = now
+                played += 1
+        elif bank.play_hit('hit') is not None:
+            played += 1
+    return played
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    os.chdir(PROJECT_DIR)
+    pygame.mixer.init()
+    cache_dir = tempfile.mkdtemp(prefix='sound_cache_')
+    try:
+        for name, path in SOUNDS.items():
+            decode = best_ms(lambda: pygame.mixer.Sound(path), args.repeat)
+            SoundBank(cache_dir=cache_dir).load(name, path)  # 建立快取
+            cached = best_ms(lambda: SoundBank(cache_dir=cache_dir).load(name, path), args.repeat)
+            print(f"{path:14s}: decode MP3 {decode:8.3f} ms, cached PCM {cached:7.3f} ms ({decode / cached:5.1f}x)")
+        cold = best_ms(lambda: SoundBank(cache_dir=None).load_all(SOUNDS), args.repeat)
+        warm = best_ms(lambda: SoundBank(cache_dir=cache_dir).load_all(SOUNDS), args.repeat)
+        print(f"startup (all SFX): cold {cold:.3f} ms, warm cache {warm:.3f} ms")
+
+        bank = SoundBank(cache_dir=cache_dir)
+        bank.load_all(SOUNDS)
+        for gap_ms in (20, 50, 100):
+            hits = 40
+            gated = count_played(gap_ms, hits, gate_ms=100)
+            pooled = count_played(gap_ms, hits, bank=bank)
+            print(f"hits every {gap_ms:3d} ms: 100 ms gate played {gated:2d}/{hits}, "
+                  f"reserved channels played {pooled:2d}/{hits}")
+    finally:
+        shutil.rmtree(cache_dir)
+        pygame.mixer.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+""" 量測從啟動程式 (python main_test.py) 到開始選單第一個可操作畫面的時間
+每次啟動一個新的 Python 行程，在 MenuScreen 第一次畫出畫面時記錄時間後直接結束，
+同時記錄扣掉 import pygame (本身約 300 毫秒，無法避免) 之後遊戲自己的啟動時間，
+另外量測只 import main_test 的時間。第一次啟動 (建立音效快取等) 不列入計算
+用法 (在 pythonProject 目錄下): python benchmarks/bench_startup.py [--runs 7] [--project 其他版本的 pythonProject]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在子行程執行：攔截 MenuScreen.redraw，第一次畫出畫面時印出時間並結束
+FIRST_FRAME_PROBE = '''
+import os, runpy, sys, time
+sys.path.insert(0, os.getcwd())
+import pygame
+import menu_ui
+ready = time.perf_counter()
+redraw = menu_ui.MenuScreen.redraw
+def probe(self):
+    drawing = bool(self.dirty)
+    redraw(self)
+    if drawing:
+        print('FIRST_FRAME', time.time(), time.perf_counter() - ready, flush=True)
+        os._exit(0)
+menu_ui.MenuScreen.redraw = probe
+runpy.run_path('main_test.py', run_name='__main__')
+'''
+
+IMPORT_PROBE = '''
+import os, sys, time
+sys.path.insert(0, os.getcwd())
+start = time.perf_counter()
+import main_test
+print('IMPORT', time.perf_counter() - start, flush=True)
+'''
+
+
+def launch(project, code, marker):
+    """ 啟動子行程執行 code，回傳 (啟動時間, 輸出中 marker 後面的數值...) """
+    env = dict(os.environ, SDL_VIDEODRIVER=os.environ.get('SDL_VIDEODRIVER', 'dummy'),
+               SDL_AUDIODRIVER=os.environ.get('SDL_AUDIODRIVER', 'dummy'), PYGAME_HIDE_SUPPORT_PROMPT='1')
+    started = time.time()
+    output = subprocess.run([sys.executable, '-c', code], cwd=project, env=env, capture_output=True,
+                            text=True, timeout=60).stdout
+    for line in output.splitlines():
+        if line.startswith(marker):
+            return (started,) + tuple(float(value) for value in line.split()[1:])
+    raise RuntimeError(f'{marker} not reported:\n{output}')
+
+
+def describe(name, values):
+    values = sorted(values)
+    return f"{name}: p50 {values[len(values) // 2]:7.1f} ms, min {values[0]:7.1f} ms, max {values[-1]:7.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--project', default=PROJECT_DIR, help='要量測的 pythonProject 目錄')
+    args = parser.parse_args()
+
+    launch(args.project, FIRST_FRAME_PROBE, 'FIRST_FRAME')  # 暖身：建立音效快取、載入作業系統檔案快取
+    first_frame = []
+    own = []
+    imports = []
+    for _ in range(args.runs):
+        started, shown, after_pygame = launch(args.project, FIRST_FRAME_PROBE, 'FIRST_FRAME')
+        first_frame.append((shown - started) * 1000)
+        own.append(after_pygame * 1000)
+        imports.append(launch(args.project, IMPORT_PROBE, 'IMPORT')[1] * 1000)
+    print(f"{args.project} ({args.runs} runs)")
+    print('  ' + describe('launch -> first menu frame    ', first_frame))
+    print('  ' + describe('  after import pygame         ', own))
+    print('  ' + describe('import main_test              ', imports))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+""" 量測按下 Start 到遊戲開始 (第一個音符可以出現) 的時間
+情境：一啟動就按下 Start，所有資源都還沒載入 (音效不使用磁碟快取)
+    sequential : 原本的作法，依序載入音效、音符圖片、譜面與音樂後再倒數 3.5 秒
+    overlapped : AssetLoader 以執行緒池在背景載入，同時倒數 (menu.start_countdown 顯示進度)，
+                 另外記錄倒數畫面兩幀之間最長的間隔 (背景載入持有 GIL 時畫面會停住)
+--notes 指定合成譜面的音符數，0 則使用內建的譜面 (main_test.CHART_PATH)
+--format 合成譜面的格式：rgc (遊戲使用的二進位格式) 或 txt (Python literal，在另一個行程解析)
+用法 (在 pythonProject 目錄下): python benchmarks/bench_time_to_first_note.py [--notes 100000] [--format rgc]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+os.chdir(PROJECT_DIR)
+
+import main_test
+from asset_loader import AssetLoader
+from chart_format import read_any, save_chart
+
+COUNTDOWN_MS = 3500  # start_countdown 的長度 (3 秒倒數 + 0.5 秒)
+
+
+class TickClock:
+    """ 取代 pygame.time.Clock，記錄每次 tick 的時間 (倒數畫面每一幀呼叫一次) """
+    ticks = []
+
+    def __init__(self):
+        self.clock = RealPygameClock()
+
+    def tick(self, fps=0):
+        TickClock.ticks.append(time.perf_counter())
+        return self.clock.tick(fps)
+
+
+RealPygameClock = main_test.pygame.time.Clock
+
+
+def write_chart(path, count, seed=0):
+    """ 寫出合成譜面，副檔名 .rgc 為二進位格式，其他為 note_data.txt 的格式 """
+    rng = random.Random(seed)
+    now = 0.0
+    notes = []
+    for _ in range(count):
+        now += rng.uniform(1, 200)
+        notes.append([now, rng.randrange(4), 5])
+    if path.endswith('.rgc'):
+        save_chart(path, notes)
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('note_data=[' + ',\n'.join(f"[{time_ms!r}, {lane}, {speed}]" for time_ms, lane, speed in notes) + '\n]')
+
+
+def cold():
+    """ 清除已載入的音效與圖片，模擬剛啟動的狀態 """
+    main_test.app.sound_bank.sounds.clear()
+    main_test.app.images.clear()
+
+
+def sequential():
+    """ 原本的作法：依序載入後才倒數 (倒數以固定的 3.5 秒計算)
+    :return: (載入時間, 按下 Start 到開始的時間, None) 毫秒
+    """
+    cold()
+    start = time.perf_counter()
+    main_test.load_sounds()
+    main_test.load_note_sprites()
+    read_any(main_test.CHART_PATH)
+    main_test.read_file(main_test.MUSIC_PATH)
+    loading = (time.perf_counter() - start) * 1000
+    return loading, loading + COUNTDOWN_MS, None
+
+
+def overlapped():
+    """ 背景載入並同時倒數，實際執行 menu.start_countdown
+    :return: (載入時間, 按下 Start 到開始的時間, 畫面最長停頓) 毫秒
+    """
+    cold()
+    TickClock.ticks = []
+    main_test.pygame.time.Clock = TickClock
+    start = time.perf_counter()
+    loader = main_test.load_assets(AssetLoader())
+    loaded = {}
+    for name in main_test.GAME_ASSETS:
+        loader.futures[name].add_done_callback(lambda future, name=name: loaded.setdefault(name, time.perf_counter()))
+    try:
+        main_test.menu.start_countdown(main_test.screen, main_test.WIDTH, main_test.HEIGHT,
+                                       loader=loader, required=main_test.GAME_ASSETS)
+    finally:
+        main_test.pygame.time.Clock = RealPygameClock
+    total = (time.perf_counter() - start) * 1000
+    ticks = [start] + TickClock.ticks
+    stall = max(b - a for a, b in zip(ticks, ticks[1:])) * 1000
+    loading = (max(loaded.values()) - start) * 1000
+    loader.shutdown(wait=True)
+    return loading, total, stall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=100000)
+    parser.add_argument('--format', choices=('rgc', 'txt'), default='rgc')
+    args = parser.parse_args()
+
+    main_test.setup()
+    main_test.app.sound_bank.cache_dir = None  # 每次都從 MP3 解碼
+    main_test.sound_bank.play = lambda name: None  # 不需要真的播放
+    with tempfile.TemporaryDirectory() as directory:
+        if args.notes:
+            main_test.CHART_PATH = os.path.join(directory, 'chart.' + args.format)
+            write_chart(main_test.CHART_PATH, args.notes)
+        print(f"chart {main_test.CHART_PATH} ({len(read_any(main_test.CHART_PATH))} notes)")
+        for name, function in (('sequential', sequential), ('overlapped', overlapped)):
+            loading, total, stall = function()
+            print(f"{name:10s}: assets loaded after {loading:7.1f} ms, Start -> game {total:7.1f} ms "
+                  f"(countdown {COUNTDOWN_MS} ms)" + (f", longest frame gap {stall:6.1f} ms" if stall else ""))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+""" 比較切換畫面 / 重新開始時原本重複初始化的成本與 AppContext 共用資源的成本
+原本：每次進入開始選單 set_mode、結算畫面 pygame.init()、每一局 mixer.init() 並重新載入音符圖片
+現在：都由 AppContext 初始化一次，音符圖片載入後快取
+另外量測重複切換後目前記憶體 (RSS) 的增加量
+用法 (在 pythonProject 目錄下): python benchmarks/bench_transitions.py [--cycles 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import pygame
+
+from app_context import AppContext
+
+SIZE = (900, 600)
+
+
+def legacy_transition():
+    """ 原本一次「結算 -> 開始選單 -> 開始遊戲」重複做的初始化 """
+    pygame.init()  # show_result_menu
+    pygame.display.set_mode(SIZE)  # show_start_menu
+    image = pygame.image.load('note.png')  # Score
+    pygame.transform.scale(image, (30, 30))
+    pygame.mixer.init()  # SoundManager
+
+
+def context_transition(app):
+    """ 共用資源時同樣的切換 """
+    app.image('note.png')
+    app.image('note.png', (30, 30))
+
+
+def best_ms(function, repeat):
+    """ 重複執行取中位數 (毫秒) """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return sorted(times)[len(times) // 2]
+
+
+def rss_kb():
+    """ 目前的常駐記憶體 (KB，Linux) """
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--cycles', type=int, default=200)
+    args = parser.parse_args()
+
+    os.chdir(PROJECT_DIR)
+    start = time.perf_counter()
+    app = AppContext(SIZE, 'bench')
+    print(f"AppContext start-up: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    before = rss_kb()
+    legacy = best_ms(legacy_transition, args.cycles)
+    legacy_growth = rss_kb() - before
+    before = rss_kb()
+    shared = best_ms(lambda: context_transition(app), args.cycles)
+    shared_growth = rss_kb() - before
+    print(f"transition (legacy re-init): p50 {legacy:7.3f} ms, RSS {legacy_growth:+d} KB over {args.cycles} cycles")
+    print(f"transition (AppContext)    : p50 {shared:7.3f} ms, RSS {shared_growth:+d} KB over {args.cycles} cycles")
+    app.close()
+
+
+if __name__ == '__main__':
+    main()
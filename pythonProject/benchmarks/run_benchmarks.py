@@ -0,0 +1,384 @@
+""" 渲染與判定熱點的基準測試套件 (無頭執行)
+
+以合成譜面 (1k / 10k / 100k 個音符，平均分布在 60 秒內) 與逐步加大的效果風暴，
+分別量測 GameStart 每幀會執行的熱點：
+    spawn               ChartScheduler.due + NoteManager.input_note (GameStart 的音符生成迴圈)
+    update_notes        NoteManager.update_notes
+    draw_notes          NoteManager.draw_notes
+    check_hit           NoteManager.check_hit (JudgmentEngine 判定 + 移除畫面上的音符)，每次按鍵
+    hit_results_update  HitResultManager.update
+    hit_results_draw    HitResultManager.draw
+    hit_circles_draw    HitCircleEffectManager.draw
+    playfield_fill      原本每幀的背景：fill + 判定線 + 四個按鍵標籤
+    playfield_layer     預先組合好的靜態畫面 (JudgmentLine.get_layer)，一次 blit
+    game_loop           以 headless.simulate 跑完整的 GameStart (髒矩形繪製)，每幀
+    game_loop_full      同上，但每幀整個畫面重畫 (fill + flip)
+結果以 JSON 輸出，並與 benchmarks/baseline.json 比較，p50 退步超過容許範圍時結束碼為 1。
+用法 (在 pythonProject 目錄下):
+    python benchmarks/run_benchmarks.py                        # 執行並與基準比較
+    python benchmarks/run_benchmarks.py --output results.json  # 另外輸出這次的結果
+    python benchmarks/run_benchmarks.py --update-baseline      # 以這次的結果更新基準
+    python benchmarks/run_benchmarks.py --only draw_notes check_hit --sizes 1000
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+os.chdir(PROJECT_DIR)  # main_test 以相對路徑載入素材
+
+import numpy as np
+import pygame
+
+import headless
+import main_test
+from dirty_renderer import DirtyRenderer
+from frame_profiler import FrameProfiler
+from game_clock import VirtualClock
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+CHART_SIZES = (1000, 10000, 100000)
+EFFECT_STORMS = (10, 100, 1000)
+DURATION_MS = 60000  # 合成譜面的長度
+SPEED = 5
+FPS = 120
+WARMUP_MS = 2000  # 開始量測前先跑的歌曲時間，讓畫面上的音符達到穩定的密度
+MEASURE_START_MS = 20000  # 從歌曲的這個時間開始量測
+RESULT_TEXTS = (('perfect', main_test.GREEN), ('great', main_test.YELLOW), ('miss', main_test.RED))
+
+
+def synthetic_chart(count, duration_ms=DURATION_MS, seed=0):
+    """ 產生 count 個音符隨機分布在 duration_ms 內的譜面 [ [time, position, speed], ... ] """
+    rng = random.Random(seed)
+    chart = [[rng.uniform(0, duration_ms), rng.randrange(4), SPEED] for _ in range(count)]
+    chart.sort(key=lambda note: note[0])
+    return chart
+
+
+def use_virtual_clock(now_ms=0.0):
+    """ 把 main_test 的時鐘換成 VirtualClock (效果動畫的時間也由它決定)，回傳原本的時鐘 """
+    previous = main_test.game_clock
+    clock = VirtualClock(FPS)
+    clock.now = now_ms
+    main_test.game_clock = clock
+    return previous
+
+
+class NotePlayfield:
+    """ 與 GameStart 相同的 NoteManager 與各種效果管理器組合 """
+    def __init__(self, chart):
+        score = main_test.Score(None, chart, 'note.png')
+        self.hit_result_manager = main_test.HitResultManager(font_size=48)
+        self.hit_circle_manager = main_test.HitCircleEffectManager(main_test.hit_circle_atlas)
+        self.combo_manager = main_test.ComboEffectManager(font_size=48)
+        self.note_manager = main_test.NoteManager(
+            main_test.note_positions, score.scaled_image, self.hit_result_manager,
+            self.hit_circle_manager, self.combo_manager, note_data=chart)
+        self.scheduler = main_test.ChartScheduler(chart)
+
+    def spawn(self, now_ms):
+        """ GameStart 的音符生成迴圈 """
+        for note_time, position, speed in self.scheduler.due(now_ms):
+            self.note_manager.input_note(note_time, position, speed)
+
+
+def frame_times(frames, start_ms=MEASURE_START_MS):
+    """ 量測用的每幀歌曲時間 """
+    frame_ms = 1000 / FPS
+    return [start_ms + index * frame_ms for index in range(frames)]
+
+
+def warm_up(field, start_ms=MEASURE_START_MS):
+    """ 從 start_ms - WARMUP_MS 開始跑到 start_ms (不計時)，讓畫面上的音符數量穩定 """
+    field.scheduler.seek(start_ms - WARMUP_MS)
+    for now in frame_times(int(WARMUP_MS * FPS / 1000), start_ms - WARMUP_MS):
+        field.spawn(now)
+        field.note_manager.update_notes(now)
+
+
+def bench_note_path(chart, frames, screen):
+    """ 每幀的 spawn / update_notes / draw_notes 各自計時 """
+    field = NotePlayfield(chart)
+    warm_up(field)
+    samples = {'spawn': [], 'update_notes': [], 'draw_notes': []}
+    counter = time.perf_counter_ns
+    note_manager = field.note_manager
+    for now in frame_times(frames):
+        screen.fill(main_test.BLACK)
+        start = counter()
+        field.spawn(now)
+        spawned = counter()
+        note_manager.update_notes(now)
+        updated = counter()
+        note_manager.draw_notes(screen)
+        drawn = counter()
+        samples['spawn'].append(spawned - start)
+        samples['update_notes'].append(updated - spawned)
+        samples['draw_notes'].append(drawn - updated)
+    return samples
+
+
+def bench_check_hit(chart, frames, screen):
+    """ 依自動演奏的按鍵時間呼叫 check_hit，每次按鍵計時 (效果更新不計時) """
+    previous = use_virtual_clock(MEASURE_START_MS)
+    try:
+        field = NotePlayfield(chart)
+        warm_up(field)
+        presses = sorted((press_time, headless.LANE_KEYS.index(key))
+                         for press_time, event_type, key in headless.autoplay_events(chart, jitter_ms=40)
+                         if event_type == pygame.KEYDOWN and press_time >= MEASURE_START_MS)
+        cursor = 0
+        samples = []
+        counter = time.perf_counter_ns
+        note_manager = field.note_manager
+        for now in frame_times(frames):
+            main_test.game_clock.now = now
+            field.spawn(now)
+            note_manager.update_notes(now)
+            while cursor < len(presses) and presses[cursor][0] <= now:
+                press_time, lane = presses[cursor]
+                start = counter()
+                note_manager.check_hit(lane, press_time)
+                samples.append(counter() - start)
+                cursor += 1
+            field.hit_result_manager.update()
+            field.hit_circle_manager.update()
+    finally:
+        main_test.game_clock = previous
+    return {'check_hit': samples}
+
+
+def bench_effect_storm(count, frames, screen):
+    """ 畫面上維持 count 個命中文字與 count 個命中圓環，每幀計時 update / draw
+    效果結束後立刻補上新的，數量在量測期間保持不變
+    """
+    previous = use_virtual_clock(0.0)
+    try:
+        rng = random.Random(count)
+        hit_result_manager = main_test.HitResultManager(font_size=48, pool_size=count)
+        hit_circle_manager = main_test.HitCircleEffectManager(main_test.hit_circle_atlas, pool_size=count)
+        samples = {'hit_results_update': [], 'hit_results_draw': [], 'hit_circles_draw': []}
+        counter = time.perf_counter_ns
+        clock = main_test.game_clock
+        for frame in range(frames):
+            while len(hit_result_manager.results) < count:
+                text, color = rng.choice(RESULT_TEXTS)
+                hit_result_manager.add_result(text, (rng.uniform(0, 800), rng.uniform(50, 550)), color)
+            while len(hit_circle_manager.effects) < count:
+                position = (rng.choice(list(main_test.note_positions.values())), rng.uniform(400, 600))
+                hit_circle_manager.add_effect(position, main_test.YELLOW)
+            screen.fill(main_test.BLACK)
+            start = counter()
+            hit_result_manager.update()
+            updated = counter()
+            hit_result_manager.draw(screen)
+            drawn = counter()
+            hit_circle_manager.update()
+            circles_start = counter()
+            hit_circle_manager.draw(screen)
+            circles_drawn = counter()
+            samples['hit_results_update'].append(updated - start)
+            samples['hit_results_draw'].append(drawn - updated)
+            samples['hit_circles_draw'].append(circles_drawn - circles_start)
+            clock.tick()
+    finally:
+        main_test.game_clock = previous
+    return samples
+
+
+def bench_playfield(frames, screen):
+    """ 比較每幀重畫背景、判定線與按鍵標籤，和一次 blit 快取的靜態畫面 """
+    judgment_line = main_test.JudgmentLine()
+    layer = judgment_line.get_layer(screen.get_size())
+    width = screen.get_width()
+    samples = {'playfield_fill': [], 'playfield_layer': []}
+    counter = time.perf_counter_ns
+    for frame in range(frames):
+        start = counter()
+        screen.fill(main_test.BLACK)
+        pygame.draw.rect(screen, main_test.WHITE, pygame.Rect(0, judgment_line.y_position + 20, width, 3))
+        for i, label in enumerate(['D', 'F', 'J', 'K']):
+            text = main_test.text_cache.render(label, 36, main_test.WHITE)
+            screen.blit(text, (main_test.note_positions[i], judgment_line.y_position + 20))
+        filled = counter()
+        screen.blit(layer, (0, 0))
+        blitted = counter()
+        samples['playfield_fill'].append(filled - start)
+        samples['playfield_layer'].append(blitted - filled)
+    return samples
+
+
+def bench_game_loop(chart, frames, screen, dirty=True):
+    """ 取譜面前 frames 幀內出現的音符，以 headless.simulate 跑完整的 GameStart，每幀計時 """
+    end_ms = frames * 1000 / FPS
+    part = [note for note in chart if note[0] < end_ms]
+    profiler = FrameProfiler(window=None)
+    renderer = DirtyRenderer(screen, enabled=dirty)
+    headless.simulate(part, headless.autoplay_events(part), FPS, tail_ms=0, profiler=profiler, renderer=renderer)
+    return {'game_loop' if dirty else 'game_loop_full': [frame['total'] for frame in profiler.trace]}
+
+
+def bench_game_loop_full(chart, frames, screen):
+    return bench_game_loop(chart, frames, screen, dirty=False)
+
+
+NOTE_CASES = {
+    'spawn': bench_note_path,
+    'update_notes': bench_note_path,
+    'draw_notes': bench_note_path,
+    'check_hit': bench_check_hit,
+    'game_loop': bench_game_loop,
+    'game_loop_full': bench_game_loop_full,
+}
+STORM_CASES = ('hit_results_update', 'hit_results_draw', 'hit_circles_draw')
+PLAYFIELD_CASES = ('playfield_fill', 'playfield_layer')
+UNITS = {'check_hit': 'ms/hit'}
+
+
+def statistics(samples_ns):
+    """ 將 ns 取樣轉成 {samples, mean_ms, p50_ms, p95_ms, max_ms} """
+    values = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    if values.size == 0:
+        return {'samples': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+    return {
+        'samples': int(values.size),
+        'mean_ms': float(values.mean()),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'max_ms': float(values.max()),
+    }
+
+
+def run_suite(cases, sizes, storms, frames, repeat):
+    """ 執行所有選擇的項目，每一項跑 repeat 次取 p50 最小的一次
+    :return: {'項目[規模]': {unit, samples, mean_ms, p50_ms, p95_ms, max_ms}}
+    """
+    screen = main_test.setup().screen
+    jobs = []
+    note_functions = []
+    for case in cases:
+        function = NOTE_CASES.get(case)
+        if function is not None and function not in note_functions:
+            note_functions.append(function)
+    for size in sizes:
+        chart = synthetic_chart(size)
+        for function in note_functions:
+            jobs.append((size, lambda frames, chart=chart, function=function: function(chart, frames, screen)))
+    if any(case in STORM_CASES for case in cases):
+        for count in storms:
+            jobs.append((count, lambda frames, count=count: bench_effect_storm(count, frames, screen)))
+    if any(case in PLAYFIELD_CASES for case in cases):
+        jobs.append(('%dx%d' % screen.get_size(), lambda frames: bench_playfield(frames, screen)))
+
+    results = {}
+    for size, job in jobs:
+        best = {}
+        for _ in range(repeat):
+            for case, samples in job(frames).items():
+                if case not in cases:
+                    continue
+                stats = statistics(samples)
+                key = f'{case}[{size}]'
+                if key not in best or stats['p50_ms'] < best[key]['p50_ms']:
+                    best[key] = dict(unit=UNITS.get(case, 'ms/frame'), **stats)
+        for key, stats in best.items():
+            results[key] = stats
+            print(f"{key:<28} p50 {stats['p50_ms']:8.4f}  p95 {stats['p95_ms']:8.4f}  "
+                  f"mean {stats['mean_ms']:8.4f} {stats['unit']} ({stats['samples']} samples)", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """ 與基準比較 p50，慢了超過 tolerance 倍數且差距超過 min_delta_ms 視為退步
+    :return: 退步的項目 [(key, 基準 p50, 這次 p50), ...]
+    """
+    regressions = []
+    print(f"\n{'case':<28}{'baseline':>10}{'current':>10}{'ratio':>8}")
+    for key, stats in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:<28}{'-':>10}{stats['p50_ms']:10.4f}{'new':>8}")
+            continue
+        ratio = stats['p50_ms'] / base['p50_ms'] if base['p50_ms'] else 1.0
+        regressed = (stats['p50_ms'] > base['p50_ms'] * (1 + tolerance)
+                     and stats['p50_ms'] - base['p50_ms'] > min_delta_ms)
+        print(f"{key:<28}{base['p50_ms']:10.4f}{stats['p50_ms']:10.4f}{ratio:7.2f}x"
+              f"{'  <-- REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append((key, base['p50_ms'], stats['p50_ms']))
+    return regressions
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+    }
+
+
+def main():
+    all_cases = list(NOTE_CASES) + list(STORM_CASES) + list(PLAYFIELD_CASES)
+    parser = argparse.ArgumentParser(description='rendering / judgment hot path benchmarks')
+    parser.add_argument('--only', nargs='+', choices=all_cases, default=all_cases, help='只執行這些項目')
+    parser.add_argument('--sizes', type=int, nargs='+', default=CHART_SIZES, help='合成譜面的音符數')
+    parser.add_argument('--storms', type=int, nargs='+', default=EFFECT_STORMS, help='效果風暴的效果數')
+    parser.add_argument('--frames', type=int, default=600, help='每一項量測的幀數')
+    parser.add_argument('--repeat', type=int, default=3, help='每一項重複次數 (取 p50 最小的一次)')
+    parser.add_argument('--output', help='輸出這次結果的 JSON 檔')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='基準結果的 JSON 檔')
+    parser.add_argument('--update-baseline', action='store_true', help='以這次的結果覆寫基準')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='容許的變慢比例 (0.5 = 慢 50%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.025,
+                        help='差距小於此值 (毫秒) 不視為退步，避免極短的項目因雜訊誤報')
+    args = parser.parse_args()
+
+    results = run_suite(args.only, args.sizes, args.storms, args.frames, args.repeat)
+    report = {'environment': environment(), 'frames': args.frames, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"results written to {args.output}")
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as file:
+                baseline = json.load(file).get('results', {})
+        baseline.update(results)
+        with open(args.baseline, 'w') as file:
+            json.dump(dict(report, results=baseline), file, indent=2)
+        print(f"baseline updated: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline, 'r') as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline.get('results', {}), args.tolerance, args.min_delta_ms)
+    if regressions:
+        print('\n' + '!' * 60)
+        print(f"PERFORMANCE REGRESSION: {len(regressions)} case(s) slower than baseline "
+              f"by more than {args.tolerance:.0%}")
+        for key, base, current in regressions:
+            print(f"  {key}: {base:.4f} ms -> {current:.4f} ms ({current / base:.2f}x)")
+        print('!' * 60)
+        return 1
+    print('\nno regressions against baseline')
+    return 0
+
+
+if __name__ == '__main__':
+    code = main()
+    pygame.quit()
+    sys.exit(code)
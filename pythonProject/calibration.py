@@ -0,0 +1,125 @@
+import json
+import os
+
+CALIBRATION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'calibration.json')
+METRONOME_BPM = 100
+METRONOME_BEATS = 24  # 節拍器總拍數
+WARMUP_BEATS = 4  # 前幾拍讓玩家抓節奏，不列入計算
+OUTLIER_MADS = 3.0  # 與中位數差距超過幾倍 MAD 視為異常值
+MIN_SPREAD_MS = 10.0  # MAD 太小 (幾乎每拍都一樣) 時的最小容許範圍
+MIN_TAPS = 8  # 少於這個數量的有效敲擊不更新校正值
+
+
+def tap_offsets(beat_times, tap_times):
+    """ 每次敲擊與最近一拍的時間差 (毫秒，正值代表敲得比聲音晚)
+    :param beat_times: 每一拍播放的時間 (毫秒)，由小到大
+    :param tap_times: 每次敲擊的時間 (毫秒)
+    """
+    offsets = []
+    if not beat_times:
+        return offsets
+    for tap in tap_times:
+        nearest = min(beat_times, key=lambda beat: abs(tap - beat))
+        offsets.append(tap - nearest)
+    return offsets
+
+
+def estimate_offset(offsets, outlier_mads=OUTLIER_MADS, min_spread=MIN_SPREAD_MS):
+    """ 排除異常值後的平均延遲與變異數
+    以中位數與 MAD (中位數絕對偏差) 排除漏拍、多按造成的異常值，再計算剩下的平均與變異數
+    :param offsets: 每次敲擊的時間差 (毫秒)
+    :return: {'offset', 'variance', 'std', 'taps', 'rejected'}，沒有資料時為 None
+    """
+    if not offsets:
+        return None
+    ordered = sorted(offsets)
+    median = ordered[len(ordered) // 2]
+    deviations = sorted(abs(offset - median) for offset in offsets)
+    mad = deviations[len(deviations) // 2]
+    limit = max(outlier_mads * 1.4826 * mad, min_spread)  # 1.4826 * MAD 約等於常態分布的標準差
+    kept = [offset for offset in offsets if abs(offset - median) <= limit]
+    mean = sum(kept) / len(kept)
+    variance = sum((offset - mean) ** 2 for offset in kept) / len(kept)
+    return {
+        'offset': mean,
+        'variance': variance,
+        'std': variance ** 0.5,
+        'taps': len(kept),
+        'rejected': len(offsets) - len(kept),
+    }
+
+
+def load_offset(path=CALIBRATION_PATH):
+    """ 讀取儲存的延遲校正 (毫秒)，沒有校正過或檔案損壞時為 0 """
+    try:
+        with open(path, encoding='utf-8') as f:
+            return float(json.load(f)['offset'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return 0.0
+
+
+def save_result(result, path=CALIBRATION_PATH):
+    """ 儲存校正結果 (estimate_offset 的回傳值) """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+
+
+class Calibration:
+    """ 延遲校正
+    節拍器以固定間隔播放，記錄每一拍實際聽到的時間 (播放時間加上音訊輸出延遲) 與玩家每次敲擊的時間
+    (同一個單調時鐘)，略過開頭幾拍後，以每次敲擊與最近一拍的時間差估計延遲。
+    音訊輸出延遲由 AudioClock 負責 (遊戲中的歌曲時間已經扣除)，這裡的延遲只包含鍵盤與玩家的反應，
+    遊戲中判定時從按鍵時間扣除，不修改譜面
+    """
+    def __init__(self, bpm=METRONOME_BPM, beats=METRONOME_BEATS, warmup=WARMUP_BEATS):
+        """
+        :param bpm: 節拍器速度
+        :param beats: 總拍數
+        :param warmup: 不列入計算的開頭拍數
+        """
+        self.interval = 60000 / bpm  # 每拍間隔 (毫秒)
+        self.beats = beats
+        self.warmup = warmup
+        self.beat_times = []  # 每一拍實際聽到的時間 (毫秒)
+        self.tap_times = []  # 每次敲擊的時間 (毫秒)
+        self.start = None
+
+    def begin(self, now_ms):
+        """ 開始校正，第一拍在一個間隔之後 """
+        self.start = now_ms
+        self.beat_times = []
+        self.tap_times = []
+
+    def due_beat(self, now_ms, latency_ms=0.0):
+        """ 是否該播放下一拍 (回傳 True 時已記錄這一拍的時間)
+        :param latency_ms: 音訊輸出延遲，這一拍在 now_ms + latency_ms 時才聽得到
+        """
+        if self.start is None or len(self.beat_times) >= self.beats:
+            return False
+        if now_ms >= self.start + self.interval * (len(self.beat_times) + 1):
+            self.beat_times.append(now_ms + latency_ms)
+            return True
+        return False
+
+    def tap(self, time_ms):
+        """ 記錄一次敲擊
+        從第一個計分拍播放之前開始記錄 (提早敲的也要保留，否則結果偏晚)，
+        對到熱身拍的敲擊由 estimate_offset 當作異常值排除
+        """
+        if len(self.beat_times) >= self.warmup:
+            self.tap_times.append(time_ms)
+
+    def finished(self, now_ms):
+        """ 最後一拍之後再等半拍讓玩家敲完 """
+        return len(self.beat_times) >= self.beats and now_ms >= self.beat_times[-1] + self.interval / 2
+
+    def progress(self):
+        """ 已播放的拍數 / 總拍數 """
+        return len(self.beat_times), self.beats
+
+    def result(self):
+        """ 校正結果 (見 estimate_offset)，有效敲擊太少時為 None """
+        result = estimate_offset(tap_offsets(self.beat_times[self.warmup:], self.tap_times))
+        if result is None or result['taps'] < MIN_TAPS:
+            return None
+        return result
@@ -0,0 +1,159 @@
+""" 二進位譜面格式 (.rgc)
+
+檔案結構 (little-endian)：
+    header 16 bytes : magic b'RGCH' | version uint16 | reserved uint16 | count uint32 | reserved uint32
+    time   float64[count] : 音符出現時間 (毫秒)，依時間排序
+    speed  float32[count] : 下落速度 (120 FPS 下每幀的像素)
+    lane   uint8[count]   : 0 (D), 1 (F), 2 (J), 3 (K)
+欄位依大小排列，每個欄位都對齊自己的寬度，可以直接用 numpy.frombuffer 在 mmap 上零複製讀取。
+
+用法 (在 pythonProject 目錄下):
+    python chart_format.py convert note_data.txt note_data.rgc
+    python chart_format.py convert game_notes.json game_notes.rgc
+    python chart_format.py info note_data.rgc
+"""
+import argparse
+import ast
+import json
+import mmap
+import struct
+
+import numpy as np
+
+MAGIC = b'RGCH'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+TIME_DTYPE = np.dtype('<f8')
+SPEED_DTYPE = np.dtype('<f4')
+LANE_DTYPE = np.dtype('u1')
+JSON_FPS = 120  # game_notes.json 的時間以幀數表示，基準為 120 FPS
+
+
+class Chart:
+    """ 載入後的譜面，time / lane / speed 三個欄位都是 NumPy 陣列 (mmap 載入時為唯讀視圖) """
+    def __init__(self, time, lane, speed, source=None):
+        """
+        :param time: 出現時間 (毫秒)
+        :param lane: 按鍵列
+        :param speed: 下落速度
+        :param source: 保持 mmap 等底層緩衝區存活，陣列使用期間不能關閉
+        """
+        self.time = time
+        self.lane = lane
+        self.speed = speed
+        self._source = source
+
+    def __len__(self):
+        return len(self.time)
+
+    def to_note_data(self):
+        """ 轉成遊戲使用的 [ [time, position, speed], ... ] 格式 """
+        return [list(note) for note in zip(self.time.tolist(), self.lane.tolist(), self.speed.tolist())]
+
+    def close(self):
+        """ 釋放 mmap，之後不可再使用欄位陣列 """
+        if isinstance(self._source, mmap.mmap):
+            self.time = self.lane = self.speed = None
+            self._source.close()
+        self._source = None
+
+
+def pack_chart(note_data):
+    """ 將 [ (time, position, speed), ... ] 打包成二進位格式的 bytes """
+    chart = np.asarray(note_data, dtype=np.float64).reshape(-1, 3)
+    chart = chart[np.argsort(chart[:, 0], kind='stable')]
+    count = len(chart)
+    return b''.join((
+        HEADER.pack(MAGIC, VERSION, 0, count, 0),
+        chart[:, 0].astype(TIME_DTYPE).tobytes(),
+        chart[:, 2].astype(SPEED_DTYPE).tobytes(),
+        chart[:, 1].astype(LANE_DTYPE).tobytes(),
+    ))
+
+
+def save_chart(path, note_data):
+    """ 將譜面寫成二進位格式檔案 """
+    with open(path, 'wb') as file:
+        file.write(pack_chart(note_data))
+
+
+def unpack_chart(buffer, source=None):
+    """ 從 bytes / mmap 等緩衝區零複製解析譜面 """
+    magic, version, _, count, _ = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError('not a chart file (bad magic)')
+    if version != VERSION:
+        raise ValueError(f'unsupported chart version {version}')
+    offset = HEADER.size
+    time = np.frombuffer(buffer, TIME_DTYPE, count, offset)
+    offset += count * TIME_DTYPE.itemsize
+    speed = np.frombuffer(buffer, SPEED_DTYPE, count, offset)
+    offset += count * SPEED_DTYPE.itemsize
+    lane = np.frombuffer(buffer, LANE_DTYPE, count, offset)
+    return Chart(time, lane, speed, source if source is not None else buffer)
+
+
+def load_chart(path, use_mmap=True):
+    """ 載入二進位譜面
+    :param use_mmap: True 時以 mmap 映射檔案 (零複製)，False 時一次讀入記憶體
+    """
+    with open(path, 'rb') as file:
+        if not use_mmap:
+            return unpack_chart(file.read())
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return unpack_chart(mapped, mapped)
+
+
+def read_note_data_literal(path, name='note_data'):
+    """ 從 Python 原始碼 (例如 note_data.txt) 讀出 note_data=[...] 的譜面，不執行程式 """
+    with open(path, 'r', encoding='utf-8') as file:
+        source = file.read()
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.Assign) and any(
+                isinstance(target, ast.Name) and target.id == name for target in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError(f'{path} has no {name} assignment')
+
+
+def read_game_notes_json(path, fps=JSON_FPS):
+    """ 讀取 jsontramform.py 產生的 game_notes.json (出現時間以幀數表示) """
+    with open(path, 'r') as file:
+        notes = json.load(file)
+    return [[note['appearance_time'] * 1000 / fps, note['position'], note['speed']] for note in notes]
+
+
+def read_any(path):
+    """ 依副檔名讀取任一種譜面來源 """
+    if path.endswith('.rgc'):
+        return load_chart(path, use_mmap=False).to_note_data()
+    if path.endswith('.json'):
+        return read_game_notes_json(path)
+    return read_note_data_literal(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='binary chart converter')
+    commands = parser.add_subparsers(dest='command', required=True)
+    convert = commands.add_parser('convert', help='note_data.txt / game_notes.json -> .rgc')
+    convert.add_argument('source')
+    convert.add_argument('target')
+    info = commands.add_parser('info', help='show a .rgc chart summary')
+    info.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        note_data = read_any(args.source)
+        save_chart(args.target, note_data)
+        print(f"{args.source} -> {args.target}: {len(note_data)} notes")
+    else:
+        chart = load_chart(args.path)
+        print(f"{args.path}: {len(chart)} notes")
+        if len(chart):
+            print(f"time {chart.time[0]:.1f} ~ {chart.time[-1]:.1f} ms, "
+                  f"lanes {np.bincount(chart.lane, minlength=4).tolist()}, "
+                  f"speed {chart.speed.min():g} ~ {chart.speed.max():g}")
+        chart.close()
+
+
+if __name__ == '__main__':
+    main()
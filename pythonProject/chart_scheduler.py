@@ -0,0 +1,45 @@
+import bisect
+
+
+class ChartScheduler:
+    """ 譜面排程器
+    將依時間排序的譜面只整理一次，之後以游標前進的方式取出到時間的音符，
+    取代每幀掃描整份譜面再 list.remove 的作法
+    """
+    def __init__(self, note_data):
+        """
+        :param note_data: 音符數據 [ (time, position, speed), ... ]，不需事先排序
+        """
+        self.notes = sorted((tuple(note) for note in note_data), key=lambda note: note[0])
+        self.times = [note[0] for note in self.notes]  # 給二分搜尋用的出現時間
+        self.cursor = 0  # 下一個尚未生成的音符索引
+
+    def due(self, now_ms):
+        """ 依序產生所有出現時間 <= now_ms 且尚未生成的音符
+        每個音符只會被取出一次，攤銷後每個音符 O(1)
+        :param now_ms: 目前的歌曲時間（毫秒）
+        """
+        notes = self.notes
+        end = len(notes)
+        while self.cursor < end and notes[self.cursor][0] <= now_ms:
+            note = notes[self.cursor]
+            self.cursor += 1  # 先移動游標，呼叫端中途 break 也不會重複生成
+            yield note
+
+    def seek(self, now_ms):
+        """ 跳到指定時間（暫停後繼續、跳轉），出現時間早於 now_ms 的音符視為已生成
+        :param now_ms: 目標歌曲時間（毫秒）
+        """
+        self.cursor = bisect.bisect_left(self.times, now_ms)
+
+    def reset(self):
+        """ 回到譜面開頭 """
+        self.cursor = 0
+
+    def remaining(self):
+        """ 尚未生成的音符數量 """
+        return len(self.notes) - self.cursor
+
+    def finished(self):
+        """ 是否所有音符都已生成 """
+        return self.cursor >= len(self.notes)
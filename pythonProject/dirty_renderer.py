@@ -0,0 +1,106 @@
+import pygame
+
+
+class DirtyRenderer:
+    """ 髒矩形繪製
+    每幀只在上一幀畫過東西的矩形內還原背景，再把這一幀有變化的矩形用 pygame.display.update(rects) 送出，
+    不再整個畫面 fill + flip。靜態的內容 (判定線、按鍵標籤) 要事先畫進背景。
+    會動的東西 (音符、效果) 用 track 登記，每幀都會更新；
+    HUD 文字用 track_hud 登記，只有文字或位置改變時才更新。
+    矩形重疊太多 (例如大量命中效果) 時逐一還原反而比較慢，這一幀改成整個畫面重畫。
+    enabled 為 False 時退回原本的作法：每幀貼上整個背景並 flip
+    """
+    def __init__(self, screen, background=None, enabled=True, full_ratio=0.5):
+        """
+        :param screen: 顯示用的 Surface
+        :param background: 背景 Surface (與畫面同大小)，None 則為黑色
+        :param enabled: 是否使用髒矩形
+        :param full_ratio: 要還原的矩形總面積超過畫面的這個比例時，這一幀整個畫面重畫
+        """
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.enabled = enabled
+        self.full_limit = full_ratio * self.screen_rect.width * self.screen_rect.height
+        self.background = None
+        self.full_redraw = True  # 這一幀是否整個畫面重畫 (第一幀、換背景後、矩形太多時)
+        self.drawn = []  # 這一幀會動的東西畫過的矩形，下一幀要還原背景
+        self.dirty = []  # 這一幀要送到顯示器的矩形
+        self.hud = {}  # HUD 名稱 -> (Surface, 矩形)
+        self.previous_hud = {}
+        self.last_pixels = 0  # 最近一幀送出的像素數
+        self.total_pixels = 0
+        self.frames = 0
+        if background is None:
+            background = pygame.Surface(self.screen_rect.size)
+            background.fill((0, 0, 0))
+        self.set_background(background)
+
+    def set_background(self, background):
+        """ 更換背景，下一幀會整個畫面重畫 """
+        self.background = background
+        self.full_redraw = True
+
+    def begin_frame(self):
+        """ 一幀開始：還原上一幀畫過的區域 (停用或需要整個重畫時貼上整個背景) """
+        screen = self.screen
+        if self.enabled and not self.full_redraw:
+            area = sum(rect.width * rect.height for rect in self.drawn)
+            self.full_redraw = area > self.full_limit
+        if not self.enabled or self.full_redraw:
+            screen.blit(self.background, (0, 0))
+            self.dirty = []
+        else:
+            background = self.background
+            for rect in self.drawn:
+                screen.blit(background, rect, rect)
+            for surface, rect in self.hud.values():
+                screen.blit(background, rect, rect)
+            self.dirty = self.drawn  # 還原過的區域都要更新
+        self.drawn = []
+        self.previous_hud = self.hud
+        self.hud = {}
+
+    def track(self, rects):
+        """ 登記這一幀會動的東西畫過的矩形 (None 則忽略) """
+        if self.enabled and rects:
+            self.drawn.extend(rects)
+            self.dirty.extend(rects)
+
+    def track_hud(self, name, surface, rect):
+        """ 登記 HUD 文字，Surface 或位置與上一幀不同時才更新
+        :param name: HUD 名稱 (例如 'score')
+        :param surface: 這一幀繪製的 Surface (文字改變時會是新的物件)
+        :param rect: 繪製的矩形
+        """
+        if not self.enabled:
+            return
+        self.hud[name] = (surface, rect)
+        previous = self.previous_hud.get(name)
+        if previous is None or previous[0] is not surface or previous[1] != rect:
+            self.dirty.append(rect)
+            if previous is not None:
+                self.dirty.append(previous[1])
+
+    def present(self):
+        """ 一幀結束：把有變化的區域送到顯示器，回傳送出的像素數 """
+        if not self.enabled or self.full_redraw:
+            pygame.display.flip()
+            pixels = self.screen_rect.width * self.screen_rect.height
+            self.full_redraw = False
+        else:
+            dirty = self.dirty
+            for name, (surface, rect) in self.previous_hud.items():
+                if name not in self.hud:  # 這一幀不再顯示的 HUD
+                    dirty.append(rect)
+            clip = self.screen_rect.clip
+            rects = [clip(rect) for rect in dirty]
+            pygame.display.update(rects)
+            pixels = sum(rect.width * rect.height for rect in rects)
+        self.last_pixels = pixels
+        self.total_pixels += pixels
+        self.frames += 1
+        return pixels
+
+    def average_pixels(self):
+        """ 平均每幀送出的像素數 """
+        return self.total_pixels / self.frames if self.frames else 0
@@ -0,0 +1,55 @@
+import pygame
+
+
+class HitCircleAtlas:
+    """ 預先畫好的命中圓環動畫影格
+    啟動時依生命週期進度把每一格圓環畫在自己的透明 Surface 上，
+    繪製效果時只需要挑出對應的影格 blit 一次，不用每幀重新建立 Surface 再畫圓
+    """
+    def __init__(self, frames=32, colors=(), min_radius=20, grow_radius=30, inner_rate=0.8):
+        """
+        :param frames: 每種顏色的動畫影格數
+        :param colors: 啟動時先烘焙的顏色 (RGB)，其他顏色第一次用到時才烘焙
+        :param min_radius: 外圓的起始半徑
+        :param grow_radius: 外圓在生命週期內增加的半徑
+        :param inner_rate: 內圓半徑相對外圓的比例
+        """
+        self.frames = frames
+        self.min_radius = min_radius
+        self.grow_radius = grow_radius
+        self.inner_rate = inner_rate
+        self.atlas = {}  # color -> [(Surface, 外圓半徑), ...]
+        for color in colors:
+            self.bake(color)
+
+    def bake(self, color):
+        """ 烘焙指定顏色的所有影格 """
+        color = tuple(color)
+        frames = []
+        for index in range(self.frames):
+            progress = index / self.frames
+            radius_outer = int(self.min_radius + self.grow_radius * progress)  # 外圓的半徑隨時間變大
+            radius_inner = int(radius_outer * self.inner_rate)
+            alpha = max(0, 255 - int(255 * progress))  # 透明度隨時間變小
+            surface = pygame.Surface((radius_outer * 2, radius_outer * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, color + (alpha,), (radius_outer, radius_outer), radius_outer)
+            pygame.draw.circle(surface, (0, 0, 0, 0), (radius_outer, radius_outer), radius_inner)
+            frames.append((surface, radius_outer))
+        self.atlas[color] = frames
+        return frames
+
+    def frame(self, color, progress):
+        """ 取得生命週期進度對應的影格
+        :param color: 圓環顏色 (RGB)
+        :param progress: 生命週期進度 0~1
+        :return: (Surface, 外圓半徑)
+        """
+        frames = self.atlas.get(color)
+        if frames is None:
+            frames = self.bake(color)
+        index = int(progress * self.frames)
+        if index >= self.frames:
+            index = self.frames - 1
+        elif index < 0:
+            index = 0
+        return frames[index]
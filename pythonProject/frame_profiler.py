@@ -0,0 +1,111 @@
+import csv
+import json
+import time
+from collections import deque
+
+
+class FrameProfiler:
+    """ 每幀各階段耗時的量測
+    在每個階段結束時呼叫 mark(階段名稱)，記錄與上一個 mark 之間的時間 (perf_counter_ns)，
+    保留最近 window 幀算出 p50 / p95 / p99，並可在畫面上顯示或輸出整首歌的紀錄
+    """
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window=240, font=None, refresh_frames=30, keep_trace=True):
+        """
+        :param window: 計算百分位數使用的最近幀數，None 則使用全部的幀
+        :param font: 繪製疊加資訊用的字型物件
+        :param refresh_frames: 疊加資訊每幾幀重新 render 一次
+        :param keep_trace: 是否保留每一幀的紀錄供 dump 使用
+        """
+        self.window = window
+        self.font = font
+        self.refresh_frames = refresh_frames
+        self.keep_trace = keep_trace
+        self.stages = []  # 依第一次出現的順序
+        self.samples = {}  # 階段 -> 最近 window 幀的耗時 (ns)
+        self.trace = []  # 每一幀 {階段: 耗時 (ns)}
+        self.frames = 0
+        self.overlay = False
+        self.overlay_surfaces = []
+        self.current = {}
+        self.frame_start = 0
+        self.last = 0
+
+    def begin_frame(self):
+        """ 一幀開始 """
+        self.frame_start = self.last = time.perf_counter_ns()
+        self.current = {}
+
+    def mark(self, stage):
+        """ 結束一個階段，累加與上一個 mark 之間的時間 """
+        now = time.perf_counter_ns()
+        self.current[stage] = self.current.get(stage, 0) + now - self.last
+        self.last = now
+
+    def end_frame(self):
+        """ 一幀結束，記錄各階段與整幀的耗時 """
+        current = self.current
+        current['total'] = self.last - self.frame_start
+        for stage, value in current.items():
+            samples = self.samples.get(stage)
+            if samples is None:
+                samples = self.samples[stage] = deque(maxlen=self.window)
+                self.stages.append(stage)
+            samples.append(value)
+        if self.keep_trace:
+            self.trace.append(current)
+        self.frames += 1
+
+    def percentiles(self, stage):
+        """ 回傳最近 window 幀中該階段的 (p50, p95, p99)，單位毫秒 """
+        ordered = sorted(self.samples.get(stage, ()))
+        if not ordered:
+            return (0.0,) * len(self.PERCENTILES)
+        last = len(ordered) - 1
+        return tuple(ordered[min(last, last * p // 100)] / 1e6 for p in self.PERCENTILES)
+
+    def summary(self):
+        """ {階段: {'p50': ms, 'p95': ms, 'p99': ms}} """
+        return {stage: dict(zip(('p50', 'p95', 'p99'), self.percentiles(stage))) for stage in self.stages}
+
+    def toggle_overlay(self):
+        """ 切換畫面上的耗時顯示 """
+        self.overlay = not self.overlay
+        self.overlay_surfaces = []
+
+    def draw(self, screen, position=(10, 60), color=(0, 255, 0)):
+        """ 在畫面上繪製各階段的 p50 / p95 / p99 (每 refresh_frames 幀才重新 render 文字)，回傳繪製的矩形 """
+        if not self.overlay or self.font is None:
+            return []
+        if not self.overlay_surfaces or self.frames % self.refresh_frames == 0:
+            lines = [f"{'stage':<14}{'p50':>7}{'p95':>7}{'p99':>7}"]
+            for stage in self.stages:
+                p50, p95, p99 = self.percentiles(stage)
+                lines.append(f"{stage:<14}{p50:7.2f}{p95:7.2f}{p99:7.2f}")
+            self.overlay_surfaces = [self.font.render(line, True, color, (0, 0, 0)) for line in lines]
+        x, y = position
+        rects = []
+        for surface in self.overlay_surfaces:
+            rects.append(screen.blit(surface, (x, y)))
+            y += surface.get_height()
+        return rects
+
+    def dump(self, path, extra=None):
+        """ 輸出整首歌每一幀的各階段耗時 (毫秒)，副檔名 .csv 輸出 CSV，其他輸出 JSON
+        :param extra: 一併寫進 JSON 的其他統計 (CSV 不使用)
+        """
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(['frame'] + self.stages)
+                for index, frame in enumerate(self.trace):
+                    writer.writerow([index] + [frame.get(stage, 0) / 1e6 for stage in self.stages])
+        else:
+            with open(path, 'w') as file:
+                json.dump({
+                    'stages': self.stages,
+                    'summary_ms': self.summary(),
+                    'frames_ms': [[frame.get(stage, 0) / 1e6 for stage in self.stages] for frame in self.trace],
+                    **(extra or {}),
+                }, file)
@@ -0,0 +1,83 @@
+import time
+
+import pygame
+
+from audio_clock import MIXER_BUFFER, AudioClock
+
+IDLE_SLICE = 0.001  # 等待下一幀時每次休息的秒數
+
+
+class RealClock:
+    """ 實際遊戲使用的時鐘：歌曲時間來自與 mixer 同步的 AudioClock，幀率由 pygame.time.Clock 控制 """
+    def __init__(self):
+        self.clock = pygame.time.Clock()
+        self.last_tick = time.perf_counter()
+        self.audio = AudioClock(buffer=MIXER_BUFFER)
+
+    def song_time(self):
+        """ 目前實際聽到的歌曲時間 (毫秒)，音符生成與判定都使用這個時間 """
+        return self.audio.song_time_ms()
+
+    def sync_summary(self):
+        """ 歌曲時間同步的狀態與量測到的抖動 """
+        return self.audio.summary()
+
+    def ticks(self):
+        """ 遊戲啟動後經過的時間 (毫秒)，效果動畫使用 """
+        return pygame.time.get_ticks()
+
+    def tick(self, fps, idle=None):
+        """ 結束一幀，必要時等待以維持 fps
+        :param idle: 等待期間約每毫秒呼叫一次的函式 (例如取出按鍵事件)，最後不到一毫秒交給 Clock.tick
+        """
+        if idle is not None and fps:
+            deadline = self.last_tick + 1 / fps - IDLE_SLICE
+            while time.perf_counter() < deadline:
+                idle()
+                time.sleep(IDLE_SLICE)
+        elapsed = self.clock.tick(fps)
+        self.last_tick = time.perf_counter()
+        return elapsed
+
+
+class VirtualClock:
+    """ 決定性的虛擬時鐘 (無頭模擬用)
+    每次 tick 固定前進一幀的時間，不會等待；到時間的腳本按鍵事件會在 tick 時送進 pygame 事件佇列，
+    讓下一幀的 pygame.event.get() 讀到，事件的 song_time 是腳本中的按鍵時間
+    """
+    def __init__(self, fps=120, events=()):
+        """
+        :param fps: 模擬的幀率，決定每幀前進的毫秒數
+        :param events: 腳本事件 [ (time_ms, event_type, key), ... ]
+        """
+        self.frame_ms = 1000 / fps
+        self.now = 0.0
+        self.frames = 0
+        self.events = sorted(events, key=lambda event: event[0])
+        self.cursor = 0
+
+    def song_time(self):
+        return self.now
+
+    def ticks(self):
+        return int(self.now)
+
+    def tick(self, fps=None, idle=None):
+        """ 前進一幀並送出到時間的腳本事件 (fps、idle 參數只為了與 RealClock 相容，不使用) """
+        self.now += self.frame_ms
+        self.frames += 1
+        events = self.events
+        while self.cursor < len(events) and events[self.cursor][0] <= self.now:
+            time_ms, event_type, key = events[self.cursor]
+            pygame.event.post(pygame.event.Event(event_type, key=key, mod=0, unicode='', scancode=0,
+                                                 song_time=time_ms))
+            self.cursor += 1
+        return self.frame_ms
+
+    def sync_summary(self):
+        """ 虛擬時鐘沒有同步問題 """
+        return {}
+
+    def finished(self):
+        """ 腳本事件是否都已送出 """
+        return self.cursor >= len(self.events)
@@ -0,0 +1,149 @@
+""" 無頭模擬模式
+使用 SDL dummy 影像與音訊驅動，以 VirtualClock 取代真實的音樂時間與幀率限制，
+把腳本按鍵送進 GameControl.GameStart，完整跑過 NoteManager、JudgmentLine 與各種效果，
+並回報模擬的幀率與最後的 perfect / great / miss 數量。
+用法 (在 pythonProject 目錄下):
+    python headless.py                                  # 內建譜面，自動完美演奏
+    python headless.py --chart game_notes.rgc --jitter 60 --miss-rate 0.1 --seed 3
+"""
+import argparse
+import os
+import random
+import time
+
+import pygame
+
+import main_test
+from chart_format import read_any
+from dirty_renderer import DirtyRenderer
+from frame_profiler import FrameProfiler
+from game_clock import VirtualClock
+from input_capture import LANE_KEYS, InputCapture
+from judgment import hit_time
+from replay import ReplayRecorder
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+KEY_HOLD_MS = 30  # 腳本按鍵按住的時間
+
+
+class SilentScore(main_test.Score):
+    """ 不播放音樂的樂譜，歌曲時間完全由 VirtualClock 決定 """
+    def load_music(self):
+        pass
+
+    def start_music(self):
+        pass
+
+    def pause_music(self):
+        pass
+
+    def unpause_music(self):
+        pass
+
+    def End_music(self):
+        pass
+
+
+def autoplay_events(note_data, offset_ms=0, jitter_ms=0, miss_rate=0, seed=0):
+    """ 產生在每個音符抵達判定線時按下對應按鍵的腳本
+    :param offset_ms: 所有按鍵的固定偏移 (毫秒)
+    :param jitter_ms: 每次按鍵的隨機誤差範圍 (±毫秒)
+    :param miss_rate: 故意不按的比例
+    :return: [ (time_ms, event_type, key), ... ]
+    """
+    rng = random.Random(seed)
+    events = []
+    for note_time, position, speed in note_data:
+        if rng.random() < miss_rate:
+            continue
+        press = hit_time(note_time, speed) + offset_ms + rng.uniform(-jitter_ms, jitter_ms)
+        key = LANE_KEYS[int(position)]
+        events.append((press, pygame.KEYDOWN, key))
+        events.append((press + KEY_HOLD_MS, pygame.KEYUP, key))
+    return events
+
+
+def simulate(note_data, events, fps=120, tail_ms=2000, profiler=None, renderer=None, input_capture=None,
+             replay=None, delay=0):
+    """ 以虛擬時鐘跑完整的遊戲迴圈，盡可能快
+    main_test 以相對路徑載入素材，呼叫前工作目錄必須是 pythonProject，
+    沒有顯示裝置時也要先設定 SDL 的 dummy 驅動 (見 main)
+    :param note_data: 譜面 [ (time, position, speed), ... ]
+    :param events: 腳本事件 [ (time_ms, event_type, key), ... ]
+    :param fps: 模擬的幀率
+    :param tail_ms: 最後一個音符抵達判定線後再多跑的時間，之後送出 P 鍵結束
+    :param profiler: 每幀各階段耗時的量測 (FrameProfiler)
+    :param renderer: 畫面繪製方式 (DirtyRenderer)，None 則依 main_test.DIRTY_RECTS
+    :param input_capture: 帶時間戳記的按鍵輸入 (InputCapture)
+    :param replay: 記錄按鍵事件的 ReplayRecorder
+    :param delay: 校正的輸入延遲 (毫秒)
+    :return: dict(frames, wall_seconds, fps, song_seconds, perfect, great, miss)
+    """
+    main_test.setup()
+    main_test.load_sounds()
+    end_time = max((hit_time(note[0], note[2]) for note in note_data), default=0) + tail_ms
+    clock = VirtualClock(fps, list(events) + [(end_time, pygame.KEYDOWN, pygame.K_p)])
+    result = {}
+
+    def on_end(score, current_time, perfect, great, miss):
+        result.update(perfect=perfect, great=great, miss=miss)
+
+    previous_clock = main_test.game_clock
+    main_test.game_clock = clock
+    pygame.event.clear()
+    try:
+        score = SilentScore(None, note_data, 'note.png')
+        start = time.perf_counter()
+        main_test.GameControl.GameStart(True, score, fps, [True], delay=delay, on_end=on_end, profiler=profiler,
+                                        renderer=renderer, input_capture=input_capture, replay=replay)
+        wall_seconds = time.perf_counter() - start
+    finally:
+        main_test.game_clock = previous_clock
+    result.update(frames=clock.frames, wall_seconds=wall_seconds, fps=clock.frames / wall_seconds,
+                  song_seconds=clock.now / 1000)
+    return result
+
+
+def main():
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    os.chdir(BASE_DIR)  # main_test 以相對路徑載入素材
+    parser = argparse.ArgumentParser(description='headless gameplay simulation')
+    parser.add_argument('--chart', default=os.path.join(BASE_DIR, 'note_data.txt'),
+                        help='note_data.txt / game_notes.json / .rgc')
+    parser.add_argument('--fps', type=int, default=120, help='模擬的幀率')
+    parser.add_argument('--offset', type=float, default=0, help='按鍵固定偏移 (毫秒)')
+    parser.add_argument('--jitter', type=float, default=0, help='按鍵隨機誤差 (±毫秒)')
+    parser.add_argument('--miss-rate', type=float, default=0, help='故意不按的比例')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--trace', help='輸出每幀各階段耗時 (.json / .csv)')
+    parser.add_argument('--record', help='輸出這一局的重播紀錄 (.rgr)')
+    parser.add_argument('--renderer', choices=('dirty', 'full'), default='dirty',
+                        help='dirty: 髒矩形 / full: 每幀整個畫面重畫')
+    args = parser.parse_args()
+
+    note_data = read_any(args.chart)
+    events = autoplay_events(note_data, args.offset, args.jitter, args.miss_rate, args.seed)
+    profiler = FrameProfiler(window=None, keep_trace=args.trace is not None)  # 整首歌的百分位數
+    renderer = DirtyRenderer(main_test.setup().screen, enabled=args.renderer == 'dirty')
+    input_capture = InputCapture()
+    main_test.FRAME_TRACE_PATH = args.trace
+    replay = ReplayRecorder(note_data, path=args.record) if args.record else None
+    result = simulate(note_data, events, args.fps, profiler=profiler, renderer=renderer, input_capture=input_capture,
+                      replay=replay)
+    print(f"{len(note_data)} notes, {result['frames']} frames ({result['song_seconds']:.1f}s of song) "
+          f"in {result['wall_seconds']:.2f}s -> {result['fps']:.0f} simulated FPS")
+    print(f"perfect {result['perfect']}, great {result['great']}, miss {result['miss']}")
+    screen_pixels = main_test.WIDTH * main_test.HEIGHT
+    print(f"{args.renderer} renderer: {renderer.average_pixels():.0f} px/frame pushed "
+          f"({renderer.average_pixels() / screen_pixels:.1%} of the screen)")
+    latency = input_capture.summary()
+    print(f"input -> judgment ({latency['count']} presses): p50 {latency['p50']:.3f} ms, "
+          f"p95 {latency['p95']:.3f} ms, p99 {latency['p99']:.3f} ms, max {latency['max']:.3f} ms")
+    for stage, values in profiler.summary().items():
+        print(f"{stage:>14}: p50 {values['p50']:.3f} ms, p95 {values['p95']:.3f} ms, p99 {values['p99']:.3f} ms")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import time
+from collections import deque
+
+import pygame
+
+LANE_KEYS = (pygame.K_d, pygame.K_f, pygame.K_j, pygame.K_k)
+
+
+class InputCapture:
+    """ 帶時間戳記的按鍵輸入
+    pygame 的事件只能在建立視窗的主執行緒取出 (在其他執行緒呼叫 pygame.event.get 並不安全)，
+    所以不另外開執行緒，而是在一幀之中多次 poll：幀開始、送出畫面前，以及 game_clock.tick 等待下一幀的空檔。
+    D, F, J, K 的按下 / 放開事件在取出的當下以 perf_counter_ns 記錄時間，依抵達順序放進 deque
+    (append / popleft 不需要鎖)，判定時再換算成歌曲時間；其他事件留給遊戲迴圈處理。
+    同時記錄每次按鍵從取得到判定的延遲
+    """
+    def __init__(self, keys=LANE_KEYS):
+        """
+        :param keys: 按鍵列對應的按鍵 (依 0, 1, 2, 3 的順序)
+        """
+        self.lanes = {key: lane for lane, key in enumerate(keys)}
+        self.queue = deque()  # (時間戳記 ns, 按鍵列, 是否按下, 事件的歌曲時間或 None)
+        self.pending = []  # 其他事件 (QUIT、P、F3 ...)
+        self.latencies = []  # 每次按鍵從取得到判定的延遲 (ns)
+
+    def poll(self):
+        """ 取出目前所有的事件，按鍵列的事件加上時間戳記放進佇列 """
+        now = time.perf_counter_ns()
+        lanes = self.lanes
+        for event in pygame.event.get():
+            if event.type in (pygame.KEYDOWN, pygame.KEYUP) and event.key in lanes:
+                self.queue.append((now, lanes[event.key], event.type == pygame.KEYDOWN,
+                                   getattr(event, 'song_time', None)))
+            else:
+                self.pending.append(event)
+
+    def events(self):
+        """ 回傳按鍵列以外的事件 (會先 poll 一次) """
+        self.poll()
+        events = self.pending
+        self.pending = []
+        return events
+
+    def drain(self):
+        """ 依抵達順序取出佇列中的按鍵事件 """
+        queue = self.queue
+        while queue:
+            yield queue.popleft()
+
+    def to_song_time(self, captured_ns, song_time, frame_ns, frame_song_time):
+        """ 把按鍵的時間戳記換算成歌曲時間
+        :param captured_ns: 按鍵取得時的 perf_counter_ns
+        :param song_time: 事件本身帶的歌曲時間 (無頭模擬的腳本按鍵)，有的話直接使用
+        :param frame_ns: 這一幀取得歌曲時間時的 perf_counter_ns
+        :param frame_song_time: 這一幀的歌曲時間 (毫秒)
+        """
+        if song_time is not None:
+            return song_time
+        return frame_song_time - (frame_ns - captured_ns) / 1e6
+
+    def judged(self, captured_ns):
+        """ 記錄一次按鍵從取得到判定的延遲 """
+        self.latencies.append(time.perf_counter_ns() - captured_ns)
+
+    def summary(self):
+        """ 輸入到判定延遲的分布 {'count', 'p50', 'p95', 'p99', 'max'} (毫秒) """
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return {'count': 0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+        last = len(ordered) - 1
+        result = {'count': len(ordered)}
+        for p in (50, 95, 99):
+            result[f'p{p}'] = ordered[last * p // 100] / 1e6
+        result['max'] = ordered[last] / 1e6
+        return result
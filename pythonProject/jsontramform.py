@@ -1,51 +1,285 @@
+""" 將 MIDI 轉出的 JSON (例如 VisiPiano.json) 轉成遊戲的 game_notes.json
+
+以串流方式逐一讀取每個音軌的音符 (只保留時間、音高、長度三個數值欄位)，
+再用向量化的映射引擎一次決定所有音符的按鍵列，最後邊轉邊寫出。
+用法 (在 pythonProject 目錄下):
+    python jsontramform.py                                 # VisiPiano.json -> game_notes.json
+    python jsontramform.py song.json -o song_notes.json --strategy modulo --chord-cap 1
+    python jsontramform.py songs/ -o charts/ --jobs 4      # 平行轉換整個資料夾
+也可以當成函式庫使用：map_notes() 處理陣列，build_note_data() 直接回傳遊戲用的譜面。
+"""
+import argparse
 import json
+import os
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
-# 讀取你的 JSON 檔案
-with open('python project/VisiPiano.json', 'r') as file:
-    data = json.load(file)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# 提取必要的音符資料
-notes = data['tracks'][0]['notes']
-note_positions = {
-    48: 0,   # C3 -> 位置 0 (D)
-    49: 1,   # C#3 -> 位置 1 (F)
-    50: 2,   # D3 -> 位置 2 (J)
-    51: 3,   # D#3 -> 位置 3 (K)
-    # 可以根據需要擴展這個映射，將 MIDI 音符對應到遊戲的 D, F, J, K
-}
+# 映射引擎的預設值
+LANES = 4  # D, F, J, K
+PITCH_RANGE = (36, 83)  # 折疊後的音高範圍 (C2 ~ B5)
+STRATEGY = 'range'  # 'range': 把音高範圍切成等寬區段 (低音在左) / 'modulo': 音高取餘數
+CHORD_CAP = 2  # 同一時間最多幾個音符
+CHORD_WINDOW = 0.015  # 間隔在這個秒數內的音符視為同一個和弦
+MIN_GAP = 0.12  # 同一列兩個音符最少間隔 (秒)
+SPEED = 5  # 下落速度 (每幀像素)，None 則沿用舊版依音符長度計算
 
 # 常數：FPS = 120 和 判定線位置
 FPS = 120
 JUDGMENT_LINE_Y = 500  # 判定線的位置
 START_Y = -50  # 音符的起始位置
 
-# 用來儲存遊戲需要的音符資料
-game_notes = []
-
-# 處理 MIDI 音符並轉換為遊戲需要的資料
-for note in notes:
-    midi_note = note['midi']  # MIDI 音符號
-    start_time = note['time'] * FPS  # 將時間從秒轉換為幀數
-    duration = note['duration'] * FPS  # 將持續時間從秒轉換為幀數
-    
-    # 確認音符的 MIDI 編號是否有對應的屏幕位置
-    if midi_note in note_positions:
-        position = note_positions[midi_note]
-        
-        # 計算音符的移動速度
-        speed = (JUDGMENT_LINE_Y - START_Y) / duration
-        
-        # 添加到遊戲的音符資料列表中
-        game_notes.append({
-            'position': position,
-            'appearance_time': start_time,  # 出現時間（幀數）
-            'speed': speed  # 速度
-        })
-
-# 輸出轉換後的音符資料（可以檢查）
-for note in game_notes:
-    print(f"Position: {note['position']}, Appearance Time: {note['appearance_time']}, Speed: {note['speed']}")
-
-# 如果需要，將結果儲存為新的 JSON 文件
-with open('python project/game_notes.json', 'w') as outfile:
-    json.dump(game_notes, outfile, indent=4)
\ No newline at end of file
+NOTES_KEY = re.compile(r'"notes"\s*:\s*\[')  # 音軌中 notes 陣列的開頭
+OUTPUT_SUFFIX = '_notes.json'  # 資料夾模式輸出檔的結尾
+CHUNK_SIZE = 1 << 16
+KEY_TAIL = 64  # 找不到 notes 時保留的尾端長度，避免 key 剛好被切在兩個區塊之間
+
+
+def iter_track_notes(path, chunk_size=CHUNK_SIZE):
+    """ 以串流方式逐一產生 (音軌編號, 音符 dict)，不把整個檔案讀進記憶體
+    :param path: MIDI 轉出的 JSON 檔
+    :param chunk_size: 每次讀取的字元數
+    """
+    decoder = json.JSONDecoder()
+    track = -1
+    in_notes = False
+    buffer = ''
+    pos = 0
+    eof = False
+    with open(path, 'r', encoding='utf-8') as file:
+        while True:
+            if not in_notes:
+                match = NOTES_KEY.search(buffer, pos)
+                if match:
+                    pos = match.end()
+                    track += 1
+                    in_notes = True
+                    continue
+                if eof:
+                    return
+                pos = max(pos, len(buffer) - KEY_TAIL)
+            else:
+                # 跳過音符之間的空白與逗號
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buffer):
+                    if buffer[pos] == ']':  # 這個音軌的音符讀完了
+                        pos += 1
+                        in_notes = False
+                        continue
+                    try:
+                        note, end = decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                    else:
+                        pos = end
+                        yield track, note
+                        continue
+                elif eof:
+                    raise ValueError(f'{path}: unexpected end of file inside notes')
+            # 需要更多資料：丟掉已處理的部分再讀下一個區塊
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+
+def read_note_columns(path):
+    """ 串流讀取所有音軌的音符，只保留 (時間, MIDI 音高, 長度) 三個數值欄位
+    :return: (times, midis, durations) NumPy 陣列，時間與長度單位為秒
+    """
+    times = array('d')
+    midis = array('h')
+    durations = array('d')
+    for track, note in iter_track_notes(path):
+        times.append(note['time'])
+        midis.append(note['midi'])
+        durations.append(note['duration'])
+    return np.frombuffer(times), np.frombuffer(midis, dtype=np.int16), np.frombuffer(durations)
+
+
+def fold_pitch(midis, pitch_range=PITCH_RANGE):
+    """ 以八度為單位把超出範圍的音高折回 pitch_range 內 (範圍小於一個八度時再截斷) """
+    low, high = pitch_range
+    pitch = np.asarray(midis, dtype=np.int64).copy()
+    below = pitch < low
+    pitch[below] += 12 * ((low - pitch[below] + 11) // 12)
+    above = pitch > high
+    pitch[above] -= 12 * ((pitch[above] - high + 11) // 12)
+    return np.clip(pitch, low, high)
+
+
+def map_notes(times, midis, durations=None, lanes=LANES, pitch_range=PITCH_RANGE, strategy=STRATEGY,
+              chord_cap=CHORD_CAP, chord_window=CHORD_WINDOW, min_gap=MIN_GAP, speed=SPEED):
+    """ 向量化的 MIDI -> 按鍵列映射引擎
+    1. 音高折疊到 pitch_range
+    2. 依 strategy 決定按鍵列 ('range' 依音高區段，'modulo' 依音高餘數)
+    3. 和弦 (與該組第一個音符間隔 <= chord_window 的音符) 中同一列只留一個，且最多留 chord_cap 個 (高音優先)
+    4. 同一列前後音符至少間隔 min_gap 秒，太近的音符丟掉
+    :param times: 音符時間 (秒)
+    :param midis: MIDI 音高
+    :param durations: 音符長度 (秒)，speed 為 None 時用來計算速度
+    :param speed: 固定的下落速度 (每幀像素)，None 則沿用舊版依音符長度計算
+    :return: (times, lanes, speeds) 依時間排序的 NumPy 陣列
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if durations is None:
+        durations = np.zeros_like(times)
+    durations = np.asarray(durations, dtype=np.float64)
+    if times.size == 0:
+        return times, np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    low, high = pitch_range
+    pitch = fold_pitch(midis, pitch_range)
+    if strategy == 'range':
+        lane = (pitch - low) * lanes // (high - low + 1)
+    elif strategy == 'modulo':
+        lane = (pitch - low) % lanes
+    else:
+        raise ValueError(f'unknown strategy {strategy!r}')
+
+    # 依時間排序，同一時間高音在前
+    order = np.lexsort((-pitch, times))
+    times, lane, durations, pitch = times[order], lane[order], durations[order], pitch[order]
+
+    # 和弦分組：距離這一組第一個音符超過 chord_window 就開新的一組 (快速滾奏不會串成同一組)
+    new_group = np.zeros(times.size, dtype=bool)
+    position = 0
+    while position < times.size:
+        new_group[position] = True
+        position = int(np.searchsorted(times, times[position] + chord_window, side='right'))
+    group = np.cumsum(new_group) - 1
+
+    # 組內改成高音在前，以下依音高決定保留哪些音符
+    order = np.lexsort((-pitch, group))
+    times, lane, durations, pitch, group = times[order], lane[order], durations[order], pitch[order], group[order]
+
+    # 同一和弦同一列只留第一個 (最高音)
+    keep = np.zeros(times.size, dtype=bool)
+    keep[np.unique(group * lanes + lane, return_index=True)[1]] = True
+
+    # 每個和弦最多 chord_cap 個 (高音優先)
+    kept = np.flatnonzero(keep)
+    kept_group = group[kept]
+    rank = np.arange(kept.size) - np.searchsorted(kept_group, kept_group, side='left')
+    keep[kept[rank >= chord_cap]] = False
+
+    # 同一列最小間隔：從第一個音符開始，每次跳到 min_gap 之後的下一個音符
+    if min_gap > 0:
+        for index in range(lanes):
+            candidates = np.flatnonzero(keep & (lane == index))
+            lane_times = times[candidates]
+            chosen = np.zeros(candidates.size, dtype=bool)
+            position = 0
+            while position < candidates.size:
+                chosen[position] = True
+                position = int(np.searchsorted(lane_times, lane_times[position] + min_gap, side='left'))
+            keep[candidates[~chosen]] = False
+
+    times, lane, durations, pitch = times[keep], lane[keep], durations[keep], pitch[keep]
+    order = np.lexsort((-pitch, times))  # 輸出依時間排序
+    times, lane, durations = times[order], lane[order], durations[order]
+    if speed is None:
+        # 舊版的作法：音符長度越短越快
+        speeds = (JUDGMENT_LINE_Y - START_Y) / (np.maximum(durations, 1e-3) * FPS)
+    else:
+        speeds = np.full(times.size, float(speed))
+    return times, lane, speeds
+
+
+def build_note_data(path, **options):
+    """ 將 MIDI JSON 直接轉成遊戲使用的 [ [time(ms), position, speed], ... ] 譜面
+    :param options: map_notes 的參數
+    """
+    times, lanes, speeds = map_notes(*read_note_columns(path), **options)
+    return [list(note) for note in zip((times * 1000).tolist(), lanes.tolist(), speeds.tolist())]
+
+
+def convert_file(source, target, **options):
+    """ 轉換單一檔案，所有音軌都會處理
+    輸出格式與 json.dump(..., indent=4) 相同，音符依時間排序
+    :param options: map_notes 的參數
+    :return: 寫出的音符數量
+    """
+    times, lanes, speeds = map_notes(*read_note_columns(source), **options)
+    count = 0
+    with open(target, 'w') as outfile:
+        for start_time, position, speed in zip((times * FPS).tolist(), lanes.tolist(), speeds.tolist()):
+            game_note = {
+                'position': position,
+                'appearance_time': start_time,  # 出現時間（幀數）
+                'speed': speed
+            }
+            outfile.write('[\n' if count == 0 else ',\n')
+            outfile.write('    ' + json.dumps(game_note, indent=4).replace('\n', '\n    '))
+            count += 1
+        outfile.write('\n]' if count else '[]')
+    return count
+
+
+def _convert_job(job):
+    """ 給 process pool 使用的包裝 """
+    source, target, options = job
+    return source, convert_file(source, target, **options)
+
+
+def convert_directory(source_dir, target_dir, jobs=None, **options):
+    """ 以 process pool 平行轉換資料夾中所有的 .json 檔
+    輸出檔名為 <原檔名>_notes.json，預設寫在來源資料夾中，所以 *_notes.json 不視為來源
+    :param jobs: 同時執行的行程數，None 為 CPU 核心數
+    :param options: map_notes 的參數
+    :return: [(來源檔, 音符數量), ...]
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    job_list = []
+    for name in sorted(os.listdir(source_dir)):
+        if name.endswith('.json') and not name.endswith(OUTPUT_SUFFIX):
+            target_name = os.path.splitext(name)[0] + OUTPUT_SUFFIX
+            job_list.append((os.path.join(source_dir, name), os.path.join(target_dir, target_name), options))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_convert_job, job_list))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MIDI JSON -> game_notes.json')
+    parser.add_argument('source', nargs='?', default=os.path.join(BASE_DIR, 'VisiPiano.json'),
+                        help='MIDI JSON 檔，或包含多個 JSON 檔的資料夾')
+    parser.add_argument('-o', '--output', help='輸出檔 (來源為資料夾時為輸出資料夾)')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='平行轉換的行程數')
+    parser.add_argument('--lanes', type=int, default=LANES, help='按鍵列數')
+    parser.add_argument('--pitch-range', type=int, nargs=2, default=PITCH_RANGE, metavar=('LOW', 'HIGH'),
+                        help='音高折疊範圍 (MIDI 編號)')
+    parser.add_argument('--strategy', choices=('range', 'modulo'), default=STRATEGY, help='按鍵列分配方式')
+    parser.add_argument('--chord-cap', type=int, default=CHORD_CAP, help='同一時間最多幾個音符')
+    parser.add_argument('--chord-window', type=float, default=CHORD_WINDOW, help='視為同一和弦的間隔 (秒)')
+    parser.add_argument('--min-gap', type=float, default=MIN_GAP, help='同一列最小間隔 (秒)')
+    parser.add_argument('--speed', type=float, default=SPEED,
+                        help='下落速度 (每幀像素)，0 則沿用舊版依音符長度計算')
+    args = parser.parse_args()
+    options = {
+        'lanes': args.lanes,
+        'pitch_range': tuple(args.pitch_range),
+        'strategy': args.strategy,
+        'chord_cap': args.chord_cap,
+        'chord_window': args.chord_window,
+        'min_gap': args.min_gap,
+        'speed': args.speed or None,
+    }
+
+    if os.path.isdir(args.source):
+        output = args.output or args.source
+        for source, count in convert_directory(args.source, output, args.jobs, **options):
+            print(f"{source}: {count} notes")
+    else:
+        output = args.output or os.path.join(BASE_DIR, 'game_notes.json')
+        count = convert_file(args.source, output, **options)
+        print(f"{args.source} -> {output}: {count} notes")
+
+
+if __name__ == '__main__':
+    main()
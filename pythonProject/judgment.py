@@ -0,0 +1,106 @@
+from bisect import bisect_left
+
+import numpy as np
+
+# 判定範圍 (與判定時間的差距，毫秒)，與原本速度 5 時的像素範圍 (±40 / ±100 / ±200 px) 相同
+PERFECT_WINDOW = 67
+GREAT_WINDOW = 167
+MISS_WINDOW = 333
+START_Y = -50  # 音符出現的 y 位置
+JUDGMENT_Y = 500  # 判定線的 y 位置
+REFERENCE_FPS = 120  # 譜面的速度以「每幀像素」表示，基準為 120 FPS
+
+
+def hit_time(spawn_time, speed, start_y=START_Y, judgment_y=JUDGMENT_Y, reference_fps=REFERENCE_FPS):
+    """ 音符抵達判定線的歌曲時間 (毫秒)
+    :param spawn_time: 音符出現的歌曲時間 (毫秒)，可以是 NumPy 陣列
+    :param speed: 下落速度 (基準 FPS 下每幀移動的像素)
+    """
+    return spawn_time + (judgment_y - start_y) / (speed * reference_fps / 1000)
+
+
+class JudgmentEngine:
+    """ 以時間判定的引擎
+    譜面載入時算出每個音符抵達判定線的時間，依按鍵列分開排序，
+    按下按鍵時以按鍵的時間戳記二分搜尋該列的候選音符，判定結果與幀率、音符速度都無關，
+    掉幀時也一樣準確
+    """
+    def __init__(self, note_data, lanes=4, windows=(PERFECT_WINDOW, GREAT_WINDOW, MISS_WINDOW),
+                 start_y=START_Y, judgment_y=JUDGMENT_Y, reference_fps=REFERENCE_FPS):
+        """
+        :param note_data: 譜面 [ (time, position, speed), ... ]
+        :param lanes: 按鍵列數
+        :param windows: (perfect, great, miss) 的判定範圍 (毫秒)
+        :param start_y: 音符出現時的 y 位置
+        :param judgment_y: 判定線的 y 位置
+        :param reference_fps: 譜面速度 (每幀像素) 的基準 FPS
+        """
+        self.lanes = lanes
+        self.perfect_window, self.great_window, self.miss_window = windows
+        chart = np.asarray(note_data, dtype=np.float64).reshape(-1, 3)
+        chart = chart[(chart[:, 1] >= 0) & (chart[:, 1] < lanes)]
+        hit_times = hit_time(chart[:, 0], chart[:, 2], start_y, judgment_y, reference_fps)
+        self.hit_times = []  # 每一列依判定時間排序
+        self.spawn_times = []  # 與 hit_times 對應的出現時間 (用來找到畫面上的音符)
+        for lane in range(lanes):
+            in_lane = chart[:, 1] == lane
+            order = np.argsort(hit_times[in_lane], kind='stable')
+            self.hit_times.append(hit_times[in_lane][order].tolist())
+            self.spawn_times.append(chart[in_lane, 0][order].tolist())
+        self.judged = [bytearray(len(times)) for times in self.hit_times]
+        self.first = [0] * lanes  # 每一列第一個還沒判定的音符
+
+    def classify(self, delta_ms):
+        """ 依與判定時間的差距回傳 'perfect' / 'great' / 'miss'，超出範圍回傳 None """
+        delta_ms = abs(delta_ms)
+        if delta_ms <= self.perfect_window:
+            return 'perfect'
+        if delta_ms <= self.great_window:
+            return 'great'
+        if delta_ms <= self.miss_window:
+            return 'miss'
+        return None
+
+    def judge(self, lane, press_ms):
+        """ 判定一次按鍵：取該列判定範圍內最早還沒判定的音符
+        :param lane: 0 (D), 1 (F), 2 (J), 3 (K)
+        :param press_ms: 按下按鍵的歌曲時間 (毫秒)
+        :return: (結果, 音符的出現時間)，範圍內沒有音符時為 (None, None)
+        """
+        times = self.hit_times[lane]
+        judged = self.judged[lane]
+        index = max(self.first[lane], bisect_left(times, press_ms - self.miss_window))
+        latest = press_ms + self.miss_window
+        while index < len(times) and times[index] <= latest:
+            if not judged[index]:
+                judged[index] = 1
+                self._advance(lane)
+                return self.classify(press_ms - times[index]), self.spawn_times[lane][index]
+            index += 1
+        return None, None
+
+    def expire(self, now_ms):
+        """ 把已經超過 miss 範圍還沒判定的音符都算成 miss
+        :return: 這次新增的 miss 數量
+        """
+        missed = 0
+        deadline = now_ms - self.miss_window
+        for lane in range(self.lanes):
+            times = self.hit_times[lane]
+            judged = self.judged[lane]
+            index = self.first[lane]
+            while index < len(times) and times[index] < deadline:
+                if not judged[index]:
+                    judged[index] = 1
+                    missed += 1
+                index += 1
+            self.first[lane] = index
+        return missed
+
+    def _advance(self, lane):
+        """ 跳過該列開頭已經判定的音符 """
+        judged = self.judged[lane]
+        index = self.first[lane]
+        while index < len(judged) and judged[index]:
+            index += 1
+        self.first[lane] = index
@@ -1,20 +1,44 @@
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import pygame
-import copy
+from chart_scheduler import ChartScheduler
+from note_lanes import LaneStore
+from judgment import JudgmentEngine
+from effect_atlas import HitCircleAtlas
+from pools import ObjectPool, peak_concurrency
+from game_clock import RealClock
+from frame_profiler import FrameProfiler
+from dirty_renderer import DirtyRenderer
+from input_capture import LANE_KEYS, InputCapture
+from menu_ui import MenuScreen, QUIT
+from app_context import AppContext
+from calibration import Calibration, load_offset, save_result as save_calibration
+from chart_format import read_any
+from asset_loader import AssetLoader
+from replay import ReplayRecorder, new_replay_path
 class Score:
-    def __init__(self, music_path, note_data, note_image_path):
+    def __init__(self, music_path, note_data, note_image_path, music_data=None):
         """ 初始化樂譜物件
         music_path: 音樂路徑
         note_data: 音符數據 (包含時間、位置、速度)
         note_image_path: 音符圖片路徑
+        music_data: 預先在背景讀進記憶體的音樂檔內容，None 則開始時才從 music_path 讀取
         """
         self.music_path = music_path
+        self.music_data = music_data
         self.note_data = note_data  # [ (time, position, speed), (time, position, speed), ... ]
-        self.note_image = pygame.image.load(note_image_path)  # 載入音符圖片
-        self.scaled_image = pygame.transform.scale(self.note_image, (30, 30))
+        self.note_image = app.image(note_image_path)  # 音符圖片 (整個程式只載入一次，通常已在背景載入)
+        self.scaled_image = app.image(note_image_path, NOTE_SIZE)
 
     def load_music(self):
         """ 加載音樂檔案 """
-        pygame.mixer.music.load(self.music_path)
+        if self.music_data is not None:
+            pygame.mixer.music.load(io.BytesIO(self.music_data), self.music_path)  # 副檔名用來判斷格式
+        else:
+            pygame.mixer.music.load(self.music_path)
 
     def start_music(self):
         """ 開始播放音樂 """
@@ -28,39 +52,22 @@ class Score:
     def End_music(self):
         """卸載音樂"""
         pygame.mixer.music.unload()
-class Note:
-    def __init__(self, x, y, speed, image):
-        """ 初始化音符物件
-        x: x 位置
-        y: y 位置 (音符的初始位置)
-        speed: 下落速度
-        image: 音符圖片
-        """
-        self.x = x
-        self.y = y
-        self.speed = speed
-        self.image = image
-
-    def update(self):
-        """ 更新音符位置 """
-        self.y += self.speed  # 音符隨著速度向下移動
-
-    def draw(self, screen):
-        """ 在屏幕上繪製音符 """
-        screen.blit(self.image, (self.x, self.y))  # 將音符圖片繪製在指定位置
-        
 class NoteManager:
     """用於管理4個下落音符陣列
-        其對應D,F,J,K
+        其對應D,F,J,K，音符存放在 LaneStore 的 NumPy 欄位中
     """
-    def __init__(self, note_positions, note_images,hit_result_manager,hitCircleEffectManager,comboEffectManager):
-        """初始化4個音符陣列，對應D,F,J,K"""
-        self.note_columns = {
-        'D' :[],
-        'F':[],
-        'J':[],
-        'K':[]
-        }
+    def __init__(self, note_positions, note_images,hit_result_manager,hitCircleEffectManager,comboEffectManager, judgment_y=500, note_data=None):
+        """初始化4個音符陣列，對應D,F,J,K
+        note_data: 譜面，依譜面在畫面上的最大密度決定每列的容量，並建立以時間判定的引擎 (沒給則無法判定)
+        """
+        if note_data is not None:
+            self.note_lanes = LaneStore.for_chart(note_data, lanes=4, limit_y=HEIGHT, judgment_y=judgment_y)
+        else:
+            self.note_lanes = LaneStore(lanes=4, judgment_y=judgment_y)
+        self.judgment = JudgmentEngine(note_data if note_data is not None else [], lanes=4, judgment_y=judgment_y)
+        self.judged_early = set()  # 還沒生成就被判定的音符 (position, note_time)，生成時直接略過
+        self.spawned_until = float('-inf')  # 最後生成的音符出現時間 (譜面依時間順序生成)
+        self.expired_until = float('-inf')  # 最後一次過期判定的歌曲時間 (重播紀錄使用)
         self.missnum = 0
         self.greatnum = 0
         self.perfectnum = 0
@@ -72,36 +79,43 @@ class NoteManager:
         self.comboEffectManager = comboEffectManager
     def input_note(self, note_time, position, speed):
         """在指定時間點，將音符插入對應的位置
-        note_time: 音符出現的時間
+        note_time: 音符出現的時間 (毫秒)，音符位置由此時間推算，晚一幀生成也不會偏移
         position: 0 (D), 1 (F), 2 (J), 3 (K) -> 決定插入哪一列
         speed: 音符的下落速度
         """
         if position in range(4):  # 位置必須是 0, 1, 2, 3
-            column = self.key_mapping[position]
-            x_pos = self.note_positions[position]
-            new_note = Note(x_pos, -50, speed, self.note_image)
-            self.note_columns[column].append(new_note)
-    def update_notes(self):
-        """更新所有音符的位置，並移除超出螢幕的音符"""
-        for column in self.note_columns.values():
-            for note in column:
-                note.update()
-                if note.y > HEIGHT:  # 如果音符超出螢幕範圍，則刪除
-                    self.comboEffectManager.reset_combo()
-                    self.missincrease()
-                    column.remove(note)
-    def draw_notes(self, screen):
-        for column in self.note_columns.values():
-            for note in column:
-                note.draw(screen)
+            self.spawned_until = note_time
+            if self.judged_early and (position, note_time) in self.judged_early:
+                self.judged_early.discard((position, note_time))
+                return
+            self.note_lanes.append(position, note_time, speed)
+    def update_notes(self, now_ms):
+        """依目前歌曲時間更新所有音符的位置，並移除超出螢幕的音符
+        now_ms: 目前的歌曲時間 (毫秒)
+        """
+        self.note_lanes.update(now_ms)
+        self.note_lanes.cull(HEIGHT)  # 超出螢幕範圍的音符不再繪製
+        missed = self.judgment.expire(now_ms)  # 超過判定範圍還沒按的音符視為 miss
+        self.expired_until = now_ms
+        if missed:
+            self.comboEffectManager.reset_combo()
+            self.missincrease(missed)
+    def draw_notes(self, screen, doreturn=False):
+        """ 繪製所有音符
+        doreturn: 是否回傳每個音符繪製的矩形 (髒矩形繪製使用)
+        """
+        lanes, ys = self.note_lanes.visible()
+        return screen.blits([(self.note_image, (self.note_positions[lane], y))
+                             for lane, y in zip(lanes.tolist(), ys.tolist())], doreturn)
 
-    def check_hit(self, key_index,judgment_line):
+    def check_hit(self, key_index, press_ms):
+        """ 以按鍵的時間判定指定按鍵列的音符
+        press_ms: 按下時的歌曲時間 (毫秒)，與判定線時間的差距決定結果
+        """
         score = 0
         if key_index in range(4):
-            column = self.key_mapping[key_index]
-            if self.note_columns[column]:
-                note = self.note_columns[column][0]
-                result = judgment_line.check_hit(note.y)  # 判定是否命中
+            result, note_time = self.judgment.judge(key_index, press_ms)  # 判定是否命中
+            if result is not None:
                 if result == 'perfect':
                     self.perfectnum +=1
                     score += 10  # 完美命中
@@ -112,21 +126,27 @@ class NoteManager:
                     score += 5  # 很好命中
                     color = (255, 255, 0)
                     self.comboEffectManager.increase_combo()
-                elif result == 'miss':
+                else:
                     self.missincrease()
                     score += 0  # 錯過
                     color = (255, 0, 0)
                     self.comboEffectManager.reset_combo()
-                else :
-                    return -1
-                self.note_columns[column].remove(note)
+                slot = self.note_lanes.take(key_index, note_time)
+                if slot != -1:
+                    note_y = self.note_lanes.position_at(key_index, slot, press_ms)
+                else:  # 已經出界或還沒生成
+                    note_y = self.note_lanes.judgment_y
+                    if note_time > self.spawned_until:
+                        self.judged_early.add((key_index, note_time))
                 self.hit_result_manager.add_result(result, (100, 100), color)
-                self.hitCircleEffectManager.add_effect((self.note_positions[key_index],note.y),YELLOW)
+                self.hitCircleEffectManager.add_effect((self.note_positions[key_index],note_y),YELLOW)
+            else:
+                return -1
         return score
     def countHIT(self):
         return self.perfectnum, self.greatnum, self.missnum
-    def missincrease(self):
-        self.missnum += 1
+    def missincrease(self, count=1):
+        self.missnum += count
 
 class Score_Font:
     """ 用於顯示右上角分數的模塊 """
@@ -137,204 +157,260 @@ class Score_Font:
         :param font_color: 字體顏色 (默認白色)
         :param position: 顯示位置 (x, y) (默認右上角)
         """
-        self.font = pygame.font.Font(None, font_size)  # 字體物件
+        self.font_size = font_size  # 字體大小
         self.font_color = font_color  # 字體顏色
         self.position = position  # 顯示位置
         self.score_value = 0  # 分數
+        self.score_text = None  # 分數改變時才重新 render
 
     def update_score(self, value):
         """ 更新分數
         :param value: 要增加的分數
         """
-        self.score_value += value
+        if value:
+            self.score_value += value
+            self.score_text = None
 
     def reset_score(self):
         """ 重置分數 """
         self.score_value = 0
+        self.score_text = None
 
     def draw(self, screen, width):
         """ 在畫面上繪製分數
         :param screen: Pygame 繪製的屏幕
         :param width: 屏幕的寬度，用於右上角對齊
+        :return: 繪製的矩形
         """
-        score_text = self.font.render(f"Score: {self.score_value}", True, self.font_color)
+        if self.score_text is None:
+            self.score_text = text_cache.render(f"Score: {self.score_value}", self.font_size, self.font_color)
+        score_text = self.score_text
         x = width - score_text.get_width() - 10  # 右上角對齊
         y = self.position[1]  # 使用指定的 y 值
-        screen.blit(score_text, (x, y))
+        return screen.blit(score_text, (x, y))
  
 class JudgmentLine:
-    def __init__(self, image_path, y_position = 500, judgment_size = 100, checkRate = 0.4):
+    def __init__(self, y_position = 500, lane_guides = False):
         """
-        初始化判定線模塊
-        :param image_path: 判定線圖片路徑
-        :param y_position: 判定線的Y軸位置，預設700
-        :param judgment_size: 判定範圍的大小，預設50
-        :param checkRate: 判定比率，預設0.4
+        初始化判定線模塊 (只負責畫面，判定由 NoteManager 的 JudgmentEngine 以時間計算)
+        :param y_position: 判定線的Y軸位置，預設500
+        :param lane_guides: 是否在每個按鍵列畫出導引線
         """
-        self.image = pygame.image.load(image_path)
         self.y_position = y_position
-        self.judgment_size = judgment_size  # 判定區域大小
-        self.checkRate = checkRate
-
-    def draw(self, screen):
-        """ 在屏幕上繪製判定線 """
-        #screen.blit(self.image, (0, self.y_position))
-        pygame.draw.rect(screen, (255, 255, 255), pygame.Rect(0, self.y_position + 20, WIDTH, 3))  # 繪製下方文字行
+        self.lane_guides = lane_guides
+        # 外觀 (set_skin 可以更換)
+        self.background_color = BLACK
+        self.line_color = WHITE
+        self.label_color = WHITE
+        self.guide_color = (40, 40, 40)
+        self.layer = None  # 靜態畫面的快取，大小或外觀改變時才重新組合
+
+    def set_skin(self, background_color=None, line_color=None, label_color=None, guide_color=None, lane_guides=None):
+        """ 更換外觀，下次取得 layer 時重新組合 (沒給的參數維持原本的設定) """
+        if background_color is not None:
+            self.background_color = background_color
+        if line_color is not None:
+            self.line_color = line_color
+        if label_color is not None:
+            self.label_color = label_color
+        if guide_color is not None:
+            self.guide_color = guide_color
+        if lane_guides is not None:
+            self.lane_guides = lane_guides
+        self.layer = None
+
+    def get_layer(self, size):
+        """ 取得背景、導引線、判定線與按鍵標籤組合好的靜態畫面
+        :param size: 畫面大小 (寬, 高)，與快取不同時重新組合
+        """
+        if self.layer is None or self.layer.get_size() != tuple(size):
+            self.layer = self.build_layer(size)
+        return self.layer
+
+    def build_layer(self, size):
+        """ 組合靜態畫面 (只在第一次、改變大小或外觀時呼叫) """
+        width, height = size
+        layer = pygame.Surface((width, height)).convert()
+        layer.fill(self.background_color)
+        if self.lane_guides:
+            note_width = 30  # 音符圖片縮放後的寬度
+            for x in note_positions.values():
+                pygame.draw.rect(layer, self.guide_color, pygame.Rect(x + note_width // 2 - 1, 0, 2, height))
+        pygame.draw.rect(layer, self.line_color, pygame.Rect(0, self.y_position + 20, width, 3))  # 繪製下方文字行
 
         # 顯示按鍵標籤
         key_labels = ['D', 'F', 'J', 'K']
-        font = pygame.font.Font(None, 36)
         for i, label in enumerate(key_labels):
-            text = font.render(label, True, (255, 255, 255))
-            screen.blit(text, (note_positions[i], self.y_position + 20))
-
-    def check_hit(self, note_y):
-        """ 判定音符是否命中，根據音符的位置和判定線範圍
-        :param note_y: 音符的當前y坐標
-        :param key_index: 音符的按鍵索引 (0: D, 1: F, 2: J, 3: K)
-        :return: 判斷結果: 'miss', 'perfect', 'great'
-        """
-        if note_y >= self.y_position - self.judgment_size*self.checkRate and note_y <= self.y_position + self.judgment_size*self.checkRate:
-            return 'perfect'  
-        elif note_y >= self.y_position - self.judgment_size and note_y <= self.y_position + self.judgment_size:
-            return 'great'
-        elif note_y >= self.y_position - self.judgment_size*2 and note_y <= self.y_position + self.judgment_size*2:
-            return 'miss' 
-        else :
-            return 'return'
+            text = text_cache.render(label, 36, self.label_color)
+            layer.blit(text, (note_positions[i], self.y_position + 20))
+        return layer
+
+    def draw(self, screen):
+        """ 在屏幕上繪製判定線 (整個靜態畫面一次 blit) """
+        screen.blit(self.get_layer(screen.get_size()), (0, 0))
 class HitResult:
     """ 單一的命中結果顯示（例如：Perfect、Great、Miss） """
-    def __init__(self, text, position, font, color, lifespan=1000, float_speed=-0.2):
+    __slots__ = ('text', 'x', 'y', 'font_size', 'color', 'alpha', 'lifespan', 'float_speed', 'creation_time')
+
+    def __init__(self, text, position, font_size, color, lifespan=1000, float_speed=-0.2):
         """
         :param text: 顯示的文字內容 (例如：'Perfect', 'Great', 'Miss')
         :param position: 初始位置 (x, y)
-        :param font: 字體物件
+        :param font_size: 字體大小
         :param color: 文字的顏色
         :param lifespan: 文字持續時間（毫秒）
         :param float_speed: 每幀向上浮動的速度
         """
+        self.reset(text, position, font_size, color, lifespan, float_speed)
+
+    def reset(self, text, position, font_size, color, lifespan=1000, float_speed=-0.2):
+        """ 重新初始化 (從物件池取出時使用)，參數同 __init__ """
         self.text = text
         self.x, self.y = position
-        self.font = font
+        self.font_size = font_size
         self.color = color
         self.alpha = 255  # 透明度 (從 255 開始逐漸減少)
         self.lifespan = lifespan  # 持續時間 (毫秒)
         self.float_speed = float_speed  # 文字的浮動速度
-        self.creation_time = pygame.time.get_ticks()  # 創建時間
+        self.creation_time = game_clock.ticks()  # 創建時間
 
     def update(self):
         """ 更新文字的浮動和透明度 """
         self.y += self.float_speed  # 文字位置上浮
-        elapsed_time = pygame.time.get_ticks() - self.creation_time
+        elapsed_time = game_clock.ticks() - self.creation_time
         if elapsed_time > self.lifespan:
             self.alpha = 0  # 完全透明
         else:
             self.alpha = max(255 - int(255 * (elapsed_time / self.lifespan)), 0)  # 計算透明度
 
     def draw(self, screen):
-        """ 在屏幕上繪製文字，並應用透明效果 """
+        """ 在屏幕上繪製文字，並應用透明效果，回傳繪製的矩形 (完全透明時為 None) """
         if self.alpha > 0:
-            text_surface = self.font.render(self.text, True, self.color)
+            text_surface = text_cache.render(self.text, self.font_size, self.color)
             text_surface.set_alpha(self.alpha)  # 設置透明度
-            screen.blit(text_surface, (self.x, self.y))            
+            rect = screen.blit(text_surface, (self.x, self.y))
+            text_surface.set_alpha(255)  # 快取中的 Surface 是共用的，繪製後還原
+            return rect            
 class HitResultManager:
     """ 管理多個命中結果的效果 """
-    def __init__(self, font):
+    def __init__(self, font_size=48, pool_size=0):
         """
-        :param font: 字體物件，用於繪製命中效果的字體
+        :param font_size: 字體大小，用於繪製命中效果的字體
+        :param pool_size: 預先建立的 HitResult 數量 (依譜面的最大同時數量決定)
         """
         self.results = []  # 儲存所有的 HitResult 物件
-        self.font = font
+        self.font_size = font_size
+        self.pool = ObjectPool(HitResult, pool_size, '', (0, 0), font_size, WHITE)
 
     def add_result(self, text, position, color):
         """ 新增一個新的命中結果 """
-        new_result = HitResult(text, position, self.font, color)
+        new_result = self.pool.acquire(text, position, self.font_size, color)
         self.results.append(new_result)
 
     def update(self):
-        """ 更新所有的命中結果，並移除已經結束的效果 """
-        for result in self.results[:]:
+        """ 更新所有的命中結果，並把已經結束的效果歸還物件池 """
+        results = self.results
+        keep = 0
+        for result in results:
             result.update()
-            if result.alpha <= 0:  # 如果透明度為 0，則刪除該效果
-                self.results.remove(result)
+            if result.alpha <= 0:  # 如果透明度為 0，則移除該效果
+                self.pool.release(result)
+            else:
+                results[keep] = result
+                keep += 1
+        del results[keep:]
 
     def draw(self, screen):
-        """ 繪製所有的命中結果 """
+        """ 繪製所有的命中結果，回傳繪製的矩形 """
+        rects = []
         for result in self.results:
-            result.draw(screen)
+            rect = result.draw(screen)
+            if rect:
+                rects.append(rect)
+        return rects
 class HitCircleEffect:
-    def __init__(self, position, color, lifetime=500):
+    __slots__ = ('position', 'color', 'atlas', 'lifetime', 'start_time')
+
+    def __init__(self, position, color, atlas, lifetime=500):
         """ 
         position: 中心位置 (x, y)
         color: 圓形顏色
+        atlas: 預先畫好的圓環影格 (HitCircleAtlas)
         lifetime: 存在的時間 (毫秒)
         """
+        self.reset(position, color, atlas, lifetime)
+
+    def reset(self, position, color, atlas, lifetime=500):
+        """ 重新初始化 (從物件池取出時使用)，參數同 __init__ """
         self.position = position
         self.color = color
+        self.atlas = atlas
         self.lifetime = lifetime
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = game_clock.ticks()
 
     def update(self):
         """ 更新效果的存活時間 """
-        elapsed = pygame.time.get_ticks() - self.start_time
+        elapsed = game_clock.ticks() - self.start_time
         if elapsed > self.lifetime:
             return False  # 告知外部，效果已結束
         return True
 
     def draw(self, screen):
-        """ 繪製圓環效果 """
-        elapsed = pygame.time.get_ticks() - self.start_time
-        radius_outer = int(20 + (30 * (elapsed / self.lifetime)))  # 外圓的半徑隨時間變大
-        radius_inner = int(radius_outer * 0.8)  # 內圓的半徑 (可調整大小)
-        alpha = max(0, 255 - int(255 * (elapsed / self.lifetime)))  # 透明度隨時間變小
-        # 1. 創建一個透明的 Surface，準備在上面畫出圓環
-        surface = pygame.Surface((radius_outer * 2, radius_outer * 2), pygame.SRCALPHA)
-
-        # 2. 畫出外圓
-        pygame.draw.circle(surface, self.color + (alpha,), (radius_outer, radius_outer), radius_outer)
-        
-        # 3. 畫出內圓，這部分會使中間變成透明
-        pygame.draw.circle(surface, (0, 0, 0, 0), (radius_outer, radius_outer), radius_inner)
-
-        # 4. 把這個圓環繪製到屏幕上
-        screen.blit(surface, (self.position[0] - radius_outer, self.position[1] - radius_outer))
+        """ 繪製圓環效果 (從影格表取出對應進度的圓環，直接 blit)，回傳繪製的矩形 """
+        elapsed = game_clock.ticks() - self.start_time
+        surface, radius_outer = self.atlas.frame(self.color, elapsed / self.lifetime)
+        return screen.blit(surface, (self.position[0] - radius_outer, self.position[1] - radius_outer))
 class HitCircleEffectManager:
     """ 用於管理多個命中擴散效果的管理器 """
-    def __init__(self):
-        """ 初始化管理器，創建一個用於存放圓形效果的列表 """
+    def __init__(self, atlas, pool_size=0):
+        """ 初始化管理器，創建一個用於存放圓形效果的列表
+        :param atlas: 預先畫好的圓環影格 (HitCircleAtlas)
+        :param pool_size: 預先建立的 HitCircleEffect 數量 (依譜面的最大同時數量決定)
+        """
         self.effects = []  # 存放 HitCircleEffect 物件的列表
+        self.atlas = atlas
+        self.pool = ObjectPool(HitCircleEffect, pool_size, (0, 0), YELLOW, atlas)
 
     def add_effect(self, position, color):
         """ 新增一個圓形擴散效果
         :param position: 命中效果的中心位置 (x, y)
         :param color: 圓形的顏色 (RGB)
         """
-        new_effect = HitCircleEffect(position, color)
+        new_effect = self.pool.acquire(position, color, self.atlas)
         self.effects.append(new_effect)
 
     def update(self):
-        """ 更新所有的圓形效果，並移除已經過期的效果 """
-        for effect in self.effects[:]:
-            if not effect.update():  # 如果效果已過期
-                self.effects.remove(effect)
+        """ 更新所有的圓形效果，並把已經過期的效果歸還物件池 """
+        effects = self.effects
+        keep = 0
+        for effect in effects:
+            if effect.update():
+                effects[keep] = effect
+                keep += 1
+            else:  # 如果效果已過期
+                self.pool.release(effect)
+        del effects[keep:]
 
     def draw(self, screen):
-        """ 繪製所有的圓形擴散效果 """
-        for effect in self.effects:
-            effect.draw(screen)
+        """ 繪製所有的圓形擴散效果，回傳繪製的矩形 """
+        return [effect.draw(screen) for effect in self.effects]
 class ComboEffectManager:
-    def __init__(self,font):
+    def __init__(self,font_size=48):
         """
-        :param font: 字體物件，用於繪製命中效果的字體
+        :param font_size: 字體大小，用於繪製連擊數字
         """
         self.combo = 0
-        self.font = font
+        self.font_size = font_size
+        self.text_surface = None  # 連擊數改變時才重新 render
     def reset_combo(self):
         """ 重置連擊 """
-        self.combo = 0
+        if self.combo:
+            self.combo = 0
+            self.text_surface = None
     def increase_combo(self):
         """ 連擊數字加1 """
         self.combo += 1
+        self.text_surface = None
     def __drawColor(self):
         if self.combo <= 20:
             return WHITE
@@ -343,134 +419,77 @@ class ComboEffectManager:
         else :
             return RED
     def draw(self, screen):
-        """ 在左上角顯示連擊數字 """
-        combo_text = f"Combo: {self.combo}"
-        text_surface = self.font.render(combo_text, True,self.__drawColor())
-        screen.blit(text_surface, (10, 10))
+        """ 在左上角顯示連擊數字，回傳繪製的矩形 """
+        if self.text_surface is None:
+            combo_text = f"Combo: {self.combo}"
+            self.text_surface = text_cache.render(combo_text, self.font_size, self.__drawColor())
+        return screen.blit(self.text_surface, (10, 10))
 class SoundManager:
-    def __init__(self,sound_file):
-        self.last_played = 0
-        pygame.mixer.init()
-        self.sound = sound_file
-
-    def play(self): #如果同時按下則只會有一次聲音
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_played >= 100:
-            self.sound.play()
-            self.last_played = current_time
-class menu:
-    # 創建按鈕函數
-    @staticmethod
-    def create_button(screen, text, x, y, width, height, color, hover_color):
-        FONT = pygame.font.Font(None, 36)
-        # 顏色定義
-        BLACK = (0, 0, 0)
-        mouse_pos = pygame.mouse.get_pos()
-        click = pygame.mouse.get_pressed()
-
-        # 檢測滑鼠是否在按鈕範圍內
-        if x < mouse_pos[0] < x + width and y < mouse_pos[1] < y + height:
-            pygame.draw.rect(screen, hover_color, (x, y, width, height))
-            if click[0] == 1:  # 滑鼠左鍵被按下
-                return True
-        else:
-            pygame.draw.rect(screen, color, (x, y, width, height))
-
-        # 畫出按鈕文字
-        text_surface = FONT.render(text, True, BLACK)
-        text_rect = text_surface.get_rect(center=(x + width // 2, y + height // 2))
-        screen.blit(text_surface, text_rect)
-        return False
+    def __init__(self, sound_bank, name='hit'):
+        """ 按鍵音效
+        sound_bank: 預先解碼的音效庫 (SoundBank)
+        name: 按鍵音效在音效庫中的名稱
+        """
+        self.sound_bank = sound_bank
+        self.name = name
 
+    def play(self): #同時按下時以不同的保留聲道重疊播放
+        self.sound_bank.play_hit(self.name)
+class menu:
     # 開始介面函數
     @staticmethod
     def show_start_menu():
-        FONT = pygame.font.Font(None, 50)
         # 顏色定義
         WHITE = (255, 255, 255)
         BLUE = (70, 130, 180)
         GRAY = (200, 200, 200)
-        WIDTH, HEIGHT = 900, 600  # 設定畫面大小
-        screen = pygame.display.set_mode((WIDTH, HEIGHT))
-
-        clock = pygame.time.Clock()
-        running = True
+        screen = app.screen  # 共用的畫面，不再每次重新 set_mode
+        WIDTH, HEIGHT = app.size
+
+        view = MenuScreen(screen, app.text_cache, WHITE)
+        # 標題
+        view.label("Rhythm Game", 50, BLUE, (WIDTH // 2, HEIGHT // 4))
+        # 開始遊戲按鈕
+        view.button("Start", (WIDTH // 2 - 100, HEIGHT // 2, 200, 50), GRAY, BLUE, "Start")
+        # 難度按鈕 (目前都是 Easy)
+        view.button("Easy", (WIDTH // 2 - 150, HEIGHT // 2 + 100, 100, 50), GRAY, BLUE, "Easy")
+        view.button("Medium", (WIDTH // 2 - 50, HEIGHT // 2 + 100, 100, 50), GRAY, BLUE, "Easy")
+        view.button("Hard", (WIDTH // 2 + 50, HEIGHT // 2 + 100, 100, 50), GRAY, BLUE, "Easy")
+        view.button("Adjust", (WIDTH // 2 - 430, HEIGHT // 2 + 230, 100, 50), GRAY, YELLOW, "Adjust")
 
         # 難度選擇
         difficulty = "Easy"  # 預設難度
-
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:  # 處理關閉窗口事件
-                    pygame.quit()
-                    return None
-
-            screen.fill(WHITE)
-
-            # 標題
-            title_surface = FONT.render("Rhythm Game", True, BLUE)
-            title_rect = title_surface.get_rect(center=(WIDTH // 2, HEIGHT // 4))
-            screen.blit(title_surface, title_rect)
-
-            # 開始遊戲按鈕
-            if menu.create_button(screen, "Start", WIDTH // 2 - 100, HEIGHT // 2, 200, 50, GRAY, BLUE):
-                #print(difficulty)
+        while True:
+            action = view.run()
+            if action == QUIT:  # 處理關閉窗口事件
+                pygame.quit()
+                return None
+            if action == "Start":
                 return difficulty
+            difficulty = action  # 難度或 Adjust，按下 Start 後才回傳
 
-            # 難度按鈕
-            if menu.create_button(screen, "Easy", WIDTH // 2 - 150, HEIGHT // 2 + 100, 100, 50, GRAY, BLUE):
-                difficulty = "Easy"
-            if menu.create_button(screen, "Medium", WIDTH // 2 - 50, HEIGHT // 2 + 100, 100, 50, GRAY, BLUE):
-                difficulty = "Easy"
-            if menu.create_button(screen, "Hard", WIDTH // 2 + 50, HEIGHT // 2 + 100, 100, 50, GRAY, BLUE):
-                difficulty = "Easy"
-            if menu.create_button(screen, "Adjust", WIDTH // 2 - 430, HEIGHT //2 + 230,100 ,50 , GRAY, YELLOW):
-                difficulty = "Adjust"
-
-            # 更新畫面
-            pygame.display.flip()
-            clock.tick(60)
+    @staticmethod
     def show_stop_menu(screen, WIDTH, HEIGHT):
-        FONT = pygame.font.Font(None, 50)
         WHITE = (255, 255, 255)
         BLUE = (70, 130, 180)
         GRAY = (200, 200, 200)
         DARK_GRAY = (100, 100, 100)
-        clock = pygame.time.Clock()
-
-        running = True
-
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:  # 關閉窗口
-                    pygame.quit()
-                    exit()
 
-            screen.fill(WHITE)
+        view = MenuScreen(screen, app.text_cache, WHITE)
+        # 顯示選單標題
+        view.label("Game Paused", 50, BLUE, (WIDTH // 2, HEIGHT // 4))
+        # 重新開始按鈕
+        view.button("Restart", (WIDTH // 2 - 100, HEIGHT // 2 + 20, 200, 50), GRAY, DARK_GRAY, "restart")
+        # 結束遊戲按鈕
+        view.button("Quit", (WIDTH // 2 - 100, HEIGHT // 2 + 90, 200, 50), GRAY, DARK_GRAY, "quit")
 
-            # 顯示選單標題
-            title_surface = FONT.render("Game Paused", True, BLUE)
-            title_rect = title_surface.get_rect(center=(WIDTH // 2, HEIGHT // 4))
-            screen.blit(title_surface, title_rect)
-
-            # 重新開始按鈕
-            if menu.create_button(screen, "Restart", WIDTH // 2 - 100, HEIGHT // 2 + 20, 200, 50, GRAY, DARK_GRAY):
-                return "restart"
-
-            # 結束遊戲按鈕
-            if menu.create_button(screen, "Quit", WIDTH // 2 - 100, HEIGHT // 2 + 90, 200, 50, GRAY, DARK_GRAY):
-                pygame.quit()
-                exit()
-
-            pygame.display.flip()
-            clock.tick(30)
+        if view.run() == "restart":
+            return "restart"
+        pygame.quit()  # 按下 Quit 或關閉窗口
+        exit()
 
+    @staticmethod
     def show_result_menu(screen, WIDTH, HEIGHT, perfect, great, miss):
-        pygame.init()
-        FONT_TITLE = pygame.font.Font(None, 80)
-        FONT_SCORE = pygame.font.Font(None, 60)
-        FONT_RESULT = pygame.font.Font(None, 50)
-
         # 顏色
         WHITE = (255, 255, 255)
         BLACK = (0, 0, 0)
@@ -480,150 +499,159 @@ class menu:
         GRAY = (200, 200, 200)
         DARK_GRAY = (100, 100, 100)
 
-        clock = pygame.time.Clock()
-        running = True
-
+        view = MenuScreen(screen, app.text_cache, WHITE)
         # 動畫數據
-        total_score = 0
         final_score = perfect * 10 + great * 5 + miss * 0
-        score_displayed = 0
-        text_offset = -200
-        glow_alpha = 0
-        glow_increasing = True
-
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    exit()
-
-            screen.fill(WHITE)
-
-            # 標題動畫
-            title_surface = FONT_TITLE.render("Game Results", True, BLUE)
-            title_rect = title_surface.get_rect(center=(WIDTH // 2, HEIGHT // 4 + text_offset))
-            screen.blit(title_surface, title_rect)
-            if text_offset < 0:
-                text_offset += 5
-
-            # 分數跳動效果
-            if score_displayed < final_score:
-                score_displayed += min(50, final_score - score_displayed)
-
-            # 顯示分數
-            perfect_surface = FONT_RESULT.render(f"Perfect: {perfect}", True, LIGHT_BLUE)
-            great_surface = FONT_RESULT.render(f"Great: {great}", True, BLUE)
-            miss_surface = FONT_RESULT.render(f"Miss: {miss}", True, RED)
-            score_surface = FONT_SCORE.render(f"Score: {score_displayed}", True, BLACK)
-
-            perfect_rect = perfect_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 80))
-            great_rect = great_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 30))
-            miss_rect = miss_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 20))
-            score_rect = score_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 100))
-
-            screen.blit(perfect_surface, perfect_rect)
-            screen.blit(great_surface, great_rect)
-            screen.blit(miss_surface, miss_rect)
-            screen.blit(score_surface, score_rect)
-
-            # 按鈕
-            if menu.create_button(screen, "Restart", WIDTH // 2 - 150, HEIGHT // 2 + 180, 150, 50, GRAY, DARK_GRAY):
-                return "restart"
-            if menu.create_button(screen, "Quit", WIDTH // 2 + 20, HEIGHT // 2 + 180, 150, 50, GRAY, DARK_GRAY):
-                pygame.quit()
-                exit()
+        animation = {'score': 0, 'offset': -200}
+        title = view.label("Game Results", 80, BLUE, (WIDTH // 2, HEIGHT // 4 + animation['offset']))
+        # 顯示分數
+        view.label(f"Perfect: {perfect}", 50, LIGHT_BLUE, (WIDTH // 2, HEIGHT // 2 - 80))
+        view.label(f"Great: {great}", 50, BLUE, (WIDTH // 2, HEIGHT // 2 - 30))
+        view.label(f"Miss: {miss}", 50, RED, (WIDTH // 2, HEIGHT // 2 + 20))
+        score_label = view.label("Score: 0", 60, BLACK, (WIDTH // 2, HEIGHT // 2 + 100))
+        # 按鈕
+        view.button("Restart", (WIDTH // 2 - 150, HEIGHT // 2 + 180, 150, 50), GRAY, DARK_GRAY, "restart")
+        view.button("Quit", (WIDTH // 2 + 20, HEIGHT // 2 + 180, 150, 50), GRAY, DARK_GRAY, "quit")
+
+        def animate(now):
+            """ 標題滑入與分數跳動 (每秒 30 次)，兩者都結束後停止動畫 """
+            if animation['offset'] < 0:
+                animation['offset'] += 5
+                title.set_text(title.text, (WIDTH // 2, HEIGHT // 4 + animation['offset']))
+            if animation['score'] < final_score:
+                animation['score'] += min(50, final_score - animation['score'])
+                score_label.set_text(f"Score: {animation['score']}")
+            return animation['offset'] < 0 or animation['score'] < final_score
+
+        if view.run(on_tick=animate, tick_ms=1000 // 30) == "restart":
+            return "restart"
+        pygame.quit()  # 按下 Quit 或關閉窗口
+        exit()
 
-            pygame.display.flip()
-            clock.tick(30)   
-    
-    def start_adjust_menu():
-        font = pygame.font.Font(None, 50)
-        WHITE = (255, 255, 255)
+    @staticmethod
+    def start_calibration_menu():
+        """ 延遲校正：播放節拍器，玩家跟著節拍按 D, F, J, K，估計按鍵相對聲音的平均延遲
+        完成後儲存校正結果，遊戲中判定時從按鍵時間扣除
+        return: 校正結果 (calibration.estimate_offset 的回傳值)，沒有完成校正時為 None
+        """
         BLUE = (70, 130, 180)
         GRAY = (200, 200, 200)
         DARK_GRAY = (100, 100, 100)
-        
-        input_rect = pygame.Rect(350, 250, 200, 40)  # 輸入框位置和大小
-        active = False
-
-        # 創建退出按鈕
-        exit_button_rect = pygame.Rect(400, 475, 100, 30)  # 按鈕的位置和大小
-        exit_button_text = '  Back'
-        button_font = pygame.font.Font(None, 36)
-        clock = pygame.time.Clock()
-        running = True
-        text = ''
-        while running:
-            
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    return None
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if input_rect.collidepoint(event.pos):
-                        active = not active
-                    elif exit_button_rect.collidepoint(event.pos):
-                        # 按下EXIT後輸出文本框內的值
-                        #print(f"Final text entered: {text}")
-                        return text
-                elif event.type == pygame.KEYDOWN:
-                    if active:
-                        if event.key == pygame.K_RETURN:
-                            # 按下回車鍵時，輸出文本
-                            print(f"Text entered: {text}")
-                        elif event.key == pygame.K_BACKSPACE:
-                            text = text[:-1]  # 刪除上個字元
-                        else:
-                            text += event.unicode  # 添加新字元
-            Adjustdelay=0
-            screen.fill(WHITE)
-            title_surface = font.render("Adjust your delay!(>0)", True, BLUE)
-            title_rect = title_surface.get_rect(center=(WIDTH // 2, HEIGHT // 4))
-            screen.blit(title_surface, title_rect)
-
-            txt_surface = font.render(text, True, BLACK)
-            screen.blit(txt_surface, (input_rect.x + 10, input_rect.y + 5))
-            pygame.draw.rect(screen, RED, input_rect, 2)
 
-            
-            pygame.draw.rect(screen, BLUE, exit_button_rect)
-            text_surf = button_font.render(exit_button_text, True, BLACK)
-            screen.blit(text_surf, (exit_button_rect.x + 10, exit_button_rect.y + 5))
-            
+        view = MenuScreen(screen, app.text_cache, WHITE)
+        view.label("Tap D / F / J / K with the beat", 50, BLUE, (WIDTH // 2, HEIGHT // 4))
+        status = view.label("", 40, BLACK, (WIDTH // 2, HEIGHT // 2))
+        buttons = [view.button("Retry", (WIDTH // 2 - 160, HEIGHT // 2 + 120, 150, 50), GRAY, DARK_GRAY, "retry"),
+                   view.button("Back", (WIDTH // 2 + 10, HEIGHT // 2 + 120, 150, 50), GRAY, DARK_GRAY, "back")]
+        calibration = Calibration()
+        measured = {'result': None}
+
+        def tap(event):
+            """ 以事件取得的時間記錄敲擊 """
+            if event.type == pygame.KEYDOWN and event.key in LANE_KEYS:
+                calibration.tap(view.event_ns / 1e6)
+
+        def metronome(now):
+            """ 到時間就播放下一拍，全部結束後計算並儲存結果 """
+            # 以 AudioClock 估計的輸出延遲記錄實際聽到的時間，遊戲中的歌曲時間也扣除同一個延遲
+            if calibration.due_beat(now, game_clock.audio.latency_ms):
+                app.sound_bank.play_hit('hit')  # 節拍器的聲音
+            if not calibration.finished(now):
+                played, beats = calibration.progress()
+                status.set_text(f"Beat {played} / {beats}")
+                return True
+            result = calibration.result()
+            if result is not None:
+                save_calibration(result)
+                status.set_text(f"Offset {result['offset']:+.1f} ms (std {result['std']:.1f} ms)")
+            else:
+                status.set_text("Not enough taps, try again")
+            measured['result'] = result
+            for button in buttons:
+                view.set_visible(button, True)
+            return False
+
+        while True:
+            measured['result'] = None
+            for button in buttons:
+                view.set_visible(button, False)
+            calibration.begin(time.perf_counter_ns() / 1e6)
+            # 量測中每毫秒檢查一次節拍，按鍵事件一到就醒來記錄時間
+            action = view.run(on_event=tap, on_tick=metronome, tick_ms=1)
+            if action == QUIT:
+                pygame.quit()
+                return None
+            if action == "back":
+                return measured['result']
 
-            pygame.display.flip()
-            clock.tick(FPS)
-    
     # 新增倒數計時函數
     @staticmethod
-    def start_countdown(screen, WIDTH, HEIGHT):
-        FONT = pygame.font.Font(None, 150)
+    def start_countdown(screen, WIDTH, HEIGHT, loader=None, required=()):
+        """ 倒數 3 秒 (最後再等 0.5 秒) 後開始遊戲，倒數的同時背景繼續載入並在下方顯示進度
+        loader: 背景資源載入 (AssetLoader)，None 則只倒數
+        required: 開始遊戲前必須載入完成的資源，倒數結束時還沒完成就繼續顯示載入進度
+        """
         RED = (255, 0, 0)
+        GRAY = (100, 100, 100)
         countdown_time = 3  # 從 3 開始倒數
+        bar = pygame.Rect(WIDTH // 4, HEIGHT - 80, WIDTH // 2, 12)  # 載入進度條
 
-        # 加載倒數音效
-        countdown_sound = pygame.mixer.Sound('countdown.mp3')
-
-        for i in range(countdown_time, 0, -1):
+        clock = pygame.time.Clock()
+        start = pygame.time.get_ticks()
+        shown = None  # 目前畫面上的數字
+        drawn = None  # 目前畫面上的 (數字, 載入進度)
+        while True:
+            elapsed = pygame.time.get_ticks() - start
+            remaining = countdown_time - elapsed // 1000  # 目前顯示的數字，0 代表倒數結束
+            loading = loader is not None and not loader.done(*required)
+            if elapsed >= countdown_time * 1000 + 500 and not loading:  # 倒數結束再等 0.5 秒，準備開始遊戲
+                break
+            state = (remaining, loader.progress() if loading else None)
+            if state == drawn:  # 數字與進度都沒變，不用重畫
+                pygame.event.pump()
+                clock.tick(60)
+                continue
+
+            drawn = state
             screen.fill((0, 0, 0))  # 清空畫面
-            countdown_text = FONT.render(str(i), True, RED)
-            countdown_rect = countdown_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-            screen.blit(countdown_text, countdown_rect)
+            if remaining > 0:
+                countdown_text = text_cache.render(str(remaining), 150, RED)
+                countdown_rect = countdown_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
+                screen.blit(countdown_text, countdown_rect)
+                # 播放音效 (每個數字一次，音效還沒載入完成時略過)
+                if remaining != shown and (loader is None or loader.done('sounds')):
+                    app.sound_bank.play('countdown')
+            if loading:
+                pygame.draw.rect(screen, GRAY, bar, 1)
+                pygame.draw.rect(screen, WHITE, (bar.x, bar.y, int(bar.width * state[1]), bar.height))
+                if remaining <= 0:
+                    loading_text = text_cache.render("Loading...", 36, WHITE)
+                    screen.blit(loading_text, loading_text.get_rect(center=(WIDTH // 2, HEIGHT // 2)))
+            shown = remaining
             pygame.display.flip()
-
-             # 播放音效
-            countdown_sound.play()
-
-            pygame.time.wait(1000)  # 等待 1 秒
-
-        # 倒數結束，開始遊戲
-        screen.fill((0, 0, 0))  # 清空畫面
-        pygame.display.flip()
-        pygame.time.wait(500)  # 等待 0.5 秒，準備開始遊戲
+            pygame.event.pump()  # 倒數時視窗仍然可以回應
+            clock.tick(60)
 class GameControl:
     
     @staticmethod
-    def GameStart(gameRuning,score,FPS,running,delay = 0):
+    def GameStart(gameRuning,score,FPS,running,delay = 0, on_end=None, profiler=None, renderer=None, input_capture=None,
+                  replay=None):
+        """ 遊戲主迴圈，時間都從 game_clock 取得 (無頭模擬時換成 VirtualClock)
+        on_end: 結束時呼叫的函式 (score, current_time, perfect, great, miss)，預設顯示結算畫面
+        profiler: 每幀各階段耗時的量測 (FrameProfiler)，F3 切換畫面顯示
+        renderer: 畫面繪製方式 (DirtyRenderer)，預設依 DIRTY_RECTS 決定是否使用髒矩形
+        input_capture: 帶時間戳記的按鍵輸入 (InputCapture)，結束後可以從它取得輸入到判定的延遲分布
+        delay: 校正的輸入延遲 (毫秒)，判定時從按鍵時間扣除 (不修改譜面)
+        replay: 記錄按鍵事件的 ReplayRecorder，結束 (P) 時寫入判定結果
+        return: 結束時的 (perfect, great, miss)，關閉視窗時為 None
+        """
+        if profiler is None:
+            # 只有要輸出 FRAME_TRACE_PATH 時才保留每一幀的紀錄
+            profiler = FrameProfiler(font=app.text_cache.get_font(24), keep_trace=FRAME_TRACE_PATH is not None)
+        if renderer is None:
+            renderer = DirtyRenderer(screen, enabled=DIRTY_RECTS)
+        if input_capture is None:
+            input_capture = InputCapture()
         score.load_music()
         score.start_music()
         # 按鍵對應的 X 位置
@@ -637,82 +665,119 @@ class GameControl:
         # 遊戲變數
         notes = []
         note_width = 100  # 每個音符的寬度
+        # 依譜面的最大同時擊中數決定物件池大小
+        note_times = [note[0] for note in score.note_data]
         # 創建 HitResultManager
-        hit_result_manager = HitResultManager(font)
+        hit_result_manager = HitResultManager(font_size=48, pool_size=peak_concurrency(note_times, 1000))
         #HitCircleEffect創建
-        hitCircleEffectManager = HitCircleEffectManager()
+        hitCircleEffectManager = HitCircleEffectManager(hit_circle_atlas, pool_size=peak_concurrency(note_times, 500))
         #ComboEffectManager創建
-        comboEffectManager = ComboEffectManager(font)
+        comboEffectManager = ComboEffectManager(font_size=48)
         # 創建判定線
-        judgment_line = JudgmentLine('note.png')
+        judgment_line = JudgmentLine(lane_guides=LANE_GUIDES)
         #note_manager創建
-        note_manager = NoteManager(note_positions, score.scaled_image,hit_result_manager,hitCircleEffectManager,comboEffectManager) 
+        note_manager = NoteManager(note_positions, score.scaled_image,hit_result_manager,hitCircleEffectManager,comboEffectManager, note_data=score.note_data)
         # 分數
         score_value = 0
         #score_font創建
         score_font = Score_Font(font_size=36, font_color=WHITE, position=(WIDTH - 10, 10))
-        # 按鍵音效
-        hit_sounds = pygame.mixer.Sound('pop.mp3')
-        # SoundManager創建
-        soundManager = SoundManager(hit_sounds)
+        # SoundManager創建 (按鍵音效)
+        soundManager = SoundManager(app.sound_bank)
         
-        local_note_data = copy.copy(score.note_data)
-        while gameRuning:
-            screen.fill(BLACK)
+        # 譜面排程器 (以游標取出到時間的音符)
+        scheduler = ChartScheduler(score.note_data)
+
+        def finish_replay():
+            """ 以目前的判定結果寫出重播紀錄 (按 P 結束或關閉視窗時) """
+            if replay is None:
+                return
+            try:
+                replay.finish(*note_manager.countHIT(), note_manager.expired_until)
+            except OSError as error:  # 寫不出重播檔不影響結算
+                print(f"replay not saved: {error}")
 
-    # 處理事件
-            for event in pygame.event.get():
+        while gameRuning:
+            profiler.begin_frame()
+            # 背景、判定線與按鍵標籤是預先組合好的靜態畫面 (畫面大小或外觀改變時才重新組合)
+            playfield = judgment_line.get_layer(screen.get_size())
+            if playfield is not renderer.background:
+                renderer.set_background(playfield)
+            renderer.begin_frame()
+    # 獲取當前時間 (所有音符位置與判定都以此時間計算)
+            input_capture.poll()
+            current_time = game_clock.song_time()
+            frame_ns = time.perf_counter_ns()  # 用來把按鍵的時間戳記換算成歌曲時間
+            profiler.mark('clear')
+
+    # 處理事件 (D, F, J, K 以外的事件)
+            for event in input_capture.events():
                 if event.type == pygame.QUIT:
+                    finish_replay()
                     running[0] = False
                     return
-        # 玩家鍵盤判定 (D, F, J, K)
                 if event.type == pygame.KEYDOWN:
-                    if event.key in [pygame.K_d, pygame.K_f, pygame.K_j, pygame.K_k]:
-                        #print("Keydown")
-                        i = [pygame.K_d, pygame.K_f, pygame.K_j, pygame.K_k].index(event.key)
-                        get_value = note_manager.check_hit(i, judgment_line)
-                        soundManager.play() #播放音效
-                        if get_value != -1: #如果是有效鍵位
-                            score_value += get_value
-                            score_font.update_score(get_value)
+                    if event.key == pygame.K_F3:
+                        profiler.toggle_overlay()
                     if(event.key in [pygame.K_p]):
                         perfect = 0
                         great = 0
                         miss = 0
                         perfect ,great, miss = note_manager.countHIT()
-                        GameControl.GameEnd(score,current_time, perfect, great, miss)
+                        finish_replay()
+                        if FRAME_TRACE_PATH:
+                            profiler.dump(FRAME_TRACE_PATH, extra={'input_latency_ms': input_capture.summary(),
+                                                                   'audio_clock_ms': game_clock.sync_summary()})
+                        (on_end or GameControl.GameEnd)(score,current_time, perfect, great, miss)
                         #menu.show_stop_menu(screen, WIDTH, HEIGHT)
-                        return
-    # 獲取當前時間
-            current_time = pygame.mixer.music.get_pos() #
-
+                        return perfect, great, miss
+        # 玩家鍵盤判定 (D, F, J, K)：依抵達順序，以按鍵的時間戳記判定
+            for captured_ns, i, pressed, song_time in input_capture.drain():
+                press_time = input_capture.to_song_time(captured_ns, song_time, frame_ns, current_time)
+                if replay is not None:
+                    replay.record(press_time, i, pressed, note_manager.expired_until)
+                if not pressed:  # 放開按鍵 (目前沒有長押音符)
+                    continue
+                get_value = note_manager.check_hit(i, press_time - delay)
+                input_capture.judged(captured_ns)
+                soundManager.play() #播放音效
+                if get_value != -1: #如果是有效鍵位
+                    score_value += get_value
+                    score_font.update_score(get_value)
+            profiler.mark('events')
     # 音符生成
-            for note_info in local_note_data[:]:
-                note_time, position, speed = note_info
-                if current_time >= note_time:  # 如果當前時間達到了音符的出現時間
-                    note_manager.input_note(note_time, position, speed)
-                    local_note_data.remove(note_info)  # 移除已經生成的音符
+            for note_time, position, speed in scheduler.due(current_time):  # 當前時間達到出現時間的音符
+                note_manager.input_note(note_time, position, speed)
+            profiler.mark('spawn')
 
     # 音符更新與繪製
-            note_manager.update_notes()
-            note_manager.draw_notes(screen)
-
+            note_manager.update_notes(current_time)
+            profiler.mark('update_notes')
+            renderer.track(note_manager.draw_notes(screen, renderer.enabled))
+            profiler.mark('draw_notes')
 
-    # 繪製判定線
-            judgment_line.draw(screen)
             # 顯示擊中結果
             hit_result_manager.update()
-            hit_result_manager.draw(screen)
+            renderer.track(hit_result_manager.draw(screen))
+            profiler.mark('hit_results')
             # 顯示擊中反饋
             hitCircleEffectManager.update()
-            hitCircleEffectManager.draw(screen)
+            renderer.track(hitCircleEffectManager.draw(screen))
+            profiler.mark('hit_circles')
             # 顯示combo數
-            comboEffectManager.draw(screen)
+            combo_rect = comboEffectManager.draw(screen)
+            renderer.track_hud('combo', comboEffectManager.text_surface, combo_rect)
             # 顯示分數
-            score_font.draw(screen, WIDTH)
-            # 更新屏幕
-            pygame.display.flip()
-            clock.tick(FPS)
+            score_rect = score_font.draw(screen, WIDTH)
+            renderer.track_hud('score', score_font.score_text, score_rect)
+            renderer.track(profiler.draw(screen))
+            profiler.mark('hud')
+            input_capture.poll()  # 送出畫面前再取一次按鍵，縮短按鍵等待的時間
+            # 更新屏幕 (只送出有變化的區域)
+            renderer.present()
+            profiler.mark('flip')
+            game_clock.tick(FPS, idle=input_capture.poll)  # 等待下一幀的空檔持續取出按鍵
+            profiler.mark('tick')
+            profiler.end_frame()
     @staticmethod
     def GameEnd(score,current_time, perfect, great, miss):
         score.End_music()
@@ -720,414 +785,107 @@ class GameControl:
         
             
 #------------------------------------------------------------------
-# 初始化 Pygame
-
-
-
-pygame.init()
+# 初始化 (匯入 main_test 不會建立視窗或載入素材，由 setup / load_assets 進行)
 
 # 屏幕大小
 WIDTH, HEIGHT = 900, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("下落式節奏遊戲")
-#字體
-font = pygame.font.Font(None, 48)
 # 顏色
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 GREEN = (0, 255, 0)
 YELLOW = (255, 255, 0)
 RED = (255, 0, 0)
-adspeed=0
-start_sound = pygame.mixer.Sound('start.mp3')
-start_sound.play()
+# 命中圓環的動畫影格數
+HIT_CIRCLE_FRAMES = 32
+# 音效 {名稱: 音效檔}
+SOUNDS = {'start': 'start.mp3', 'countdown': 'countdown.mp3', 'hit': 'pop.mp3'}
+# 譜面與音樂 (譜面格式見 chart_format.read_any；note_data.rgc 由 note_data.txt 轉換而來)
+CHART_PATH = 'note_data.rgc'
+MUSIC_PATH = 'test.mp3'
+# 音符圖片與縮放後的大小
+NOTE_IMAGE_PATH = 'note.png'
+NOTE_SIZE = (30, 30)
+# 開始遊戲前必須載入完成的資源 (見 load_assets)
+GAME_ASSETS = ('sounds', 'note', 'chart', 'music')
+# 共用的資源 (setup 之後才有)：畫面、mixer、字型、圖片與音效
+app = None
+screen = None
+text_cache = None  # 字體 (共用的文字繪製快取)
+sound_bank = None
+hit_circle_atlas = None  # 命中圓環的動畫影格 (烘焙一次)
+
+
+def setup():
+    """ 建立視窗與共用的資源，只有第一次呼叫時執行 """
+    global app, screen, text_cache, sound_bank, hit_circle_atlas
+    if app is None:
+        app = AppContext((WIDTH, HEIGHT), "下落式節奏遊戲")
+        screen = app.screen
+        text_cache = app.text_cache
+        sound_bank = app.sound_bank
+        hit_circle_atlas = HitCircleAtlas(frames=HIT_CIRCLE_FRAMES, colors=(YELLOW,))
+    return app
+
+
+def load_sounds():
+    """ 解碼所有音效 (已載入的會略過) """
+    setup().sound_bank.load_all(SOUNDS)
+
+
+def read_file(path):
+    """ 把檔案讀進記憶體，檔案不存在時回傳 None """
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def read_chart(path):
+    """ 讀取譜面：二進位譜面 (.rgc) 直接載入，文字格式在另一個行程解析
+    ast.literal_eval 解析時一直持有 GIL，在載入執行緒解析大譜面會讓選單與倒數停住
+    """
+    if path.endswith('.rgc'):
+        return read_any(path)
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(read_any, path).result()
+
+
+def load_note_sprites():
+    """ 解碼音符圖片並縮放成遊戲使用的大小 (存在 app 的圖片快取) """
+    return setup().image(NOTE_IMAGE_PATH, NOTE_SIZE)
 
-# 時鐘控制
-clock = pygame.time.Clock()
+
+def play_start_sound(_):
+    """ 音效載入完成後播放開場音效 (在載入的執行緒呼叫) """
+    sound_bank.play('start')
+
+
+def load_assets(loader=None):
+    """ 在背景同時載入音效、音符圖片、譜面與音樂，開始選單不用等待
+    音效載入後播放開場音效
+    :param loader: 使用的 AssetLoader，None 則建立一個
+    return: AssetLoader，以 'sounds' / 'note' / 'chart' / 'music' 取得各項資源
+    """
+    setup()
+    loader = loader or AssetLoader()
+    loader.submit('sounds', load_sounds, on_done=play_start_sound)
+    loader.submit('note', load_note_sprites)
+    loader.submit('chart', read_chart, CHART_PATH)
+    loader.submit('music', read_file, MUSIC_PATH)
+    return loader
+
+# 時鐘控制 (歌曲時間、效果動畫時間與幀率都由 game_clock 提供)
+game_clock = RealClock()
 FPS = 120
-# 創建樂譜
-note_data=[[584.7968578338623, 2, 5],
-[1013.7962818145752, 2, 5],
-[1462.5794410705566, 2, 5],
-[1861.9484424591064, 2, 5],
-[2282.4248790740967, 3, 5],
-[2696.39892578125, 3, 5],
-[3137.8597736358643, 3, 5],
-[3557.5613498687744, 3, 5],
-[3940.9253120422363, 1, 5],
-[4405.67512512207, 1, 5],
-[4815.329265594482, 1, 5],
-[5308.16216468811, 1, 5],
-[5734.184694290161, 0, 5],
-[6109.8451137542725, 0, 5],
-[6551.516962051392, 0, 5],
-[6988.080930709839, 0, 5],
-[7438.8951778411865, 3, 5],
-[7872.033786773682, 2, 5],
-[8283.629131317139, 1, 5],
-[8784.053993225098, 0, 5],
-[9199.25971031189, 3, 5],
-[9587.548446655273, 2, 5],
-[10014.039707183838, 1, 5],
-[10426.412534713745, 0, 5],
-[10870.583486557007, 2, 5],
-[11301.343154907227, 3, 5],
-[11734.194707870483, 1, 5],
-[12136.371803283691, 0, 5],
-[12581.668329238892, 2, 5],
-[12993.143272399902, 1, 5],
-[13492.441844940186, 3, 5],
-[13879.791927337646, 0, 5],
-[14354.543399810791, 0, 5],
-[14356.89754486084, 1, 5],
-[14360.254716873169, 3, 5],
-[14361.769390106201, 2, 5],
-[14743.422937393188, 2, 5],
-[15190.386009216309, 3, 5],
-[15607.86361694336, 0, 5],
-[16013.825130462646, 2, 5],
-[16444.763135910034, 3, 5],
-[16892.05403327942, 1, 5],
-[17280.59024810791, 0, 5],
-[17811.43469810486, 2, 5],
-[18175.953102111816, 3, 5],
-[18556.06575012207, 0, 5],
-[18999.883604049683, 1, 5],
-[19432.68485069275, 3, 5],
-[19844.806385040283, 2, 5],
-[20278.65309715271, 1, 5],
-[20689.73250389099, 0, 5],
-[21138.623666763306, 2, 5],
-[21568.943691253662, 2, 5],
-[22001.65123939514, 1, 5],
-[22442.605209350586, 1, 5],
-[22876.03850364685, 3, 5],
-[23301.449489593506, 3, 5],
-[23686.56177520752, 0, 5],
-[24128.770065307617, 0, 5],
-[24560.26930809021, 3, 5],
-[24959.828567504883, 2, 5],
-[25426.492881774902, 1, 5],
-[25826.392364501953, 0, 5],
-[26275.44493675232, 3, 5],
-[26684.10129547119, 2, 5],
-[27145.781469345093, 1, 5],
-[27519.305658340454, 0, 5],
-[28036.8923664093, 0, 5],
-[28039.63966369629, 3, 5],
-[28046.925973892212, 2, 5],
-[29644.366455078125, 2, 5],
-[30303.705406188965, 3, 5],
-[30971.52442932129, 2, 5],
-[31460.32042503357, 1, 5],
-[31909.590911865234, 0, 5],
-[32306.497526168823, 3, 5],
-[32721.145820617676, 2, 5],
-[33177.55169868469, 1, 5],
-[33775.56891441345, 3, 5],
-[34423.979473114014, 2, 5],
-[34864.84785079956, 0, 5],
-[35487.354707717896, 3, 5],
-[36118.20192337036, 2, 5],
-[36587.93206214905, 3, 5],
-[37213.142585754395, 2, 5],
-[37854.964208602905, 3, 5],
-[38302.386474609375, 2, 5],
-[38722.28665351868, 3, 5],
-[39150.6151676178, 2, 5],
-[39578.7796497345, 1, 5],
-[40007.693004608154, 0, 5],
-[40638.70282173157, 3, 5],
-[41251.97525024414, 2, 5],
-[41709.70959663391, 3, 5],
-[42325.19454956055, 2, 5],
-[42967.988443374634, 1, 5],
-[43449.27997589111, 0, 5],
-[44081.33358955383, 3, 5],
-[44678.49202156067, 2, 5],
-[45186.0360622406, 3, 5],
-[45601.917934417725, 2, 5],
-[46018.49002838135, 1, 5],
-[46471.101236343384, 0, 5],
-[46883.8960647583, 2, 5],
-[47327.32219696045, 1, 5],
-[47529.91719245911, 3, 5],
-[48175.3692150116, 0, 5],
-[48638.92407417297, 2, 5],
-[49055.84354400635, 3, 5],
-[49228.18465232849, 1, 5],
-[49839.77265357971, 0, 5],
-[50303.15728187561, 2, 5],
-[50763.57765197754, 3, 5],
-[51542.764377593994, 2, 5],
-[52000.225257873535, 1, 5],
-[52439.81308937073, 0, 5],
-[53338.30256462097, 3, 5],
-[53720.74933052063, 2, 5],
-[54141.81275367737, 3, 5],
-[54360.48455238342, 2, 5],
-[54796.2016582489, 3, 5],
-[54998.22778701782, 2, 5],
-[55460.91814041138, 0, 5],
-[55886.52129173279, 1, 5],
-[56095.84040641785, 0, 5],
-[56492.837142944336, 1, 5],
-[56685.652685165405, 0, 5],
-[57115.592670440674, 3, 5],
-[57565.23342132568, 2, 5],
-[57770.21903991699, 1, 5],
-[58217.9557800293, 0, 5],
-[58436.69099807739, 3, 5],
-[58877.8130531311, 2, 5],
-[59294.741344451904, 1, 5],
-[59513.50231170654, 3, 5],
-[59753.84016036987, 0, 5],
-[59964.172077178955, 2, 5],
-[60155.5242061615, 1, 5],
-[60587.43305206299, 3, 5],
-[61013.995361328125, 2, 5],
-[61229.76107597351, 2, 5],
-[61667.51570701599, 1, 5],
-[61890.58847427368, 1, 5],
-[62318.616819381714, 0, 5],
-[62734.687519073486, 3, 5],
-[62945.330810546875, 3, 5],
-[63359.91735458374, 2, 5],
-[63600.203466415405, 2, 5],
-[64042.18120574951, 3, 5],
-[64444.59099769592, 1, 5],
-[64666.83979034424, 1, 5],
-[65088.59844207764, 2, 5],
-[65320.06878852844, 2, 5],
-[65771.861743927, 0, 5],
-[66200.03671646118, 0, 5],
-[66412.55278587341, 0, 5],
-[66635.10031700134, 0, 5],
-[66833.12005996704, 0, 5],
-[67052.34761238098, 0, 5],
-[67473.8025188446, 2, 5],
-[67885.02497673035, 3, 5],
-[68092.54021644592, 3, 5],
-[68525.66547393799, 1, 5],
-[68746.85640335083, 1, 5],
-[69186.44399642944, 2, 5],
-[69585.66446304321, 3, 5],
-[69820.64576148987, 3, 5],
-[70242.38271713257, 2, 5],
-[70485.20250320435, 2, 5],
-[70899.11170005798, 3, 5],
-[71293.07527542114, 1, 5],
-[71511.44213676453, 1, 5],
-[71950.84924697876, 2, 5],
-[72204.36806678772, 1, 5],
-[72419.05303001404, 3, 5],
-[72624.08514022827, 0, 5],
-[73060.40425300598, 2, 5],
-[73268.55154037476, 2, 5],
-[73494.91686820984, 3, 5],
-[73682.48362541199, 3, 5],
-[73926.1426448822, 1, 5],
-[74297.61095046997, 0, 5],
-[74717.84682273865, 3, 5],
-[74944.8558807373, 2, 5],
-[75412.74828910828, 1, 5],
-[75624.70955848694, 0, 5],
-[75830.43999671936, 2, 5],
-[76072.28465080261, 1, 5],
-[76494.43955421448, 3, 5],
-[76698.6002445221, 3, 5],
-[76912.70680427551, 2, 5],
-[77103.16963195801, 0, 5],
-[77314.177942276, 1, 5],
-[77548.73509407043, 3, 5],
-[77742.66119003296, 2, 5],
-[78204.93431091309, 2, 5],
-[78426.29165649414, 2, 5],
-[78826.89423561096, 3, 5],
-[79033.90760421753, 3, 5],
-[79232.40633010864, 3, 5],
-[79447.79057502747, 1, 5],
-[79894.55146789551, 2, 5],
-[80117.91939735413, 2, 5],
-[80340.68818092346, 0, 5],
-[80537.49985694885, 0, 5],
-[80773.61435890198, 1, 5],
-[81187.71452903748, 3, 5],
-[81596.22712135315, 2, 5],
-[81819.44508552551, 1, 5],
-[82232.87672996521, 0, 5],
-[82458.34488868713, 2, 5],
-[82683.73079299927, 2, 5],
-[82926.09281539917, 1, 5],
-[83128.53164672852, 3, 5],
-[83342.51470565796, 0, 5],
-[83556.23216629028, 2, 5],
-[83802.65731811523, 1, 5],
-[84009.82613563538, 3, 5],
-[84207.08770751953, 0, 5],
-[84393.59683990479, 2, 5],
-[84620.60422897339, 1, 5],
-[85023.44913482666, 3, 5],
-[85238.46502304077, 0, 5],
-[85476.63350105286, 2, 5],
-[86337.63117790222, 3, 5],
-[86537.29028701782, 3, 5],
-[86976.72266960144, 0, 5],
-[87180.91268539429, 0, 5],
-[88019.73099708557, 2, 5],
-[88237.9056930542, 2, 5],
-[88704.77766990662, 1, 5],
-[88887.10446357727, 1, 5],
-[89744.28362846375, 3, 5],
-[89959.96255874634, 3, 5],
-[90401.34592056274, 0, 5],
-[90599.58691596985, 0, 5],
-[91039.51926231384, 2, 5],
-[91489.27326202393, 1, 5],
-[91676.49121284485, 1, 5],
-[92129.42309379578, 3, 5],
-[92335.57124137878, 3, 5],
-[93160.83068847656, 2, 5],
-[93375.68755149841, 3, 5],
-[93840.82527160645, 1, 5],
-[94042.69618988037, 0, 5],
-[94891.67423248291, 2, 5],
-[95095.93577384949, 3, 5],
-[95540.99531173706, 1, 5],
-[95756.82182312012, 0, 5],
-[96608.3878993988, 3, 5],
-[96806.91165924072, 2, 5],
-[97272.71003723145, 0, 5],
-[97467.42243766785, 1, 5],
-[97695.60904502869, 2, 5],
-[97921.57382965088, 0, 5],
-[98107.18388557434, 3, 5],
-[98350.91705322266, 1, 5],
-[98738.987159729, 2, 5],
-[98931.24194145203, 0, 5],
-[99164.61486816406, 3, 5],
-[100069.15636062622, 2, 5],
-[100295.78776359558, 0, 5],
-[100495.13120651245, 3, 5],
-[100710.85209846497, 1, 5],
-[100918.19281578064, 2, 5],
-[101793.76740455627, 3, 5],
-[101984.45339202881, 3, 5],
-[102209.11569595337, 2, 5],
-[102418.24049949646, 2, 5],
-[102646.48885726929, 1, 5],
-[103478.58209609985, 0, 5],
-[103689.18890953064, 0, 5],
-[103918.2834148407, 1, 5],
-[104110.16674041748, 1, 5],
-[104344.90795135498, 2, 5],
-[104555.62062263489, 2, 5],
-[104761.31196022034, 3, 5],
-[104958.01515579224, 3, 5],
-[105185.29815673828, 2, 5],
-[105743.47896575928, 3, 5],
-[106447.20430374146, 2, 5],
-[106873.4561920166, 3, 5],
-[107492.18792915344, 0, 5],
-[108193.10660362244, 1, 5],
-[108641.71619415283, 2, 5],
-[109258.16698074341, 3, 5],
-[109889.14151191711, 2, 5],
-[110330.699634552, 2, 5],
-[110561.62257194519, 1, 5],
-[110798.43730926514, 3, 5],
-[111006.15091323853, 0, 5],
-[111213.55648040771, 2, 5],
-[111422.99766540527, 1, 5],
-[111627.11091041565, 3, 5],
-[111807.42163658142, 3, 5],
-[112052.73361206055, 2, 5],
-[112484.3873500824, 2, 5],
-[112702.58946418762, 0, 5],
-[112913.53888511658, 3, 5],
-[113344.8245048523, 2, 5],
-[113798.12426567078, 0, 5],
-[113997.31130599976, 0, 5],
-[114216.22176170349, 3, 5],
-[114418.01447868347, 1, 5],
-[114634.03458595276, 2, 5],
-[115080.7590007782, 3, 5],
-[115459.91916656494, 0, 5],
-[115665.51752090454, 0, 5],
-[115912.66603469849, 2, 5],
-[116124.56889152527, 2, 5],
-[116330.58280944824, 1, 5],
-[116748.85339736938, 3, 5],
-[117207.96031951904, 0, 5],
-[117401.40719413757, 0, 5],
-[117628.28679084778, 3, 5],
-[117835.98036766052, 3, 5],
-[118048.0417728424, 1, 5],
-[118493.56098175049, 2, 5],
-[118891.03646278381, 0, 5],
-[119337.70389556885, 3, 5],
-[119532.24368095398, 3, 5],
-[119774.35870170593, 2, 5],
-[120196.9289302826, 1, 5],
-[120613.77568244934, 3, 5],
-[120840.43283462524, 3, 5],
-[121084.38034057617, 2, 5],
-[121260.42194366455, 0, 5],
-[121486.02123260498, 3, 5],
-[121948.60525131226, 2, 5],
-[122340.50674438477, 0, 5],
-[122555.25631904602, 0, 5],
-[122766.46990776062, 2, 5],
-[122979.25992012024, 2, 5],
-[123228.24854850769, 1, 5],
-[123408.28485488892, 3, 5],
-[123615.01688957214, 0, 5],
-[124070.89276313782, 2, 5],
-[124292.37909317017, 2, 5],
-[124489.21747207642, 1, 5],
-[124699.87983703613, 1, 5],
-[124909.20133590698, 3, 5],
-[125111.85903549194, 0, 5],
-[125337.3598575592, 2, 5],
-[125532.56554603577, 1, 5],
-[125755.88626861572, 3, 5],
-[126393.11833381653, 2, 5],
-[127031.96902275085, 3, 5],
-[127468.82696151733, 2, 5],
-[127943.97373199463, 1, 5],
-[128345.18976211548, 0, 5],
-[128788.97852897644, 1, 5],
-[129192.23375320435, 3, 5],
-[129653.62615585327, 2, 5],
-[130063.39354515076, 0, 5],
-[130472.92490005493, 1, 5],
-[130911.21644973755, 3, 5],
-[131337.41040229797, 2, 5],
-[131750.2223968506, 1, 5],
-[132207.417678833, 0, 5],
-[132630.14216423035, 2, 5],
-[133058.69693756104, 3, 5],
-[133469.53077316284, 1, 5],
-[133919.80786323547, 0, 5],
-[134335.1180076599, 2, 5],
-[134744.25287246704, 3, 5],
-[135202.0432472229, 1, 5],
-[135615.8480167389, 0, 5],
-[136056.45866394043, 2, 5],
-[136484.25455093384, 1, 5],
-[136920.78251838684, 3, 5],
-[137325.52332878113, 0, 5],
-[137751.64670944214, 2, 5],
-[137992.69695281982, 1, 5],
-[138204.01258468628, 3, 5],
-[138419.90633010864, 0, 5],
-[138614.2632484436, 2, 5],
-[138838.35978507996, 1, 5],
-[139071.2179660797, 3, 5],
-[139262.8116130829, 0, 5]
-]
-note_playing_data=note_data
-# 樂譜初始化
+# 設定檔名 (.json / .csv) 時，每首歌結束會輸出每幀各階段的耗時
+FRAME_TRACE_PATH = None
+# 每一局的重播紀錄 (.rgr) 存放的目錄，None 則不記錄
+REPLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'replays')
+# 是否使用髒矩形繪製 (只更新有變化的區域)，False 則每幀整個畫面重畫
+DIRTY_RECTS = True
+# 是否在每個按鍵列畫出導引線
+LANE_GUIDES = False
 
 note_positions = {
     0: 180,  # D
@@ -1139,28 +897,33 @@ note_positions = {
 ####----------------------------------------------初始化-----------------------
 # 主遊戲循環
 
-gameRuning = True
-running = [True]
-while running[0]:
-    selected_difficulty = menu.show_start_menu()
-    if selected_difficulty == "Easy":
-        count=0
-        for each_note in note_playing_data:
-            note_playing_data[count][0]=float(each_note[0])+float(adspeed)*1000
-            #print(note_playing_data[count][0])
-            count+=1
-        score = Score('test.mp3', note_playing_data, 'note.png')
-        menu.start_countdown(screen, WIDTH, HEIGHT)
-        #start_time = pygame.time.get_ticks()  # 獲取遊戲開始的時間
-        GameControl.GameStart(gameRuning,score,FPS,running)
-        #TODO:結束畫面,暫停頁面
-    elif selected_difficulty == "Adjust":
-        adspeed=menu.start_adjust_menu()
-        if adspeed.isdigit():
-            if float(adspeed) <0:
-                adspeed=0
-        else:
-            adspeed=0
-
-        
-pygame.quit()
+def main():
+    assets = load_assets()  # 開始選單顯示時在背景載入
+    gameRuning = True
+    running = [True]
+    input_offset = load_offset()  # 上次校正的輸入延遲 (毫秒)
+    while running[0] and pygame.get_init():  # 選單中關閉視窗時 pygame 已經結束
+        selected_difficulty = menu.show_start_menu()
+        if selected_difficulty is None:
+            return
+        if selected_difficulty == "Easy":
+            # 倒數的同時等待還沒載入完成的資源
+            menu.start_countdown(screen, WIDTH, HEIGHT, loader=assets, required=GAME_ASSETS)
+            score = Score(MUSIC_PATH, assets.result('chart'), NOTE_IMAGE_PATH, music_data=assets.result('music'))
+            #start_time = pygame.time.get_ticks()  # 獲取遊戲開始的時間
+            replay = None
+            if REPLAY_DIR:
+                replay = ReplayRecorder(score.note_data, input_offset, new_replay_path(REPLAY_DIR))
+            GameControl.GameStart(gameRuning,score,FPS,running,delay=input_offset,replay=replay)
+            #TODO:結束畫面,暫停頁面
+        elif selected_difficulty == "Adjust":
+            assets.result('sounds')  # 節拍器使用按鍵音效
+            result = menu.start_calibration_menu()
+            if result is not None:
+                input_offset = result['offset']
+
+    app.close()
+
+
+if __name__ == '__main__':
+    main()
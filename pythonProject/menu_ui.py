@@ -0,0 +1,198 @@
+import time
+
+import pygame
+
+IDLE_TIMEOUT_MS = 1000  # 沒有動畫時每次等待事件的最長時間
+QUIT = 'quit'  # 關閉視窗時 MenuScreen.run 的回傳值
+
+
+class Label:
+    """ 文字標籤，文字沒變就重複使用同一個 Surface """
+    def __init__(self, text_cache, text, size, color, center):
+        """
+        :param text_cache: 文字繪製快取 (TextCache)
+        :param text: 文字內容
+        :param size: 字體大小
+        :param color: 文字顏色
+        :param center: 中心位置
+        """
+        self.text_cache = text_cache
+        self.size = size
+        self.color = color
+        self.visible = True
+        self.text = None
+        self.surface = None
+        self.rect = pygame.Rect(center, (0, 0))
+        self.screen = None  # 加入 MenuScreen 後設定，用來標記需要重畫的區域
+        self.set_text(text, center)
+
+    def set_text(self, text, center=None):
+        """ 更新文字 (與位置)，有改變時才重新取得 Surface 並標記重畫 """
+        center = self.rect.center if center is None else center
+        if text == self.text and center == self.rect.center:
+            return
+        old_rect = self.rect
+        if text != self.text:
+            self.text = text
+            self.surface = self.text_cache.render(text, self.size, self.color)
+        self.rect = self.surface.get_rect(center=center)
+        if self.screen is not None:
+            self.screen.invalidate(old_rect, self.rect)
+
+    def draw(self, surface):
+        surface.blit(self.surface, self.rect)
+
+
+class Button:
+    """ 按鈕，一般與滑鼠移上時的外觀各預先組合一次 """
+    def __init__(self, text_cache, text, rect, color, hover_color, action, text_color=(0, 0, 0), size=36):
+        """
+        :param text_cache: 文字繪製快取 (TextCache)
+        :param text: 按鈕文字
+        :param rect: 按鈕範圍 (x, y, width, height)
+        :param color: 一般的顏色
+        :param hover_color: 滑鼠移上時的顏色
+        :param action: 按下時 MenuScreen.run 的回傳值
+        """
+        self.rect = pygame.Rect(rect)
+        self.action = action
+        self.visible = True
+        self.hovered = False
+        self.screen = None
+        label = text_cache.render(text, size, text_color)
+        self.faces = []  # [一般, 滑鼠移上]
+        for fill in (color, hover_color):
+            face = pygame.Surface(self.rect.size)
+            face.fill(fill)
+            face.blit(label, label.get_rect(center=(self.rect.width // 2, self.rect.height // 2)))
+            self.faces.append(face)
+
+    def set_hover(self, hovered):
+        """ 更新滑鼠是否在按鈕上，有改變時標記重畫 """
+        if hovered != self.hovered:
+            self.hovered = hovered
+            if self.screen is not None:
+                self.screen.invalidate(self.rect)
+
+    def hit(self, pos):
+        # 與原本的按鈕相同，邊界不算在按鈕內
+        return self.visible and self.rect.left < pos[0] < self.rect.right and self.rect.top < pos[1] < self.rect.bottom
+
+    def draw(self, surface):
+        surface.blit(self.faces[self.hovered], self.rect)
+
+
+class MenuScreen:
+    """ 保留模式的選單畫面
+    標籤與按鈕的 Surface 都預先建立，畫面只在有變化 (滑鼠移入 / 移出按鈕、文字改變、動畫) 時重畫，
+    而且只更新變化的區域。沒有動畫時以 pygame.event.wait 等待事件，玩家不操作時幾乎不使用 CPU
+    """
+    def __init__(self, screen, text_cache, background=(255, 255, 255)):
+        """
+        :param screen: 顯示的畫面
+        :param text_cache: 文字繪製快取 (TextCache)
+        :param background: 背景顏色
+        """
+        self.screen = screen
+        self.text_cache = text_cache
+        self.background = background
+        self.widgets = []
+        self.dirty = []  # 需要重畫的區域，None 代表整個畫面
+        self.event_ns = 0  # 目前處理的事件取得時的 perf_counter_ns
+        self.redraws = 0
+        self.wakeups = 0
+
+    def add(self, widget):
+        """ 加入標籤或按鈕 """
+        widget.screen = self
+        self.widgets.append(widget)
+        self.invalidate(widget.rect)
+        return widget
+
+    def label(self, text, size, color, center):
+        return self.add(Label(self.text_cache, text, size, color, center))
+
+    def button(self, text, rect, color, hover_color, action):
+        return self.add(Button(self.text_cache, text, rect, color, hover_color, action))
+
+    def set_visible(self, widget, visible):
+        """ 顯示或隱藏元件 """
+        if widget.visible != visible:
+            widget.visible = visible
+            self.invalidate(widget.rect)
+
+    def invalidate(self, *rects):
+        """ 標記需要重畫的區域，不給區域時重畫整個畫面 """
+        if not rects:
+            self.dirty.append(None)
+        self.dirty.extend(pygame.Rect(rect) for rect in rects)
+
+    def redraw(self):
+        """ 重畫有變化的區域並只更新這些區域 """
+        if not self.dirty:
+            return
+        full = None in self.dirty
+        rects = [self.screen.get_rect()] if full else self.dirty
+        for rect in rects:
+            self.screen.fill(self.background, rect)
+        for widget in self.widgets:
+            if widget.visible and (full or widget.rect.collidelist(rects) != -1):
+                widget.draw(self.screen)
+        if full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        self.dirty = []
+        self.redraws += 1
+
+    def _hover(self, pos):
+        for widget in self.widgets:
+            if isinstance(widget, Button):
+                widget.set_hover(widget.hit(pos))
+
+    def run(self, on_event=None, on_tick=None, tick_ms=33, idle_ms=IDLE_TIMEOUT_MS):
+        """ 處理事件直到按下按鈕
+        :param on_event: 每個事件呼叫一次 (按鈕以外的事件)，回傳非 None 時結束並回傳這個值
+        :param on_tick: 動畫，每 tick_ms 毫秒呼叫一次 (目前的 perf_counter 毫秒)，回傳 False 表示動畫結束，
+                        之後只在事件發生時醒來；回傳非布林值時結束並回傳這個值
+        :param tick_ms: 動畫的間隔 (毫秒)
+        :param idle_ms: 沒有動畫時等待事件的最長時間 (毫秒)
+        :return: 被按下按鈕的 action，關閉視窗時為 QUIT
+        """
+        self.invalidate()
+        self._hover(pygame.mouse.get_pos())
+        animating = on_tick is not None
+        next_tick = time.perf_counter() * 1000
+        while True:
+            if animating:
+                now = time.perf_counter() * 1000
+                if now >= next_tick:
+                    next_tick = max(next_tick + tick_ms, now)
+                    result = on_tick(now)
+                    if result is False:
+                        animating = False
+                    elif result not in (None, True):
+                        return result
+            self.redraw()
+
+            # 沒有動畫時一直等到事件發生 (最多 idle_ms)，有動畫時等到下一次動畫
+            timeout = idle_ms if not animating else max(1, int(next_tick - time.perf_counter() * 1000))
+            event = pygame.event.wait(timeout)  # 一次只處理一個事件，回傳時其餘事件留在佇列
+            self.event_ns = time.perf_counter_ns()
+            self.wakeups += 1
+            if event.type == pygame.NOEVENT:
+                continue
+            if event.type == pygame.QUIT:
+                return QUIT
+            if event.type == pygame.MOUSEMOTION:
+                self._hover(event.pos)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                for widget in self.widgets:
+                    if isinstance(widget, Button) and widget.hit(event.pos):
+                        return widget.action
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                self.invalidate()
+            if on_event is not None:
+                result = on_event(event)
+                if result is not None:
+                    return result
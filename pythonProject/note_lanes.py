@@ -0,0 +1,210 @@
+import numpy as np
+
+
+class LaneStore:
+    """ 以 NumPy 欄位儲存所有下落中的音符 (structure of arrays)
+    每個欄位都是 (按鍵列數, 容量) 的二維陣列，每一列對應 D, F, J, K 其中一列，
+    所以每幀的位置更新、出界剔除、miss 計數都只需要一次向量化運算。
+    每一列都是依生成順序排列的環形緩衝區，取得與移除最前面的音符都是 O(1)。
+    逐一存取單一音符 (擊中) 時讀寫 NumPy 純量很慢，所以存活旗標與出現時間另外以 Python list 保存一份，
+    擊中移除的欄位先記下來，下一次向量化運算 (剔除、繪製、掃描) 前才一次寫回 NumPy 欄位
+    """
+    def __init__(self, lanes=4, capacity=64, start_y=-50, judgment_y=500, reference_fps=120):
+        """
+        :param lanes: 按鍵列數
+        :param capacity: 每一列預先配置的音符數量，不夠時會自動加倍
+        :param start_y: 音符出現時的 y 位置
+        :param judgment_y: 判定線的 y 位置
+        :param reference_fps: 譜面速度 (每幀像素) 的基準 FPS
+        """
+        self.lanes = lanes
+        self.capacity = capacity
+        self.start_y = start_y
+        self.judgment_y = judgment_y
+        self.reference_fps = reference_fps
+        self.y = np.full((lanes, capacity), start_y, dtype=np.float64)
+        self.speed = np.zeros((lanes, capacity), dtype=np.float64)  # 基準 FPS 下每幀的像素
+        self.spawn_time = np.zeros((lanes, capacity), dtype=np.float64)  # 出現時間 (毫秒)
+        self.alive = np.zeros((lanes, capacity), dtype=bool)
+        self._alive_rows = self.alive.tolist()  # 每一列的存活旗標 (Python list)
+        self._spawn_rows = self.spawn_time.tolist()  # 每一列的出現時間 (Python list)
+        self._speed_rows = self.speed.tolist()
+        self._removed = []  # 已移除但還沒寫回 alive 的欄位 (lane * capacity + slot)
+        self.head_slot = [0] * lanes  # 每一列最早生成且仍存活的音符欄位
+        self.size = [0] * lanes  # 每一列從頭到尾佔用的欄位數 (可能包含中間已移除的音符)
+
+    @classmethod
+    def for_chart(cls, note_data, lanes=4, limit_y=600, start_y=-50, judgment_y=500, reference_fps=120):
+        """ 依譜面在畫面上的最大密度決定容量，遊戲中不需要再擴充
+        :param note_data: 音符數據 [ (time, position, speed), ... ]
+        :param limit_y: 音符被剔除的 y 位置 (螢幕高度)
+        """
+        capacity = max(1, max_on_screen(note_data, lanes, limit_y - start_y, reference_fps))
+        return cls(lanes, capacity, start_y, judgment_y, reference_fps)
+
+    def append(self, lane, spawn_time, speed):
+        """ 在指定列的尾端加入一個音符
+        :param lane: 0 (D), 1 (F), 2 (J), 3 (K)
+        :param spawn_time: 音符出現的歌曲時間 (毫秒)
+        :param speed: 下落速度
+        :return: 音符所在的欄位索引
+        """
+        if self.size[lane] == self.capacity:
+            self._grow(self.capacity * 2)
+        slot = (self.head_slot[lane] + self.size[lane]) % self.capacity
+        self.sync_alive()  # 這個欄位可能剛被移除，先寫回才不會覆蓋掉新的音符
+        self.speed[lane, slot] = speed
+        self.spawn_time[lane, slot] = spawn_time
+        self.y[lane, slot] = self.start_y
+        self.alive[lane, slot] = True
+        self._alive_rows[lane][slot] = True
+        self._spawn_rows[lane][slot] = spawn_time
+        self._speed_rows[lane][slot] = speed
+        self.size[lane] += 1
+        return slot
+
+    def update(self, now_ms):
+        """ 依目前歌曲時間一次算出所有音符的 y 位置 (死掉的欄位也算，結果不會被使用) """
+        np.multiply(self.speed, self.reference_fps / 1000, out=self.y)
+        self.y *= now_ms - self.spawn_time
+        self.y += self.start_y
+
+    def cull(self, limit_y):
+        """ 剔除超出 limit_y 的音符
+        :return: 被剔除 (未擊中) 的音符數量
+        """
+        self.sync_alive()
+        off_screen = self.alive & (self.y > limit_y)
+        missed = int(np.count_nonzero(off_screen))
+        if missed:
+            self.alive &= ~off_screen
+            lanes, slots = np.nonzero(off_screen)
+            for lane, slot in zip(lanes.tolist(), slots.tolist()):
+                self._alive_rows[lane][slot] = False
+            for lane in set(lanes.tolist()):
+                self._advance(lane)
+        return missed
+
+    def head(self, lane):
+        """ 回傳指定列最早生成且仍存活的音符欄位索引，沒有則回傳 -1 """
+        return self.head_slot[lane] if self.size[lane] else -1
+
+    def position_at(self, lane, slot, now_ms):
+        """ 計算單一音符在 now_ms 時的 y 位置 """
+        elapsed = now_ms - self._spawn_rows[lane][slot]
+        return self.start_y + elapsed * self._speed_rows[lane][slot] * self.reference_fps / 1000
+
+    def find(self, lane, spawn_time):
+        """ 找出指定列中出現時間為 spawn_time 且仍存活的音符欄位索引，沒有則回傳 -1
+        通常被判定的就是最前面的音符，先以 O(1) 檢查佇列頭，不是才掃描整列
+        """
+        if self.size[lane]:
+            head = self.head_slot[lane]
+            if self._spawn_rows[lane][head] == spawn_time:
+                return head
+        self.sync_alive()
+        slots = np.flatnonzero(self.alive[lane] & (self.spawn_time[lane] == spawn_time))
+        return int(slots[0]) if slots.size else -1
+
+    def take(self, lane, spawn_time):
+        """ 找出並移除指定列中出現時間為 spawn_time 的音符 (擊中時使用)
+        被判定的通常是最前面的音符，這時只需要幾個 Python 運算；移除後欄位的資料仍保留，可以再用 position_at 計算位置
+        :return: 音符原本的欄位索引，沒有則回傳 -1
+        """
+        size = self.size[lane]
+        if size:
+            head = self.head_slot[lane]
+            if self._spawn_rows[lane][head] == spawn_time:
+                alive = self._alive_rows[lane]
+                alive[head] = False
+                self._removed.append(lane * self.capacity + head)
+                following = head + 1
+                if following == self.capacity:
+                    following = 0
+                if size > 1 and alive[following]:  # 下一個音符還在，直接成為佇列頭
+                    self.head_slot[lane] = following
+                    self.size[lane] = size - 1
+                else:
+                    self._advance(lane)
+                return head
+        slot = self.find(lane, spawn_time)
+        if slot != -1:
+            self.remove(lane, slot)
+        return slot
+
+    def remove(self, lane, slot):
+        """ 移除指定音符，若是最前面的音符則把佇列頭往後移 """
+        self._alive_rows[lane][slot] = False
+        self._removed.append(lane * self.capacity + slot)
+        if slot == self.head_slot[lane]:
+            self._advance(lane)
+
+    def visible(self):
+        """ 回傳所有存活音符的 (列, y) 陣列 """
+        self.sync_alive()
+        lanes, slots = np.nonzero(self.alive)
+        return lanes, self.y[lanes, slots]
+
+    def clear(self):
+        """ 清空所有音符 """
+        self.alive[:] = False
+        self._alive_rows = self.alive.tolist()
+        self._removed = []
+        self.head_slot = [0] * self.lanes
+        self.size = [0] * self.lanes
+
+    def sync_alive(self):
+        """ 把擊中移除的欄位一次寫回 NumPy 的 alive """
+        if self._removed:
+            self.alive.reshape(-1)[self._removed] = False
+            self._removed = []
+
+    def _advance(self, lane):
+        """ 跳過佇列頭已經移除的音符 (每個欄位只會被跳過一次，攤銷 O(1)) """
+        alive = self._alive_rows[lane]
+        capacity = self.capacity
+        head = self.head_slot[lane]
+        size = self.size[lane]
+        while size and not alive[head]:
+            head += 1
+            if head == capacity:
+                head = 0
+            size -= 1
+        self.head_slot[lane] = head if size else 0
+        self.size[lane] = size
+
+    def _grow(self, capacity):
+        """ 擴充所有欄位的容量，並把每一列的環形緩衝區攤平成從欄位 0 開始 """
+        self.sync_alive()
+        order = (np.asarray(self.head_slot)[:, None] + np.arange(self.capacity)) % self.capacity
+        pad = ((0, 0), (0, capacity - self.capacity))
+        self.y = np.pad(np.take_along_axis(self.y, order, axis=1), pad, constant_values=self.start_y)
+        self.speed = np.pad(np.take_along_axis(self.speed, order, axis=1), pad)
+        self.spawn_time = np.pad(np.take_along_axis(self.spawn_time, order, axis=1), pad)
+        self.alive = np.pad(np.take_along_axis(self.alive, order, axis=1), pad)
+        self._alive_rows = self.alive.tolist()
+        self._spawn_rows = self.spawn_time.tolist()
+        self._speed_rows = self.speed.tolist()
+        self.head_slot = [0] * self.lanes
+        self.capacity = capacity
+
+
+def max_on_screen(note_data, lanes=4, travel_px=650, reference_fps=120):
+    """ 計算譜面中單一列同時在畫面上的最大音符數量
+    以最慢音符停留在畫面上的時間當作視窗，計算任一視窗內單一列最多生成幾個音符，
+    即使中間有音符先被剔除留下空位，環形緩衝區也不會超過這個數量
+    :param note_data: 音符數據 [ (time, position, speed), ... ]
+    :param travel_px: 音符從出現到被剔除移動的像素
+    """
+    if len(note_data) == 0:
+        return 0
+    chart = np.asarray(note_data, dtype=np.float64).reshape(-1, 3)
+    slowest = chart[:, 2].min()
+    window = travel_px / (slowest * reference_fps / 1000)
+    densest = 0
+    for lane in range(lanes):
+        times = np.sort(chart[chart[:, 1] == lane, 0])
+        if times.size:
+            ends = np.searchsorted(times, times + window, side='right')
+            densest = max(densest, int((ends - np.arange(times.size)).max()))
+    return densest
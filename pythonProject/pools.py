@@ -0,0 +1,48 @@
+import bisect
+
+
+class ObjectPool:
+    """ 物件池：重複使用已經結束的物件，減少遊戲中配置新物件造成的 GC 停頓
+    被管理的類別需要提供 reset(*args)，參數與 __init__ 相同
+    """
+    def __init__(self, cls, size=0, *prototype_args):
+        """
+        :param cls: 要管理的類別
+        :param size: 預先建立的物件數量 (通常依譜面的最大同時數量決定)
+        :param prototype_args: 預先建立物件時使用的建構參數
+        """
+        self.cls = cls
+        self.free = [cls(*prototype_args) for _ in range(size)] if size else []
+        self.hits = 0  # 從池中取到物件的次數
+        self.misses = 0  # 池中沒有物件而新建的次數
+
+    def acquire(self, *args):
+        """ 取得一個物件並以 args 重新初始化 """
+        if self.free:
+            self.hits += 1
+            obj = self.free.pop()
+            obj.reset(*args)
+            return obj
+        self.misses += 1
+        return self.cls(*args)
+
+    def release(self, obj):
+        """ 歸還不再使用的物件 """
+        self.free.append(obj)
+
+    def stats(self):
+        """ 回傳池的使用統計 """
+        return {'hits': self.hits, 'misses': self.misses, 'free': len(self.free)}
+
+
+def peak_concurrency(event_times, lifetime):
+    """ 計算每個事件存活 lifetime 毫秒時，同一時間最多有幾個事件存活
+    :param event_times: 事件發生的時間 (毫秒)，不需事先排序
+    :param lifetime: 每個事件的存活時間 (毫秒)
+    """
+    times = sorted(event_times)
+    peak = 0
+    for index, start in enumerate(times):
+        end = bisect.bisect_right(times, start + lifetime, lo=index)
+        peak = max(peak, end - index)
+    return peak
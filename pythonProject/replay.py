@@ -0,0 +1,281 @@
+""" 重播紀錄 (.rgr) 與快速驗證
+
+遊戲中 (GameControl.GameStart) 記錄每一個 D / F / J / K 按鍵事件，結束時連同譜面雜湊、
+校正偏移與 NoteManager.countHIT 的結果寫成二進位檔。驗證時不跑遊戲迴圈，
+直接把按鍵依序交給 JudgmentEngine 重新判定，比對結果是否和紀錄相同。
+
+檔案結構 (little-endian)：
+    header 72 bytes : magic b'RGRP' | version uint16 | reserved uint16 | count uint32
+                      | perfect uint32 | great uint32 | miss uint32
+                      | offset float64 (校正的輸入延遲，毫秒) | end float64 (結束前最後一次過期判定的歌曲時間)
+                      | chart sha256 (32 bytes，pack_chart 後的譜面)
+    time     float64[count] : 按鍵的歌曲時間 (毫秒，尚未扣除 offset)
+    expired  float64[count] : 判定這個按鍵前最後一次過期判定 (update_notes) 的歌曲時間
+    lane     uint8[count]   : 0 (D), 1 (F), 2 (J), 3 (K)
+    pressed  uint8[count]   : 1 按下 / 0 放開
+記錄過期判定的時間，重新判定時 miss 的先後順序和遊戲中完全相同，結果與幀率無關。
+
+用法 (在 pythonProject 目錄下):
+    python replay.py info replays/20260101-120000-123.rgr
+    python replay.py verify replays/*.rgr --chart note_data.txt [--chart 其他譜面] [--workers 8]
+"""
+import argparse
+import hashlib
+import os
+import struct
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from chart_format import pack_chart, read_any
+from judgment import JudgmentEngine
+
+MAGIC = b'RGRP'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIIIdd32s')
+TIME_DTYPE = np.dtype('<f8')
+FLAG_DTYPE = np.dtype('u1')
+LANES = 4
+
+
+def new_replay_path(directory):
+    """ 以目前時間 (精確到毫秒) 命名的重播檔路徑，同名的檔案已存在時加上編號 """
+    now = time.time()
+    stem = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f'-{int(now * 1000) % 1000:03d}'
+    path = os.path.join(directory, stem + '.rgr')
+    counter = 1
+    while os.path.exists(path):
+        path = os.path.join(directory, f'{stem}-{counter}.rgr')
+        counter += 1
+    return path
+
+
+def chart_hash(note_data):
+    """ 譜面的 sha256 (以 pack_chart 的內容計算，與譜面來源的格式無關) """
+    return hashlib.sha256(pack_chart(note_data)).digest()
+
+
+class Replay:
+    """ 載入後的重播紀錄，time / expired / lane / pressed 都是 NumPy 陣列 """
+    def __init__(self, chart_hash, offset, counts, end, time, expired, lane, pressed):
+        """
+        :param chart_hash: 譜面的 sha256 (bytes)
+        :param offset: 校正的輸入延遲 (毫秒)
+        :param counts: 遊戲中記錄的 (perfect, great, miss)
+        :param end: 結束前最後一次過期判定的歌曲時間 (毫秒)
+        """
+        self.chart_hash = chart_hash
+        self.offset = offset
+        self.counts = counts
+        self.end = end
+        self.time = time
+        self.expired = expired
+        self.lane = lane
+        self.pressed = pressed
+
+    def __len__(self):
+        return len(self.time)
+
+
+class ReplayRecorder:
+    """ 遊戲中記錄按鍵事件，結束時 (finish) 寫出重播檔 """
+    def __init__(self, note_data, offset=0.0, path=None):
+        """
+        :param note_data: 這一局的譜面
+        :param offset: 校正的輸入延遲 (毫秒)，判定時從按鍵時間扣除
+        :param path: finish 時寫入的檔案，None 則只保留在記憶體
+        """
+        self.chart_hash = chart_hash(note_data)
+        self.offset = offset
+        self.path = path
+        self.time = array('d')
+        self.expired = array('d')
+        self.lane = array('B')
+        self.pressed = array('B')
+        self.counts = None
+        self.end = float('-inf')
+
+    def record(self, time_ms, lane, pressed, expired_until):
+        """ 記錄一個按鍵事件
+        :param time_ms: 按鍵的歌曲時間 (毫秒，尚未扣除 offset)
+        :param lane: 0 (D), 1 (F), 2 (J), 3 (K)
+        :param pressed: 按下 (True) / 放開 (False)
+        :param expired_until: 目前最後一次過期判定的歌曲時間 (NoteManager.expired_until)
+        """
+        self.time.append(time_ms)
+        self.expired.append(expired_until)
+        self.lane.append(lane)
+        self.pressed.append(1 if pressed else 0)
+
+    def finish(self, perfect, great, miss, expired_until):
+        """ 記錄結束時的判定結果，有指定 path 時寫出檔案
+        :return: 寫出的檔案路徑，沒有寫出時為 None
+        """
+        self.counts = (perfect, great, miss)
+        self.end = expired_until
+        if self.path is None:
+            return None
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'wb') as file:
+            file.write(self.to_bytes())
+        return self.path
+
+    def to_bytes(self):
+        perfect, great, miss = self.counts or (0, 0, 0)
+        return b''.join((
+            HEADER.pack(MAGIC, VERSION, 0, len(self.time), perfect, great, miss,
+                        self.offset, self.end, self.chart_hash),
+            np.asarray(self.time, dtype=TIME_DTYPE).tobytes(),
+            np.asarray(self.expired, dtype=TIME_DTYPE).tobytes(),
+            np.asarray(self.lane, dtype=FLAG_DTYPE).tobytes(),
+            np.asarray(self.pressed, dtype=FLAG_DTYPE).tobytes(),
+        ))
+
+    def to_replay(self):
+        """ 不經過檔案直接轉成 Replay """
+        return unpack_replay(self.to_bytes())
+
+
+def unpack_replay(buffer):
+    """ 從 bytes 解析重播紀錄 """
+    magic, version, _, count, perfect, great, miss, offset, end, digest = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError('not a replay file (bad magic)')
+    if version != VERSION:
+        raise ValueError(f'unsupported replay version {version}')
+    position = HEADER.size
+    times = np.frombuffer(buffer, TIME_DTYPE, count, position)
+    position += count * TIME_DTYPE.itemsize
+    expired = np.frombuffer(buffer, TIME_DTYPE, count, position)
+    position += count * TIME_DTYPE.itemsize
+    lane = np.frombuffer(buffer, FLAG_DTYPE, count, position)
+    position += count
+    pressed = np.frombuffer(buffer, FLAG_DTYPE, count, position)
+    return Replay(digest, offset, (perfect, great, miss), end, times, expired, lane, pressed)
+
+
+def load_replay(path):
+    with open(path, 'rb') as file:
+        return unpack_replay(file.read())
+
+
+def rejudge(replay, note_data):
+    """ 以重播的按鍵重新判定整首歌 (與 NoteManager 的計數方式相同)
+    :return: (perfect, great, miss)
+    """
+    engine = JudgmentEngine(note_data, lanes=LANES)
+    perfect = great = miss = 0
+    expired = float('-inf')
+    offset = replay.offset
+    for press, until, lane, pressed in zip(replay.time.tolist(), replay.expired.tolist(),
+                                           replay.lane.tolist(), replay.pressed.tolist()):
+        if until != expired:  # 這個按鍵之前遊戲已經做過的過期判定
+            miss += engine.expire(until)
+            expired = until
+        if not pressed or lane >= LANES:
+            continue
+        result, _ = engine.judge(lane, press - offset)
+        if result == 'perfect':
+            perfect += 1
+        elif result == 'great':
+            great += 1
+        elif result == 'miss':
+            miss += 1
+    miss += engine.expire(replay.end)
+    return perfect, great, miss
+
+
+def verify(replay, note_data):
+    """ 重新判定並和紀錄的結果比對
+    :return: dict(ok, expected, actual, events, reason)
+    """
+    if chart_hash(note_data) != replay.chart_hash:
+        return dict(ok=False, expected=replay.counts, actual=None, events=len(replay), reason='chart mismatch')
+    actual = rejudge(replay, note_data)
+    ok = actual == replay.counts
+    return dict(ok=ok, expected=replay.counts, actual=actual, events=len(replay),
+                reason=None if ok else 'count mismatch')
+
+
+# 批次驗證：每個工作行程載入一次譜面 (依雜湊對應)
+_charts = {}
+
+
+def _load_charts(chart_paths):
+    """ 讀取譜面並以雜湊建立索引 {sha256: note_data} """
+    charts = {}
+    for path in chart_paths:
+        note_data = read_any(path)
+        charts[chart_hash(note_data)] = note_data
+    return charts
+
+
+def _init_worker(charts):
+    _charts.clear()
+    _charts.update(charts)
+
+
+def verify_file(path):
+    """ 驗證一個重播檔 (譜面依檔案中的雜湊從已載入的譜面中找) """
+    try:
+        replay = load_replay(path)
+    except (OSError, ValueError, struct.error) as error:
+        return dict(path=path, ok=False, expected=None, actual=None, events=0, reason=str(error))
+    note_data = _charts.get(replay.chart_hash)
+    if note_data is None:
+        return dict(path=path, ok=False, expected=replay.counts, actual=None, events=len(replay),
+                    reason='unknown chart ' + replay.chart_hash.hex()[:12])
+    return dict(verify(replay, note_data), path=path)
+
+
+def verify_files(paths, chart_paths, workers=None, chunksize=16):
+    """ 以行程池批次驗證多個重播檔
+    :param paths: 重播檔路徑
+    :param chart_paths: 可能用到的譜面檔 (依雜湊對應到重播)
+    :param workers: 工作行程數，None 則為 CPU 數，1 則在目前的行程執行
+    :return: 與 paths 順序相同的 verify 結果 (另外加上 path)
+    """
+    charts = _load_charts(chart_paths)
+    if workers == 1:
+        _init_worker(charts)
+        return [verify_file(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(charts,)) as executor:
+        return list(executor.map(verify_file, paths, chunksize=chunksize))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='replay recording tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    info = commands.add_parser('info', help='show a replay summary')
+    info.add_argument('path')
+    check = commands.add_parser('verify', help='re-judge replays and compare with the recorded counts')
+    check.add_argument('paths', nargs='+')
+    check.add_argument('--chart', action='append', required=True, help='譜面檔，可以指定多次')
+    check.add_argument('--workers', type=int, default=None, help='工作行程數 (預設為 CPU 數)')
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        replay = load_replay(args.path)
+        presses = int(replay.pressed.sum())
+        print(f"{args.path}: {len(replay)} key events ({presses} presses), chart {replay.chart_hash.hex()[:12]}, "
+              f"offset {replay.offset:g} ms, ended at {replay.end / 1000:.1f}s")
+        print("perfect {}, great {}, miss {}".format(*replay.counts))
+        return
+
+    start = time.perf_counter()
+    results = verify_files(args.paths, args.chart, args.workers)
+    elapsed = time.perf_counter() - start
+    failed = [result for result in results if not result['ok']]
+    for result in failed:
+        print(f"FAIL {result['path']}: {result['reason']} (recorded {result['expected']}, "
+              f"re-judged {result['actual']})")
+    print(f"{len(results) - len(failed)}/{len(results)} replays verified in {elapsed:.2f}s")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
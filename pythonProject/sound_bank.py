@@ -0,0 +1,91 @@
+import hashlib
+import os
+
+import pygame
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sound_cache')
+HIT_CHANNELS = 8  # 保留給按鍵音效的聲道數
+
+
+class SoundBank:
+    """ 預先解碼的音效庫
+    MP3 解碼很慢，啟動時把每個音效解碼一次成 PCM，之後直接重複使用同一個 pygame.mixer.Sound。
+    解碼結果以「檔案內容的雜湊 + mixer 格式」為檔名存在磁碟上 (原始 PCM)，下次啟動直接讀取，
+    音效檔或 mixer 設定改變時雜湊不同，自然會重新解碼。
+    按鍵音效透過保留的聲道輪流播放，連續擊中時聲音重疊而不會被丟掉，也不會被其他音效搶走聲道
+    """
+    def __init__(self, cache_dir=CACHE_DIR, hit_channels=HIT_CHANNELS):
+        """
+        :param cache_dir: 解碼結果的快取目錄，None 則不使用磁碟快取
+        :param hit_channels: 保留給按鍵音效的聲道數
+        """
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        self.cache_dir = cache_dir
+        self.sounds = {}
+        self.cache_hits = 0
+        if pygame.mixer.get_num_channels() < hit_channels * 2:
+            pygame.mixer.set_num_channels(hit_channels * 2)  # 保留之後仍有一般音效可用的聲道
+        pygame.mixer.set_reserved(hit_channels)
+        self.hit_channels = [pygame.mixer.Channel(index) for index in range(hit_channels)]
+        self.next_channel = 0
+
+    def _cache_path(self, data):
+        """ 以檔案內容與 mixer 格式 (取樣率, 位元, 聲道) 決定快取檔名 """
+        frequency, size, channels = pygame.mixer.get_init()
+        digest = hashlib.sha1(data).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}-{frequency}-{size}-{channels}.pcm")
+
+    def load(self, name, path):
+        """ 載入一個音效 (已載入的直接回傳)
+        :param name: 之後取用的名稱
+        :param path: 音效檔路徑
+        """
+        if name in self.sounds:
+            return self.sounds[name]
+        with open(path, 'rb') as f:
+            data = f.read()
+        cache_path = self._cache_path(data) if self.cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                sound = pygame.mixer.Sound(buffer=f.read())
+            self.cache_hits += 1
+        else:
+            sound = pygame.mixer.Sound(path)
+            if cache_path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                temp_path = cache_path + '.tmp'
+                with open(temp_path, 'wb') as f:
+                    f.write(sound.get_raw())
+                os.replace(temp_path, cache_path)  # 寫完才換名，中斷時不會留下不完整的快取
+        self.sounds[name] = sound
+        return sound
+
+    def load_all(self, paths):
+        """ 載入多個音效
+        :param paths: {名稱: 音效檔路徑}
+        """
+        for name, path in paths.items():
+            self.load(name, path)
+
+    def get(self, name):
+        """ 取得已載入的音效 """
+        return self.sounds[name]
+
+    def play(self, name):
+        """ 以一般聲道播放音效 (倒數、開場音效等) """
+        return self.sounds[name].play()
+
+    def play_hit(self, name):
+        """ 以保留的聲道輪流播放按鍵音效，優先使用空閒的聲道，都在播放時取代最早開始播放的那個 """
+        channels = self.hit_channels
+        count = len(channels)
+        for step in range(count):
+            index = (self.next_channel + step) % count
+            if not channels[index].get_busy():
+                break
+        else:
+            index = self.next_channel
+        self.next_channel = (index + 1) % count
+        channels[index].play(self.sounds[name])
+        return channels[index]
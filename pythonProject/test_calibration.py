@@ -0,0 +1,80 @@
+""" 延遲校正 (calibration) 的估計與節拍器流程測試
+用法 (在 pythonProject 目錄下): python -m pytest -q
+"""
+import pytest
+
+from calibration import Calibration, MIN_TAPS, estimate_offset, load_offset, save_result, tap_offsets
+
+
+def test_estimate_offset_without_taps():
+    assert estimate_offset([]) is None
+
+
+def test_estimate_offset_rejects_outliers():
+    offsets = [28, 30, 32, 29, 31, 30, 300, -250]  # 漏拍、多按造成的兩個異常值
+    result = estimate_offset(offsets)
+    assert result['offset'] == pytest.approx(30)
+    assert result['taps'] == 6 and result['rejected'] == 2
+    assert result['variance'] == pytest.approx(10 / 6)
+    assert result['std'] == pytest.approx((10 / 6) ** 0.5)
+
+
+def test_min_spread_keeps_taps_when_mad_is_zero():
+    """ 幾乎每拍都一樣時 MAD 為 0，仍保留 min_spread 內的敲擊 """
+    result = estimate_offset([20, 20, 20, 20, 27, 60], min_spread=10)
+    assert result['taps'] == 5 and result['rejected'] == 1
+    assert estimate_offset([20, 20, 20, 20, 27, 60], min_spread=0)['taps'] == 4
+
+
+def test_tap_offsets_uses_nearest_beat():
+    assert tap_offsets([600, 1200, 1800], [590, 1230, 1450, 2000]) == [-10, 30, 250, 200]
+    assert tap_offsets([], [100]) == []
+
+
+def run_metronome(calibration, latency, tap_delays):
+    """ 以 1 毫秒的步進跑完節拍器，玩家在第 k 拍聽到後 tap_delays[k] 毫秒敲擊 (None 則不敲) """
+    interval = calibration.interval
+    taps = sorted(interval * (beat + 1) + latency + delay
+                  for beat, delay in enumerate(tap_delays) if delay is not None)
+    calibration.begin(0)
+    now = 0
+    while not calibration.finished(now):
+        while taps and taps[0] <= now:
+            calibration.tap(taps.pop(0))
+        calibration.due_beat(now, latency)
+        now += 1
+    return calibration.result()
+
+
+def test_calibration_measures_delay_after_output_latency():
+    calibration = Calibration(bpm=100, beats=24, warmup=4)
+    delays = [None] * 4 + [25, 35] * 10
+    result = run_metronome(calibration, 12, delays)
+    assert calibration.beat_times[0] == calibration.interval + 12  # 聽到的時間包含輸出延遲
+    assert result['offset'] == pytest.approx(30, abs=1)
+    assert result['taps'] == 20 and result['rejected'] == 0
+
+
+def test_early_tap_on_first_scored_beat_is_kept():
+    """ 第一個計分拍播放前的提早敲擊也要記錄，否則結果偏晚 """
+    calibration = Calibration(bpm=100, beats=24, warmup=4)
+    delays = [None] * 4 + [-15, 15] * 10  # 第一個計分拍的敲擊早於這一拍播放
+    result = run_metronome(calibration, 12, delays)
+    assert len(calibration.tap_times) == 20
+    assert result['taps'] == 20
+    assert result['offset'] == pytest.approx(0)
+
+
+def test_too_few_taps_gives_no_result():
+    calibration = Calibration(bpm=100, beats=24, warmup=4)
+    delays = [None] * 4 + [30] * (MIN_TAPS - 1) + [None] * (20 - MIN_TAPS + 1)
+    assert run_metronome(calibration, 0, delays) is None
+
+
+def test_save_and_load_offset(tmp_path):
+    path = str(tmp_path / 'calibration.json')
+    assert load_offset(path) == 0.0  # 沒有校正過
+    save_result(estimate_offset([40, 42, 44]), path)
+    assert load_offset(path) == pytest.approx(42)
+    (tmp_path / 'calibration.json').write_text('{broken')
+    assert load_offset(path) == 0.0
@@ -0,0 +1,65 @@
+""" 二進位譜面格式 (.rgc) 的打包與載入測試
+用法 (在 pythonProject 目錄下): python -m pytest -q
+"""
+import json
+import os
+import struct
+
+import numpy as np
+import pytest
+
+from chart_format import HEADER, MAGIC, load_chart, pack_chart, read_any, save_chart, unpack_chart
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+NOTE_DATA = [[0.0, 0, 5.0], [125.5, 3, 2.5], [125.5, 1, 5.0], [90000.25, 2, 7.75]]
+
+
+def test_pack_unpack_round_trip():
+    chart = unpack_chart(pack_chart(NOTE_DATA))
+    assert len(chart) == len(NOTE_DATA)
+    assert chart.to_note_data() == NOTE_DATA
+    assert chart.time.dtype == np.float64 and chart.speed.dtype == np.float32 and chart.lane.dtype == np.uint8
+
+
+def test_pack_sorts_by_time_and_keeps_order_of_equal_times():
+    shuffled = [NOTE_DATA[3], NOTE_DATA[1], NOTE_DATA[0], NOTE_DATA[2]]
+    assert unpack_chart(pack_chart(shuffled)).to_note_data() == NOTE_DATA
+
+
+def test_empty_chart():
+    data = pack_chart([])
+    assert len(data) == HEADER.size
+    assert unpack_chart(data).to_note_data() == []
+
+
+@pytest.mark.parametrize('use_mmap', [True, False])
+def test_save_and_load(tmp_path, use_mmap):
+    path = str(tmp_path / 'chart.rgc')
+    save_chart(path, NOTE_DATA)
+    chart = load_chart(path, use_mmap=use_mmap)
+    try:
+        assert chart.to_note_data() == NOTE_DATA
+        assert not chart.time.flags.writeable  # mmap 與 bytes 上的視圖都是唯讀的
+    finally:
+        chart.close()
+    assert read_any(path) == NOTE_DATA
+
+
+def test_rejects_bad_magic_and_version():
+    data = pack_chart(NOTE_DATA)
+    with pytest.raises(ValueError, match='magic'):
+        unpack_chart(b'XXXX' + data[len(MAGIC):])
+    with pytest.raises(ValueError, match='version'):
+        unpack_chart(data[:4] + struct.pack('<H', 99) + data[6:])
+
+
+def test_shipped_chart_matches_text_source():
+    """ 遊戲載入的 note_data.rgc 要和原始的 note_data.txt 一致 """
+    rgc = read_any(os.path.join(BASE_DIR, 'note_data.rgc'))
+    assert rgc == read_any(os.path.join(BASE_DIR, 'note_data.txt'))
+
+
+def test_game_notes_json_frames_are_converted_to_ms(tmp_path):
+    path = tmp_path / 'game_notes.json'
+    path.write_text(json.dumps([{'appearance_time': 120, 'position': 1, 'speed': 5}]))
+    assert read_any(str(path)) == [[1000.0, 1, 5]]
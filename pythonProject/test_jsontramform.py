@@ -0,0 +1,67 @@
+""" jsontramform 的 MIDI -> 按鍵列映射與串流讀取測試
+用法 (在 pythonProject 目錄下): python -m pytest -q
+"""
+import json
+import os
+
+import pytest
+
+from jsontramform import BASE_DIR, iter_track_notes, map_notes
+
+MIDI_JSON = os.path.join(BASE_DIR, 'VisiPiano.json')
+
+
+def test_chord_keeps_highest_notes_up_to_cap():
+    """ 三個音在同一組和弦內，最多留兩個，高音優先 """
+    times, lanes, speeds = map_notes([0, .010, .012], [40, 80, 70], chord_cap=2)
+    assert times.tolist() == [0.010, 0.012]
+    assert lanes.tolist() == [3, 2]
+    assert speeds.tolist() == [5.0, 5.0]
+
+
+def test_fast_roll_is_not_merged_into_one_chord():
+    """ 間隔 10 ms 的滾奏從每組的第一個音符分組，不會整串變成同一個和弦 """
+    times = [index * 0.010 for index in range(20)]
+    midis = [60 + index % 4 * 8 for index in range(20)]
+    result, _, _ = map_notes(times, midis, min_gap=0)
+    assert len(result) == 10
+
+
+def test_min_gap_is_measured_from_the_last_kept_note():
+    times, lanes, _ = map_notes([0, .05, .13, .20, .26], [40] * 5, min_gap=0.12)
+    assert times.tolist() == [0, 0.13, 0.26]
+    assert lanes.tolist() == [0, 0, 0]
+
+
+def test_min_gap_applies_per_lane():
+    times, lanes, _ = map_notes([0, .05, .10], [40, 80, 40], min_gap=0.12, chord_window=0.001)
+    assert times.tolist() == [0, 0.05]
+    assert lanes.tolist() == [0, 3]
+
+
+@pytest.mark.parametrize('strategy, expected', [
+    ('range', [0, 1, 2, 3]),  # 36 ~ 83 切成四個 12 個半音的區段
+    ('modulo', [0, 0, 0, 0]),  # 相差 12 個半音，餘數相同
+])
+def test_lane_strategy(strategy, expected):
+    times, lanes, _ = map_notes([0, 1, 2, 3], [36, 48, 60, 72], strategy=strategy, min_gap=0)
+    assert lanes.tolist() == expected
+
+
+def test_pitch_outside_range_is_folded_by_octaves():
+    _, lanes, _ = map_notes([0, 1], [24, 95], min_gap=0)  # 折回 36 與 83
+    assert lanes.tolist() == [0, 3]
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        map_notes([0], [60], strategy='random')
+
+
+@pytest.mark.parametrize('chunk_size', [7, 100])
+def test_iter_track_notes_matches_json_load(chunk_size):
+    """ 區塊很小時 "notes" 與音符本身都會被切在兩個區塊之間 """
+    with open(MIDI_JSON, encoding='utf-8') as file:
+        tracks = json.load(file)['tracks']
+    expected = [(track, note) for track, data in enumerate(tracks) for note in data.get('notes', [])]
+    assert list(iter_track_notes(MIDI_JSON, chunk_size)) == expected
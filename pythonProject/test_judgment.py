@@ -0,0 +1,128 @@
+""" JudgmentEngine 與 NoteManager 的判定順序測試
+用法 (在 pythonProject 目錄下): python -m pytest -q
+"""
+import random
+
+import pytest
+
+import main_test
+from judgment import GREAT_WINDOW, MISS_WINDOW, PERFECT_WINDOW, JudgmentEngine, hit_time
+
+SPEED = 5
+TRAVEL_MS = hit_time(0, SPEED)  # 速度 5 從出現到判定線的時間
+
+
+class Effects:
+    """ NoteManager 需要的結果顯示、擊中效果與 combo，只記錄呼叫 """
+    def __init__(self):
+        self.results = []
+
+    def add_result(self, text, position, color):
+        self.results.append(text)
+
+    def add_effect(self, position, color):
+        pass
+
+    def increase_combo(self):
+        pass
+
+    def reset_combo(self):
+        pass
+
+
+def make_manager(note_data):
+    effects = Effects()
+    return main_test.NoteManager(main_test.note_positions, None, effects, effects, effects, note_data=note_data)
+
+
+def chart(*notes):
+    """ 以判定時間建立譜面 [ (出現時間, 列, 速度), ... ] """
+    return [[hit - TRAVEL_MS, lane, SPEED] for hit, lane in notes]
+
+
+@pytest.mark.parametrize('delta, expected', [
+    (0, 'perfect'), (PERFECT_WINDOW, 'perfect'), (-PERFECT_WINDOW - 1, 'great'), (GREAT_WINDOW, 'great'),
+    (GREAT_WINDOW + 1, 'miss'), (-MISS_WINDOW, 'miss'), (MISS_WINDOW + 1, None),
+])
+def test_windows(delta, expected):
+    engine = JudgmentEngine(chart((1000, 0)))
+    result, _ = engine.judge(0, 1000 + delta)
+    assert result == expected
+
+
+def test_judge_takes_earliest_unjudged_note_in_lane():
+    note_data = chart((1000, 0), (1100, 0), (1100, 1))
+    engine = JudgmentEngine(note_data)
+    assert engine.judge(0, 1090) == ('great', note_data[0][0])  # 較早的音符優先，即使離另一個較近
+    assert engine.judge(0, 1090) == ('perfect', note_data[1][0])
+    assert engine.judge(0, 1090) == (None, None)
+    assert engine.judge(1, 1100)[0] == 'perfect'
+
+
+def test_expire_counts_only_notes_past_the_miss_window():
+    engine = JudgmentEngine(chart((1000, 0), (1200, 1), (2000, 0)))
+    assert engine.expire(1000 + MISS_WINDOW) == 0  # 剛好在範圍邊界還可以按
+    assert engine.expire(1200 + MISS_WINDOW + 1) == 2
+    assert engine.expire(1200 + MISS_WINDOW + 1) == 0
+    assert engine.judge(0, 1200) == (None, None)  # 已經過期的音符不會再被判定
+    assert engine.judge(0, 2000)[0] == 'perfect'
+
+
+def test_expire_after_judging_does_not_count_the_note_again():
+    engine = JudgmentEngine(chart((1000, 0), (1050, 0)))
+    assert engine.judge(0, 1300)[0] == 'miss'  # 第一個音符在 miss 範圍內
+    assert engine.expire(5000) == 1
+
+
+def test_brute_force_agreement():
+    """ 隨機按鍵與過期判定，和逐一檢查所有音符的作法比較 """
+    rng = random.Random(7)
+    for _ in range(50):
+        notes = sorted((rng.uniform(0, 5000), rng.randrange(4)) for _ in range(60))
+        engine = JudgmentEngine(chart(*notes))
+        judged = [False] * len(notes)
+        now = 0.0
+        for _ in range(120):
+            now += rng.uniform(0, 60)
+            if rng.random() < 0.3:
+                expected_missed = 0
+                for index, (hit, lane) in enumerate(notes):
+                    if not judged[index] and hit < now - MISS_WINDOW:
+                        judged[index] = True
+                        expected_missed += 1
+                assert engine.expire(now) == expected_missed
+            lane = rng.randrange(4)
+            candidates = [index for index, (hit, note_lane) in enumerate(notes)
+                          if note_lane == lane and not judged[index] and abs(now - hit) <= MISS_WINDOW]
+            result, _ = engine.judge(lane, now)
+            if candidates:
+                first = min(candidates, key=lambda index: notes[index][0])
+                judged[first] = True
+                assert result == engine.classify(now - notes[first][0])
+            else:
+                assert result is None
+
+
+def test_press_before_spawn_is_skipped_when_the_note_spawns():
+    note_data = chart((1000, 2))
+    manager = make_manager(note_data)
+    spawn_time = note_data[0][0]
+    # 大延遲校正時按鍵可能早於音符生成
+    assert manager.check_hit(2, 1000) == 10
+    assert manager.judged_early == {(2, spawn_time)}
+    manager.input_note(spawn_time, 2, SPEED)
+    assert manager.judged_early == set()
+    assert manager.note_lanes.head(2) == -1
+    assert manager.countHIT() == (1, 0, 0)
+
+
+def test_hit_removes_the_spawned_note():
+    note_data = chart((1000, 0), (1200, 0))
+    manager = make_manager(note_data)
+    for spawn_time, lane, speed in note_data:
+        manager.input_note(spawn_time, lane, speed)
+    first = manager.note_lanes.head(0)
+    manager.check_hit(0, 1150)  # 第一個音符 great
+    assert manager.note_lanes.head(0) != first
+    assert manager.note_lanes.spawn_time[0, manager.note_lanes.head(0)] == note_data[1][0]
+    assert manager.countHIT() == (0, 1, 0)
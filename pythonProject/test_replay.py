@@ -0,0 +1,83 @@
+""" 重播紀錄 (ReplayRecorder -> unpack_replay -> rejudge) 的測試
+用法 (在 pythonProject 目錄下): python -m pytest -q
+"""
+import os
+import random
+
+import pytest
+
+from replay import ReplayRecorder, new_replay_path, rejudge, unpack_replay, verify
+from test_judgment import chart, make_manager
+
+
+def play(note_data, presses, offset, seed):
+    """ 依 GameStart 的順序模擬一局並記錄重播：每幀先判定這一幀之前的按鍵，再做過期判定
+    :param presses: [ (歌曲時間, 列), ... ]
+    :return: ReplayRecorder
+    """
+    rng = random.Random(seed)
+    manager = make_manager(note_data)
+    recorder = ReplayRecorder(note_data, offset)
+    presses = sorted(presses)
+    end = max(press for press, _ in presses) + 500
+    now = 0.0
+    index = 0
+    while now < end:
+        now += rng.uniform(4, 40)  # 不穩定的幀時間
+        while index < len(presses) and presses[index][0] <= now:
+            press, lane = presses[index]
+            recorder.record(press, lane, True, manager.expired_until)
+            manager.check_hit(lane, press - offset)
+            recorder.record(press + 30, lane, False, manager.expired_until)
+            index += 1
+        manager.update_notes(now)
+    recorder.finish(*manager.countHIT(), manager.expired_until)
+    return recorder
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_replay_round_trip_rejudges_to_recorded_counts(seed):
+    rng = random.Random(seed)
+    notes = [(rng.uniform(500, 20000), rng.randrange(4)) for _ in range(200)]
+    note_data = chart(*notes)
+    offset = rng.uniform(-250, 250)
+    presses = [(hit + offset + rng.uniform(-250, 250), lane) for hit, lane in notes if rng.random() > 0.1]
+    presses += [(rng.uniform(0, 20000), rng.randrange(4)) for _ in range(20)]  # 亂按
+    recorder = play(note_data, presses, offset, seed)
+
+    replay = unpack_replay(recorder.to_bytes())
+    assert replay.offset == offset
+    assert len(replay) == 2 * len(presses)
+    assert rejudge(replay, note_data) == recorder.counts
+    assert sum(recorder.counts) <= len(notes)
+    assert verify(replay, note_data)['ok']
+
+
+def test_replay_keeps_expire_order_with_large_offset():
+    """ 扣除校正延遲後的按鍵時間早於上一次過期判定時，重新判定也不能選到已經過期的音符 """
+    note_data = chart((1000, 0), (1100, 0))
+    recorder = play(note_data, [(1420, 0)], 300, 0)  # 判定時間 1120，1000 的音符在前一幀已經過期
+    assert recorder.counts == (1, 0, 1)
+    assert rejudge(unpack_replay(recorder.to_bytes()), note_data) == (1, 0, 1)
+
+
+def test_replay_rejects_other_chart_and_bad_data():
+    note_data = chart((1000, 0))
+    recorder = play(note_data, [(1000, 0)], 0, 0)
+    replay = unpack_replay(recorder.to_bytes())
+    result = verify(replay, chart((1000, 1)))
+    assert not result['ok'] and result['reason'] == 'chart mismatch'
+    with pytest.raises(ValueError):
+        unpack_replay(b'XXXX' + recorder.to_bytes()[4:])
+
+
+def test_new_replay_path_does_not_overwrite(tmp_path):
+    """ 同一毫秒內結束的兩局也不會覆蓋彼此的重播 """
+    note_data = chart((1000, 0))
+    paths = []
+    for _ in range(3):
+        recorder = play(note_data, [(1000, 0)], 0, 0)
+        recorder.path = new_replay_path(str(tmp_path))
+        paths.append(recorder.finish(*recorder.counts, recorder.end))
+    assert len(set(paths)) == 3
+    assert sorted(tmp_path.iterdir()) == sorted(map(tmp_path.joinpath, map(os.path.basename, paths)))
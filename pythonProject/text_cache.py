@@ -0,0 +1,59 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class TextCache:
+    """ 共用的文字繪製快取
+    以 (字型, 字體大小, 文字, 顏色) 為鍵保存 font.render 的結果，超過上限時淘汰最久沒用到的項目，
+    字型物件也只建立一次，避免每幀重新 render 或 new 一個 Font
+    """
+    def __init__(self, max_entries=256, preload_sizes=(36, 48, 50, 60, 80, 150)):
+        """
+        :param max_entries: 最多保存幾個文字 Surface
+        :param preload_sizes: 啟動時先建立的字體大小 (預設字型)
+        """
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        for size in preload_sizes:
+            self.get_font(size)
+
+    def get_font(self, size, name=None):
+        """ 取得 (必要時建立) 字型物件
+        :param size: 字體大小
+        :param name: 字型檔路徑，None 為 pygame 預設字型
+        """
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(name, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, size=36, color=(255, 255, 255), name=None):
+        """ 取得文字 Surface，相同的內容只 render 一次
+        回傳的 Surface 是共用的，使用端若修改 (例如 set_alpha) 需在繪製後還原
+        :param text: 文字內容
+        :param size: 字體大小
+        :param color: 文字顏色
+        :param name: 字型檔路徑，None 為 pygame 預設字型
+        """
+        key = (name, size, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = self.get_font(size, name).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)  # 淘汰最久沒用到的項目
+        return surface
+
+    def clear(self):
+        """ 清空文字 Surface 快取 (保留字型物件) """
+        self.surfaces.clear()